@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import const
+import command
+
+#-------------------------------------------------------------------------------
+# Folders never scanned for project sources
+#-------------------------------------------------------------------------------
+SKIPPED_FOLDERS = ("build", "dist", "matrix", "__pycache__")
+
+_sitePackages = {}
+
+#-------------------------------------------------------------------------------
+# cacheDir()
+#-------------------------------------------------------------------------------
+def cacheDir(kind):
+    folder = os.path.join(os.path.expanduser("~"), const.db["APP_FOLDER"], const.db["CACHE_FOLDER"], kind)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    return folder
+
+#-------------------------------------------------------------------------------
+# hashFile()
+#-------------------------------------------------------------------------------
+def hashFile(filename):
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(block)
+    return h.hexdigest()
+
+#-------------------------------------------------------------------------------
+# hashString()
+#-------------------------------------------------------------------------------
+def hashString(s):
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+#-------------------------------------------------------------------------------
+# getImportedNames()
+# Return the modules names imported by a Python source file
+#-------------------------------------------------------------------------------
+def getImportedNames(filename):
+    try:
+        with open(filename, "rb") as f:
+            tree = ast.parse(f.read(), filename)
+    except (SyntaxError, ValueError, OSError):
+        return []
+    names = []
+    package = os.path.dirname(filename)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend((alias.name, None) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level > 0:
+                # Relative import, resolved from the folder of the file
+                base = package
+                for _ in range(node.level - 1):
+                    base = os.path.dirname(base)
+                names.append((node.module or "", base))
+                names.extend(((node.module + "." if node.module else "") + alias.name, base) for alias in node.names)
+            else:
+                names.append((node.module, None))
+                names.extend((node.module + "." + alias.name, None) for alias in node.names)
+    return names
+
+#-------------------------------------------------------------------------------
+# resolveModule()
+# Return the source file of a module if it belongs to one of the roots
+#-------------------------------------------------------------------------------
+def resolveModule(name, roots):
+    parts = [p for p in name.split('.') if p]
+    for root in roots:
+        path = os.path.join(root, *parts) if parts else root
+        for candidate in (path + ".py", path + ".pyw", os.path.join(path, "__init__.py")):
+            if os.path.isfile(candidate):
+                return candidate
+    return None
+
+#-------------------------------------------------------------------------------
+# getProjectSources()
+# Return the project source files reachable from the main script, and from
+# the modules given by --hidden-import, --collect-* and --runtime-hook
+#-------------------------------------------------------------------------------
+def getProjectSources(main, paths=(), modules=(), packages=(), scripts=()):
+    roots = [os.path.dirname(main)] + [p for p in paths if os.path.isdir(p)]
+    if command.isSpecFile(main):
+        # The scripts of a spec file are not known without reading it, so
+        # let's take all the Python files of its folder
+        sources = set([main])
+        for root, dirs, files in os.walk(roots[0]):
+            dirs[:] = [d for d in dirs if d not in SKIPPED_FOLDERS and not d.startswith('.')]
+            sources.update(os.path.join(root, f) for f in files if f.endswith((".py", ".pyw")))
+        return sorted(sources)
+    sources = set()
+    todo = [main] + list(scripts) + [f for f in (resolveModule(name, roots) for name in modules) if f is not None]
+    for name in packages:
+        # All the files of a collected package are bundled, not only the
+        # imported ones
+        init = resolveModule(name, roots)
+        if init is not None and os.path.basename(init) == "__init__.py":
+            for filename in getFolderFiles(os.path.dirname(init)):
+                if filename.endswith((".py", ".pyw")):
+                    todo.append(filename)
+                else:
+                    sources.add(filename)
+        elif init is not None:
+            todo.append(init)
+    while todo:
+        filename = todo.pop()
+        if filename in sources:
+            continue
+        sources.add(filename)
+        for name, base in getImportedNames(filename):
+            found = resolveModule(name, [base] if base is not None else roots)
+            if found is not None and found not in sources:
+                todo.append(found)
+    return sorted(sources)
+
+#-------------------------------------------------------------------------------
+# getFolderFiles()
+#-------------------------------------------------------------------------------
+def getFolderFiles(folder):
+    files = []
+    for root, dirs, names in os.walk(folder):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        files.extend(os.path.join(root, f) for f in names)
+    return sorted(files)
+
+#-------------------------------------------------------------------------------
+# getPath()
+# Options paths are relative to the folder PyInstaller is run from
+#-------------------------------------------------------------------------------
+def getPath(value, cwd):
+    return value if os.path.isabs(value) else os.path.join(cwd, value)
+
+#-------------------------------------------------------------------------------
+# getDataFiles()
+# Return the files added by --add-data and --add-binary, and the ones given
+# to the other options taking files : hooks, icon, version file, manifest,
+# resources and entitlements
+#-------------------------------------------------------------------------------
+def getDataFiles(options, cwd):
+    files = []
+    for item in options['add_data'] + options['add_binary']:
+        src = getPath(item.rsplit(os.pathsep, 1)[0], cwd)
+        if os.path.isfile(src):
+            files.append(src)
+        elif os.path.isdir(src):
+            files.extend(getFolderFiles(src))
+    for folder in options['additional_hooks_dir']:
+        if os.path.isdir(getPath(folder, cwd)):
+            files.extend(getFolderFiles(getPath(folder, cwd)))
+    # --resource is FILE[,TYPE[,NAME[,LANGUAGE]]]
+    candidates = options['runtime_hook'] + [r.split(",")[0] for r in options['resource']]
+    candidates = candidates + [options[name] for name in ('icon', 'version_file', 'manifest', 'osx_entitlements_file') if options[name]]
+    for item in candidates:
+        if os.path.isfile(getPath(item, cwd)):
+            files.append(getPath(item, cwd))
+    return sorted(set(files))
+
+#-------------------------------------------------------------------------------
+# getInterpreter()
+# Return the interpreter running PyInstaller, read from the launcher script
+#-------------------------------------------------------------------------------
+def getInterpreter():
+    launcher = shutil.which("pyinstaller")
+    if launcher is not None:
+        try:
+            with open(launcher, "rb") as f:
+                first = f.readline(512)
+            if first.startswith(b"#!"):
+                return first[2:].decode("utf-8", errors="replace").strip()
+        except OSError:
+            pass
+    return sys.executable
+
+#-------------------------------------------------------------------------------
+# getInterpreterPath()
+# Return the executable of the interpreter, the one run by "/usr/bin/env"
+# for a "#!/usr/bin/env python3" launcher, or None if it is not found
+#-------------------------------------------------------------------------------
+def getInterpreterPath(interpreter):
+    words = interpreter.split()
+    if words and os.path.basename(words[0]) == "env":
+        words = [w for w in words[1:] if not w.startswith("-") and "=" not in w]
+    if not words:
+        return None
+    return shutil.which(words[0])
+
+#-------------------------------------------------------------------------------
+# getSitePackages()
+#-------------------------------------------------------------------------------
+def getSitePackages(interpreter):
+    if interpreter not in _sitePackages:
+        try:
+            out = subprocess.check_output(interpreter.split() + ["-c", "import site, sys; print('\\n'.join(site.getsitepackages() + [site.getusersitepackages()]))"], stderr=subprocess.DEVNULL, timeout=30)
+            _sitePackages[interpreter] = out.decode("utf-8", errors="replace").split()
+        except (OSError, subprocess.SubprocessError):
+            import site
+            _sitePackages[interpreter] = site.getsitepackages()
+    return _sitePackages[interpreter]
+
+#-------------------------------------------------------------------------------
+# getSiteFingerprint()
+# Hash of the installed distributions, their names, versions and mtimes
+# Without the mtimes and the folders, the hash is the same on every machine
+# having the same distributions installed
+#-------------------------------------------------------------------------------
+def getSiteFingerprint(interpreter, local=True):
+    entries = []
+    for folder in getSitePackages(interpreter):
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.name.endswith((".dist-info", ".egg-info", ".egg-link", ".pth")):
+                        if local:
+                            entries.append("%s/%s:%d" % (folder, entry.name, entry.stat().st_mtime_ns))
+                        else:
+                            entries.append(entry.name)
+        except OSError:
+            pass
+    return hashString("\n".join(sorted(entries)))
+
+#-------------------------------------------------------------------------------
+# getInputs()
+# Return the dict of all the inputs of a build, with their hashes
+#-------------------------------------------------------------------------------
+def getInputs(options):
+    options = command.getOptions(options)
+    main = os.path.abspath(options['main'])
+    cwd = os.path.dirname(main)
+    interpreter = getInterpreter()
+    inputs = {}
+    paths = [getPath(p, cwd) for p in options['paths']]
+    packages = [name for option in ('collect_submodules', 'collect_data', 'collect_binaries', 'collect_all') for name in options[option]]
+    scripts = [getPath(p, cwd) for p in options['runtime_hook'] if os.path.isfile(getPath(p, cwd))]
+    sources = getProjectSources(main, paths, options['hidden_import'], packages, scripts)
+    for filename in sorted(set(sources + getDataFiles(options, cwd))):
+        inputs["file:" + filename] = hashFile(filename)
+    inputs["options"] = hashString(json.dumps(command.buildArgv(options), sort_keys=True))
+    inputs["interpreter"] = hashString(interpreter)
+    inputs["site-packages"] = getSiteFingerprint(interpreter)
+    return inputs
+
+#-------------------------------------------------------------------------------
+# getKey()
+#-------------------------------------------------------------------------------
+def getKey(inputs):
+    return hashString(json.dumps(inputs, sort_keys=True))
+
+#-------------------------------------------------------------------------------
+# explainMiss()
+# Compare the inputs with the ones of the previous build of the same project
+#-------------------------------------------------------------------------------
+def explainMiss(main, inputs):
+    lastName = os.path.join(cacheDir("builds"), "last-%s.json" % hashString(os.path.abspath(main)))
+    try:
+        with open(lastName, "r") as f:
+            last = json.load(f)
+    except (OSError, ValueError):
+        return ["no previous build of this project in cache"]
+    reasons = []
+    for key in sorted(set(inputs) | set(last)):
+        if key not in last:
+            reasons.append("new input %s" % key)
+        elif key not in inputs:
+            reasons.append("removed input %s" % key)
+        elif inputs[key] != last[key]:
+            reasons.append("changed input %s" % key)
+    return reasons if reasons else ["previous build was not stored"]
+
+#-------------------------------------------------------------------------------
+# lookup()
+# Return the cached artifact for this key, or None
+#-------------------------------------------------------------------------------
+def lookup(key):
+    entry = os.path.join(cacheDir("builds"), key)
+    artifact = os.path.join(entry, "artifact")
+    if os.path.exists(os.path.join(entry, "manifest.json")) and os.path.exists(artifact):
+        os.utime(entry)
+        return artifact
+    return None
+
+#-------------------------------------------------------------------------------
+# copyArtifact()
+#-------------------------------------------------------------------------------
+def copyArtifact(src, dst):
+    if os.path.isdir(dst) and not os.path.islink(dst):
+        shutil.rmtree(dst, ignore_errors=True)
+    elif os.path.exists(dst):
+        os.remove(dst)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.isdir(src):
+        shutil.copytree(src, dst, symlinks=True)
+    else:
+        shutil.copy2(src, dst)
+
+#-------------------------------------------------------------------------------
+# restore()
+#-------------------------------------------------------------------------------
+def restore(key, target):
+    copyArtifact(lookup(key), target)
+
+#-------------------------------------------------------------------------------
+# store()
+# Store the artifact built from these inputs, entry is published atomically
+#-------------------------------------------------------------------------------
+def store(main, inputs, source, maxEntries):
+    key = getKey(inputs)
+    folder = cacheDir("builds")
+    entry = os.path.join(folder, key)
+    tmpEntry = os.path.join(folder, "tmp-%s-%d" % (key, os.getpid()))
+    try:
+        copyArtifact(source, os.path.join(tmpEntry, "artifact"))
+        with open(os.path.join(tmpEntry, "manifest.json"), "w") as f:
+            json.dump({'main': os.path.abspath(main), 'time': time.time(), 'inputs': inputs}, f, indent=1)
+    except OSError:
+        # The artifact has been removed (by a new build) while being copied
+        shutil.rmtree(tmpEntry, ignore_errors=True)
+        return False
+    try:
+        os.rename(tmpEntry, entry)
+    except OSError:
+        # Already stored by another build
+        shutil.rmtree(tmpEntry, ignore_errors=True)
+    with open(os.path.join(folder, "last-%s.json" % hashString(os.path.abspath(main))), "w") as f:
+        json.dump(inputs, f, indent=1)
+    evict(maxEntries)
+    return True
+
+#-------------------------------------------------------------------------------
+# evict()
+# Keep only the most recently used entries
+#-------------------------------------------------------------------------------
+def evict(maxEntries):
+    folder = cacheDir("builds")
+    entries = [os.path.join(folder, d) for d in os.listdir(folder) if len(d) == 64 and os.path.isdir(os.path.join(folder, d))]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for entry in entries[maxEntries:]:
+        shutil.rmtree(entry, ignore_errors=True)
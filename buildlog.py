@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+import array
+import gzip
+import mmap
+import os
+import time
+from collections import OrderedDict
+
+import const
+
+#-------------------------------------------------------------------------------
+# Each log is a standard .gz file made of independent gzip members of about
+# CHUNK_SIZE bytes of text. The offsets of the members are stored in a sidecar
+# .idx file, so a viewer can decompress one chunk without reading the others.
+#-------------------------------------------------------------------------------
+CHUNK_SIZE = 64 * 1024
+CACHED_CHUNKS = 8
+
+#-------------------------------------------------------------------------------
+# logsDir()
+#-------------------------------------------------------------------------------
+def logsDir():
+    folder = os.path.join(os.path.expanduser("~"), const.db["APP_FOLDER"], const.db["LOGS_FOLDER"])
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    return folder
+
+#-------------------------------------------------------------------------------
+# listLogs()
+# Return the log files, newest first
+#-------------------------------------------------------------------------------
+def listLogs():
+    folder = logsDir()
+    logs = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".log.gz")]
+    return sorted(logs, reverse=True)
+
+#-------------------------------------------------------------------------------
+# pruneLogs()
+# Keep only the most recent log files
+#-------------------------------------------------------------------------------
+def pruneLogs(keep):
+    for log in listLogs()[keep:]:
+        for f in (log, log + ".idx"):
+            try:
+                os.remove(f)
+            except OSError:
+                pass
+
+#-------------------------------------------------------------------------------
+# Class BuildLogWriter
+#-------------------------------------------------------------------------------
+class BuildLogWriter(object):
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, kind, codepage="utf-8"):
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(logsDir(), "%s-%s" % (stamp, kind))
+        self.path = base + ".log.gz"
+        n = 1
+        while os.path.exists(self.path):
+            self.path = "%s-%d.log.gz" % (base, n)
+            n = n + 1
+        self.codepage = codepage
+        self.buffer = bytearray()
+        self.file = open(self.path, "wb")
+        self.index = open(self.path + ".idx", "wb")
+
+#-------------------------------------------------------------------------------
+# write()
+#-------------------------------------------------------------------------------
+    def write(self, line):
+        self.buffer += line.encode(self.codepage, errors='replace')
+        if len(self.buffer) >= CHUNK_SIZE:
+            self.writeChunk()
+
+#-------------------------------------------------------------------------------
+# writeChunk()
+#-------------------------------------------------------------------------------
+    def writeChunk(self):
+        if self.buffer:
+            array.array('Q', [self.file.tell()]).tofile(self.index)
+            self.file.write(gzip.compress(bytes(self.buffer), compresslevel=6))
+            self.buffer = bytearray()
+
+#-------------------------------------------------------------------------------
+# close()
+#-------------------------------------------------------------------------------
+    def close(self):
+        if self.file is not None:
+            self.writeChunk()
+            self.file.close()
+            self.index.close()
+            self.file = None
+
+#-------------------------------------------------------------------------------
+# Class BuildLogReader
+# Memory-mapped access to a log file, chunks are decompressed on demand
+#-------------------------------------------------------------------------------
+class BuildLogReader(object):
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, path, codepage="utf-8"):
+        self.path = path
+        self.codepage = codepage
+        self.cache = OrderedDict()
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else b""
+        self.offsets = array.array('Q')
+        try:
+            with open(path + ".idx", "rb") as index:
+                self.offsets.frombytes(index.read())
+        except OSError:
+            # No index, the whole file is handled as a single chunk
+            if size > 0:
+                self.offsets.append(0)
+        self.offsets.append(size)
+
+#-------------------------------------------------------------------------------
+# chunkCount()
+#-------------------------------------------------------------------------------
+    def chunkCount(self):
+        return len(self.offsets) - 1
+
+#-------------------------------------------------------------------------------
+# chunk()
+#-------------------------------------------------------------------------------
+    def chunk(self, i):
+        if i in self.cache:
+            self.cache.move_to_end(i)
+            return self.cache[i]
+        data = gzip.decompress(self.map[self.offsets[i]:self.offsets[i + 1]])
+        text = data.decode(self.codepage, errors='replace')
+        self.cache[i] = text
+        if len(self.cache) > CACHED_CHUNKS:
+            self.cache.popitem(last=False)
+        return text
+
+#-------------------------------------------------------------------------------
+# saveAs()
+# Decompress the whole log into a plain text file, chunk by chunk
+#-------------------------------------------------------------------------------
+    def saveAs(self, filename):
+        with open(filename, "w", encoding=self.codepage, errors='replace') as out:
+            for i in range(self.chunkCount()):
+                out.write(self.chunk(i))
+
+#-------------------------------------------------------------------------------
+# close()
+#-------------------------------------------------------------------------------
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import hashlib
+import json
+import os
+
+import command
+
+try:
+    import tomllib
+except ImportError:
+    # Before Python 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+#-------------------------------------------------------------------------------
+# Class BuildProfile
+# Immutable set of all the build options, see command.DEFAULT_OPTIONS
+# The lists are stored as tuples, so that a profile can be hashed and used as
+# a dict key. replace() returns a modified copy.
+#-------------------------------------------------------------------------------
+class BuildProfile():
+    __slots__ = tuple(command.DEFAULT_OPTIONS) + ("_hash",)
+
+#-------------------------------------------------------------------------------
+# __init__()
+# options is a dict of options, the missing ones get their default value
+#-------------------------------------------------------------------------------
+    def __init__(self, options=None):
+        options = options or {}
+        unknown = sorted(set(options) - set(command.DEFAULT_OPTIONS))
+        if unknown:
+            raise KeyError("Unknown build options : %s" % ", ".join(unknown))
+        for name, default in command.DEFAULT_OPTIONS.items():
+            value = options.get(name, default)
+            if isinstance(default, list):
+                value = tuple(str(v) for v in value)
+            elif isinstance(default, bool):
+                value = bool(value)
+            else:
+                value = str(value) if value is not None else default
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_hash", None)
+
+#-------------------------------------------------------------------------------
+# __setattr__()
+#-------------------------------------------------------------------------------
+    def __setattr__(self, name, value):
+        raise AttributeError("A build profile can't be modified, use replace()")
+
+#-------------------------------------------------------------------------------
+# __eq__()
+#-------------------------------------------------------------------------------
+    def __eq__(self, other):
+        return isinstance(other, BuildProfile) and all(getattr(self, n) == getattr(other, n) for n in command.DEFAULT_OPTIONS)
+
+#-------------------------------------------------------------------------------
+# __hash__()
+#-------------------------------------------------------------------------------
+    def __hash__(self):
+        return hash(self.getHash())
+
+#-------------------------------------------------------------------------------
+# __repr__()
+#-------------------------------------------------------------------------------
+    def __repr__(self):
+        return "BuildProfile(%s, %s)" % (self.main, self.getHash()[:12])
+
+#-------------------------------------------------------------------------------
+# replace()
+#-------------------------------------------------------------------------------
+    def replace(self, **changes):
+        options = self.toDict()
+        options.update(changes)
+        return BuildProfile(options)
+
+#-------------------------------------------------------------------------------
+# toDict()
+#-------------------------------------------------------------------------------
+    def toDict(self):
+        return dict((n, list(getattr(self, n)) if isinstance(getattr(self, n), tuple) else getattr(self, n)) for n in command.DEFAULT_OPTIONS)
+
+#-------------------------------------------------------------------------------
+# getChanges()
+# Return the options differing from the defaults, or from another profile
+#-------------------------------------------------------------------------------
+    def getChanges(self, other=None):
+        reference = other.toDict() if other is not None else command.DEFAULT_OPTIONS
+        return dict((n, v) for n, v in self.toDict().items() if v != reference[n])
+
+#-------------------------------------------------------------------------------
+# getHash()
+# Hash of the content, the same for equal profiles in any process
+#-------------------------------------------------------------------------------
+    def getHash(self):
+        if self._hash is None:
+            data = json.dumps(self.toDict(), sort_keys=True, separators=(',', ':'))
+            object.__setattr__(self, "_hash", hashlib.sha256(data.encode("utf-8")).hexdigest())
+        return self._hash
+
+#-------------------------------------------------------------------------------
+# getArgv()
+#-------------------------------------------------------------------------------
+    def getArgv(self, gen_mode=command.GEN_EXE):
+        return command.buildArgv(self.toDict(), gen_mode)
+
+#-------------------------------------------------------------------------------
+# getCommandLine()
+#-------------------------------------------------------------------------------
+    def getCommandLine(self, gen_mode=command.GEN_EXE):
+        return command.joinArgv(self.getArgv(gen_mode))
+
+#-------------------------------------------------------------------------------
+# getPaths()
+# Return (source_path, dist_path, work_path, name_base, name_EXE)
+#-------------------------------------------------------------------------------
+    def getPaths(self):
+        return command.getPaths(self.toDict())
+
+#-------------------------------------------------------------------------------
+# save()
+# Only the options differing from the defaults are saved, as JSON or as TOML
+# according to the extension of the file
+#-------------------------------------------------------------------------------
+    def save(self, filename):
+        options = self.getChanges()
+        with open(filename, "w", encoding="utf-8") as f:
+            if os.path.splitext(filename)[1].lower() == ".toml":
+                f.write(dumpTOML(options))
+            else:
+                json.dump(options, f, indent=1)
+
+#-------------------------------------------------------------------------------
+# load()
+#-------------------------------------------------------------------------------
+    @staticmethod
+    def load(filename):
+        if os.path.splitext(filename)[1].lower() == ".toml":
+            if tomllib is None:
+                raise ValueError("Reading %s needs Python 3.11 or the tomli package" % filename)
+            with open(filename, "rb") as f:
+                return BuildProfile(tomllib.load(f))
+        with open(filename, "r", encoding="utf-8") as f:
+            return BuildProfile(json.load(f))
+
+#-------------------------------------------------------------------------------
+# dumpTOML()
+# The options are strings, booleans and lists of strings, JSON strings are
+# valid TOML basic strings
+#-------------------------------------------------------------------------------
+def dumpTOML(options):
+    lines = []
+    for name in sorted(options):
+        value = options[name]
+        if isinstance(value, bool):
+            lines.append("%s = %s" % (name, "true" if value else "false"))
+        elif isinstance(value, list):
+            lines.append("%s = [%s]" % (name, ", ".join(json.dumps(v, ensure_ascii=False) for v in value)))
+        else:
+            lines.append("%s = %s" % (name, json.dumps(value, ensure_ascii=False)))
+    return "\n".join(lines) + "\n"
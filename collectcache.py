@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner,
+# and it is run as a script by the interpreter of PyInstaller
+#-------------------------------------------------------------------------------
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import buildcache
+
+#-------------------------------------------------------------------------------
+# Cache of the --collect-* options
+#
+# PyInstaller expands each --collect-submodules, --collect-data,
+# --collect-binaries and --collect-all package on every build, importing it
+# into a subprocess and walking its folders. The expansions are computed once
+# by the same PyInstaller functions into the interpreter of PyInstaller, and
+# cached until the distribution of the package changes (its version or the
+# mtime of its folder). The build gets them through a generated hook of an
+# empty module, instead of the --collect-* options.
+# The packages not installed from a distribution (the project's own ones) are
+# always left to PyInstaller.
+#-------------------------------------------------------------------------------
+COLLECT_OPTIONS = ('collect_submodules', 'collect_data', 'collect_binaries', 'collect_all')
+MODULE_NAME = "_guinstaller_collect"
+RESOLVE_TIMEOUT = 600
+
+#-------------------------------------------------------------------------------
+# getEntries()
+# Return the list of the (option, package) of the --collect-* options
+#-------------------------------------------------------------------------------
+def getEntries(options):
+    entries = []
+    for option in COLLECT_OPTIONS:
+        for name in options.get(option, []):
+            if (option, name) not in entries:
+                entries.append((option, name))
+    return entries
+
+#-------------------------------------------------------------------------------
+# runResolver()
+# Run this module into the interpreter of PyInstaller, return its answer or
+# None if it failed
+#-------------------------------------------------------------------------------
+def runResolver(interpreter, cwd, request):
+    try:
+        out = subprocess.run(interpreter.split() + [os.path.abspath(__file__), "--resolve"], input=json.dumps(request).encode("utf-8"), cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=RESOLVE_TIMEOUT, check=True).stdout
+        return json.loads(out.decode("utf-8").splitlines()[-1])
+    except (OSError, subprocess.SubprocessError, ValueError, IndexError):
+        return None
+
+#-------------------------------------------------------------------------------
+# getEntryFile()
+#-------------------------------------------------------------------------------
+def getEntryFile(interpreter, option, name):
+    return os.path.join(buildcache.cacheDir("collect"), buildcache.hashString("%s\0%s\0%s" % (interpreter, option, name)) + ".json")
+
+#-------------------------------------------------------------------------------
+# writeJSON()
+#-------------------------------------------------------------------------------
+def writeJSON(filename, data):
+    tmpName = "%s.%d.tmp" % (filename, os.getpid())
+    with open(tmpName, "w") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmpName, filename)
+
+#-------------------------------------------------------------------------------
+# resolve()
+# Return the dict of the cached expansions of the --collect-* options keyed
+# by (option, package), the ones missing from the cache are computed first
+# unless collectMissing is False
+#-------------------------------------------------------------------------------
+def resolve(options, cwd, interpreter=None, collectMissing=True):
+    entries = getEntries(options)
+    if not entries:
+        return {}
+    if interpreter is None:
+        interpreter = buildcache.getInterpreter()
+    answer = runResolver(interpreter, cwd, {'fingerprint': sorted(set(name for _, name in entries))})
+    if answer is None:
+        return {}
+    results = {}
+    missing = []
+    for option, name in entries:
+        fingerprint = answer['fingerprint'].get(name)
+        if fingerprint is None:
+            continue
+        try:
+            with open(getEntryFile(interpreter, option, name), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            results[(option, name)] = entry
+        else:
+            missing.append((option, name, fingerprint))
+    if missing and collectMissing:
+        answer = runResolver(interpreter, cwd, {'collect': [[option, name] for option, name, _ in missing]})
+        for i, (option, name, fingerprint) in enumerate(missing):
+            if answer is None or answer['collect'][i] is None:
+                continue
+            entry = dict(answer['collect'][i], option=option, name=name, fingerprint=fingerprint)
+            try:
+                writeJSON(getEntryFile(interpreter, option, name), entry)
+            except OSError:
+                pass
+            results[(option, name)] = entry
+    return results
+
+#-------------------------------------------------------------------------------
+# writeHook()
+# Write the empty module and its hook holding the expansions, return their
+# folder, named after their content
+#-------------------------------------------------------------------------------
+def writeHook(results):
+    hiddenimports = []
+    datas = []
+    binaries = []
+    for key in sorted(results):
+        hiddenimports.extend(results[key]['hiddenimports'])
+        datas.extend(tuple(d) for d in results[key]['datas'])
+        binaries.extend(tuple(b) for b in results[key]['binaries'])
+    text = "# Generated by GUInstaller for %s, see collectcache.py\n" % ", ".join("--%s %s" % (o.replace('_', '-'), n) for o, n in sorted(results))
+    text = text + "hiddenimports = %r\ndatas = %r\nbinaries = %r\n" % (hiddenimports, datas, binaries)
+    folder = os.path.join(buildcache.cacheDir("collect"), "hook-" + buildcache.hashString(text))
+    if not os.path.exists(folder):
+        tmpFolder = "%s.%d.tmp" % (folder, os.getpid())
+        os.makedirs(os.path.join(tmpFolder, "hooks"), exist_ok=True)
+        with open(os.path.join(tmpFolder, MODULE_NAME + ".py"), "w") as f:
+            f.write("# Empty module bringing the --collect-* expansions with its hook\n")
+        with open(os.path.join(tmpFolder, "hooks", "hook-%s.py" % MODULE_NAME), "w") as f:
+            f.write(text)
+        try:
+            os.rename(tmpFolder, folder)
+        except OSError:
+            # Written by another build at the same time
+            shutil.rmtree(tmpFolder, ignore_errors=True)
+    return folder
+
+#-------------------------------------------------------------------------------
+# expandOptions()
+# Return the options with the cached --collect-* options replaced by the
+# generated hook, and the list of the (option, package) replaced
+#-------------------------------------------------------------------------------
+def expandOptions(options, cwd, interpreter=None, collectMissing=True):
+    results = resolve(options, cwd, interpreter, collectMissing)
+    if not results:
+        return options, []
+    try:
+        folder = writeHook(results)
+    except OSError:
+        return options, []
+    options = dict(options)
+    for option in COLLECT_OPTIONS:
+        options[option] = [name for name in options.get(option, []) if (option, name) not in results]
+    options['paths'] = list(options.get('paths', [])) + [folder]
+    options['additional_hooks_dir'] = list(options.get('additional_hooks_dir', [])) + [os.path.join(folder, "hooks")]
+    options['hidden_import'] = list(options.get('hidden_import', [])) + [MODULE_NAME]
+    return options, sorted(results)
+
+#-------------------------------------------------------------------------------
+# getFingerprint()
+# Run into the interpreter of PyInstaller : the distributions and the folder
+# of the top level package of name, None if it is not installed from one
+#-------------------------------------------------------------------------------
+def getFingerprint(name, distributions):
+    import importlib.util
+    from importlib import metadata
+    top = name.split('.')[0]
+    try:
+        spec = importlib.util.find_spec(top)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or top not in distributions:
+        return None
+    path = list(spec.submodule_search_locations)[0] if spec.submodule_search_locations else spec.origin
+    versions = []
+    for dist in sorted(set(distributions[top])):
+        try:
+            versions.append("%s==%s" % (dist, metadata.version(dist)))
+        except metadata.PackageNotFoundError:
+            pass
+    try:
+        return [versions, path, os.stat(path).st_mtime_ns]
+    except (OSError, TypeError):
+        return None
+
+#-------------------------------------------------------------------------------
+# collect()
+# Run into the interpreter of PyInstaller : the expansion of an option, done
+# as the spec files written by pyi-makespec do it
+#-------------------------------------------------------------------------------
+def collect(option, name):
+    from PyInstaller.utils import hooks
+    hiddenimports = []
+    datas = []
+    binaries = []
+    if option == 'collect_submodules':
+        hiddenimports = hooks.collect_submodules(name)
+    elif option == 'collect_data':
+        datas = hooks.collect_data_files(name)
+    elif option == 'collect_binaries':
+        binaries = hooks.collect_dynamic_libs(name)
+    elif option == 'collect_all':
+        datas, binaries, hiddenimports = hooks.collect_all(name)
+    return {'hiddenimports': list(hiddenimports), 'datas': [list(d) for d in datas], 'binaries': [list(b) for b in binaries]}
+
+#-------------------------------------------------------------------------------
+# main()
+# The request is read from stdin, the answer is the last line of stdout
+#-------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if len(sys.argv) != 2 or sys.argv[1] != "--resolve":
+        print("usage: collectcache.py --resolve < request.json")
+        sys.exit(2)
+    request = json.load(sys.stdin)
+    answer = {}
+    if 'fingerprint' in request:
+        from importlib import metadata
+        distributions = metadata.packages_distributions() if hasattr(metadata, "packages_distributions") else {}
+        answer['fingerprint'] = dict((name, getFingerprint(name, distributions)) for name in request['fingerprint'])
+    if 'collect' in request:
+        answer['collect'] = []
+        for option, name in request['collect']:
+            try:
+                answer['collect'].append(collect(option, name))
+            except Exception:
+                answer['collect'].append(None)
+    sys.stdout.flush()
+    print(json.dumps(answer))
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import os
+import platform
+import shlex
+import subprocess
+
+GEN_EXE = 0
+GEN_SPEC = 1
+
+#-------------------------------------------------------------------------------
+# Default values of the build options, as they are read from the GUI
+#-------------------------------------------------------------------------------
+DEFAULT_OPTIONS = {
+    'main'                          : "",
+    'onefile'                       : False,
+    'workpath'                      : "",
+    'distpath'                      : "",
+    'specpath'                      : "",
+    'upx_dir'                       : "",
+    'ascii'                         : False,
+    'clean'                         : False,
+    'log_level'                     : "INFO",
+    'noconfirm'                     : False,
+    'name'                          : "",
+    'key'                           : "",
+    'debug'                         : "none",
+    'strip'                         : False,
+    'noupx'                         : False,
+    'paths'                         : [],
+    'add_data'                      : [],
+    'add_binary'                    : [],
+    'hidden_import'                 : [],
+    'collect_submodules'            : [],
+    'collect_data'                  : [],
+    'collect_binaries'              : [],
+    'collect_all'                   : [],
+    'copy_metadata'                 : [],
+    'recursive_copy_metadata'       : [],
+    'additional_hooks_dir'          : [],
+    'runtime_hook'                  : [],
+    'exclude_module'                : [],
+    'runtime_tmpdir'                : "",
+    'bootloader_ignore_signals'     : False,
+    'extra_options'                 : "",
+    'console'                       : False,
+    'windowed'                      : False,
+    'icon'                          : "",
+    'disable_windowed_traceback'    : False,
+    'version_file'                  : "",
+    'manifest'                      : "",
+    'resource'                      : [],
+    'uac_admin'                     : False,
+    'uac_uiaccess'                  : False,
+    'win_private_assemblies'        : False,
+    'win_no_prefer_redirects'       : False,
+    'osx_bundle_identifier'         : "",
+    'target_architecture'           : "current",
+    'codesign_identity'             : "",
+    'osx_entitlements_file'         : "",
+}
+
+#-------------------------------------------------------------------------------
+# getOptions()
+# Return a full options dict, missing keys are set to their default value
+#-------------------------------------------------------------------------------
+def getOptions(options):
+    rc = dict(DEFAULT_OPTIONS)
+    rc.update(options)
+    return rc
+
+#-------------------------------------------------------------------------------
+# isSpecFile()
+#-------------------------------------------------------------------------------
+def isSpecFile(filename):
+    return os.path.splitext(filename)[1] == ".spec"
+
+#-------------------------------------------------------------------------------
+# addValue()
+#-------------------------------------------------------------------------------
+def addValue(argv, option, value):
+    if value:
+        argv.extend([option, value])
+
+#-------------------------------------------------------------------------------
+# addFlag()
+#-------------------------------------------------------------------------------
+def addFlag(argv, option, value):
+    if value:
+        argv.append(option)
+
+#-------------------------------------------------------------------------------
+# addList()
+#-------------------------------------------------------------------------------
+def addList(argv, option, values):
+    for value in values:
+        argv.extend([option, value])
+
+#-------------------------------------------------------------------------------
+# buildArgv()
+# Return the PyInstaller command line as an argv list
+#-------------------------------------------------------------------------------
+def buildArgv(options, gen_mode=GEN_EXE):
+    opt = getOptions(options)
+    if isSpecFile(opt['main']):
+        argv = ['pyinstaller', opt['main']]
+        addValue(argv, "--workpath", opt['workpath'])
+        addValue(argv, "--distpath", opt['distpath'])
+        addValue(argv, "--upx-dir", opt['upx_dir'])
+        addFlag(argv, "--ascii", opt['ascii'])
+        addFlag(argv, "--clean", opt['clean'])
+        addFlag(argv, "--noconfirm", opt['noconfirm'])
+        return argv
+
+    if gen_mode == GEN_EXE:
+        argv = ['pyinstaller']
+    else:
+        argv = ['pyi-makespec']
+    argv.extend(['-F' if opt['onefile'] else '-D', opt['main']])
+
+    #---------------------------------------------------------------------------
+    # General options
+    #---------------------------------------------------------------------------
+    addValue(argv, "--workpath", opt['workpath'])
+    addValue(argv, "--distpath", opt['distpath'])
+    addValue(argv, "--specpath", opt['specpath'])
+    addList(argv, "--add-data", opt['add_data'])
+    addList(argv, "--add-binary", opt['add_binary'])
+    addList(argv, "--paths", opt['paths'])
+    addValue(argv, "--name", opt['name'])
+    addValue(argv, "--upx-dir", opt['upx_dir'])
+    # The following options are not recognized when generating a spec file
+    if gen_mode == GEN_EXE:
+        addFlag(argv, "--ascii", opt['ascii'])
+        addFlag(argv, "--clean", opt['clean'])
+    addValue(argv, "--log-level", opt['log_level'])
+    if gen_mode == GEN_EXE:
+        addFlag(argv, "--noconfirm", opt['noconfirm'])
+    addValue(argv, "--key", opt['key'])
+    if opt['debug'] != "none":
+        addList(argv, "--debug", [d.strip() for d in opt['debug'].split(',')])
+    addFlag(argv, "--strip", opt['strip'])
+    addFlag(argv, "--noupx", opt['noupx'])
+    addList(argv, "--hidden-import", opt['hidden_import'])
+    addList(argv, "--collect-submodules", opt['collect_submodules'])
+    addList(argv, "--collect-data", opt['collect_data'])
+    addList(argv, "--collect-binaries", opt['collect_binaries'])
+    addList(argv, "--collect-all", opt['collect_all'])
+    addList(argv, "--copy-metadata", opt['copy_metadata'])
+    addList(argv, "--recursive-copy-metadata", opt['recursive_copy_metadata'])
+    addList(argv, "--additional-hooks-dir", opt['additional_hooks_dir'])
+    addList(argv, "--runtime-hook", opt['runtime_hook'])
+    addList(argv, "--exclude-module", opt['exclude_module'])
+    addValue(argv, "--runtime-tmpdir", opt['runtime_tmpdir'])
+    addFlag(argv, "--bootloader-ignore-signals", opt['bootloader_ignore_signals'])
+
+    #---------------------------------------------------------------------------
+    # Windows and Mac OS X specific options
+    #---------------------------------------------------------------------------
+    addFlag(argv, "--console", opt['console'])
+    addFlag(argv, "--windowed", opt['windowed'])
+    addValue(argv, "--icon", opt['icon'])
+    addFlag(argv, "--disable-windowed-traceback", opt['disable_windowed_traceback'])
+
+    #---------------------------------------------------------------------------
+    # Windows specific options
+    #---------------------------------------------------------------------------
+    addValue(argv, "--version-file", opt['version_file'])
+    addValue(argv, "--manifest", opt['manifest'])
+    addList(argv, "--resource", opt['resource'])
+    addFlag(argv, "--uac-admin", opt['uac_admin'])
+    addFlag(argv, "--uac-uiaccess", opt['uac_uiaccess'])
+    addFlag(argv, "--win-private-assemblies", opt['win_private_assemblies'])
+    addFlag(argv, "--win-no-prefer-redirects", opt['win_no_prefer_redirects'])
+
+    #---------------------------------------------------------------------------
+    # Mac OS X specific options
+    #---------------------------------------------------------------------------
+    addValue(argv, "--osx-bundle-identifier", opt['osx_bundle_identifier'])
+    if opt['target_architecture'] != "current":
+        addValue(argv, "--target-architecture", opt['target_architecture'])
+    addValue(argv, "--codesign-identity", opt['codesign_identity'])
+    addValue(argv, "--osx-entitlements-file", opt['osx_entitlements_file'])
+
+    if opt['extra_options']:
+        argv.extend(shlex.split(opt['extra_options'], posix=(os.name != "nt")))
+    return argv
+
+#-------------------------------------------------------------------------------
+# buildCommandLine()
+# Return the PyInstaller command line as a string for a shell
+#-------------------------------------------------------------------------------
+def buildCommandLine(options, gen_mode=GEN_EXE):
+    return joinArgv(buildArgv(options, gen_mode))
+
+#-------------------------------------------------------------------------------
+# joinArgv()
+#-------------------------------------------------------------------------------
+def joinArgv(argv):
+    if os.name == "nt":
+        return subprocess.list2cmdline(argv)
+    return shlex.join(argv)
+
+#-------------------------------------------------------------------------------
+# getPaths()
+# Return the (source_path, dist_path, work_path, name_base, name_EXE) for the
+# options, resolved the same way as PyInstaller does
+#-------------------------------------------------------------------------------
+def getPaths(options):
+    opt = getOptions(options)
+    source_file = opt['main']
+    if not os.path.isabs(source_file):
+        source_file = os.path.join(os.path.abspath('.'), source_file)
+    source_path = os.path.split(source_file)[0]
+    name_base = opt['name'] if opt['name'] else os.path.splitext(os.path.basename(source_file))[0]
+
+    dist_path = opt['distpath'] if opt['distpath'] else os.path.join(source_path, "dist")
+    work_path = opt['workpath'] if opt['workpath'] else os.path.join(source_path, "build")
+    if not os.path.isabs(dist_path):
+        dist_path = os.path.join(source_path, dist_path)
+    if not os.path.isabs(work_path):
+        work_path = os.path.join(source_path, work_path)
+
+    if not opt['onefile']:
+        dist_path = os.path.join(dist_path, name_base)
+    name_EXE = os.path.join(dist_path, name_base)
+    if platform.system() == "Windows":
+        name_EXE = name_EXE + ".exe" if name_EXE[-4:].lower() != ".exe" else name_EXE
+    return source_path, dist_path, work_path, name_base, name_EXE
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+import settings
+
+#-------------------------------------------------------------------------------
+# Timestamp cache, the prompt only changes once per second
+#-------------------------------------------------------------------------------
+_promptSecond = None
+_promptText = ""
+
+#-------------------------------------------------------------------------------
+# nowPrompt()
+#-------------------------------------------------------------------------------
+def nowPrompt():
+    global _promptSecond
+    global _promptText
+    now = int(time.time())
+    if now != _promptSecond:
+        _promptText = time.strftime(settings.db['OUTPUT_TIMESTAMP'], time.localtime(now))
+        _promptSecond = now
+    return _promptText
+
+#-------------------------------------------------------------------------------
+# Class OutputSink
+# Collect the lines to display into the output widget and flush them by chunks
+# at a capped rate, with one document insert per chunk.
+#-------------------------------------------------------------------------------
+class OutputSink(QObject):
+
+    wakeUp = pyqtSignal()
+
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, widget):
+        super(OutputSink, self).__init__(widget)
+        self.widget = widget
+        self.pending = []
+        self.lock = threading.Lock()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(settings.db['OUTPUT_FLUSH_INTERVAL'])
+        self.timer.timeout.connect(self.flush)
+        # The signal is queued when write() is called from a shreald thread,
+        # so the timer is always started from the GUI thread
+        self.wakeUp.connect(self.schedule)
+
+#-------------------------------------------------------------------------------
+# write()
+# Add one line, prefixed with the current timestamp
+#-------------------------------------------------------------------------------
+    def write(self, line):
+        with self.lock:
+            self.pending.append(nowPrompt() + line)
+            first = len(self.pending) == 1
+        if first:
+            self.wakeUp.emit()
+
+#-------------------------------------------------------------------------------
+# schedule()
+#-------------------------------------------------------------------------------
+    def schedule(self):
+        if not self.timer.isActive():
+            self.timer.start()
+
+#-------------------------------------------------------------------------------
+# flush()
+#-------------------------------------------------------------------------------
+    def flush(self):
+        self.timer.stop()
+        with self.lock:
+            chunk, self.pending = self.pending, []
+        if chunk:
+            sb = self.widget.verticalScrollBar()
+            atBottom = sb.value() >= sb.maximum()
+            self.widget.appendPlainText("\n".join(chunk))
+            # Auto-scroll only if the user didn't scroll up to read something
+            if atBottom:
+                sb.setValue(sb.maximum())
+
+#-------------------------------------------------------------------------------
+# clear()
+#-------------------------------------------------------------------------------
+    def clear(self):
+        with self.lock:
+            self.pending = []
+        self.widget.setPlainText("")
@@ -22,6 +22,13 @@ db = {
     "APP_FOLDER"                    : ".guinstaller",
     "CONFIG_FILE"                   : "config",
     "CACHED_CONFIG_FILE"            : "cached",
+    "LOGS_FOLDER"                   : "logs",
+    "JOBS_FILE"                     : "jobs.json",
+    "CACHE_FOLDER"                  : "cache",
+    "WARM_WORKER_SOCKET"            : "warmworker.sock",
+    "HISTORY_FILE"                  : "history.db",
+    "TRASH_FILE"                    : "trash.json",
+    "STARTUP_BUDGET"                : 2.0,
     "PROGRAM_NONE"                  : "*NONE",
     "THEME_DARK_WINDOW"             : "#353535",
     "THEME_DARK_WINDOW_TEXT"        : "#ffffff",
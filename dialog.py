@@ -15,8 +15,8 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 import platform
 import os
+import json
 from datetime import date
-import pkg_resources
 
 import utils
 import const
@@ -140,3 +140,552 @@ class DlgAddData(QDialog):
         if dlg.exec():
             for iFile in dlg.selectedFiles():
                 self.txtDataDest.setText(iFile)
+
+# -------------------------------------------------------------------------------
+# class DlgLogViewer
+# -------------------------------------------------------------------------------
+class DlgLogViewer(QDialog):
+    # -------------------------------------------------------------------------------
+    # __init__()
+    # -------------------------------------------------------------------------------
+    def __init__(self, parent, codepage="utf-8"):
+        super().__init__(parent)
+
+        self.codepage = codepage
+        self.reader = None
+        self.page = 0
+        self.setWindowTitle("Build logs")
+        self.resize(900, 600)
+        mainLayout = QVBoxLayout(self)
+
+        self.cbxLogs = QComboBox()
+        import buildlog
+        for log in buildlog.listLogs():
+            self.cbxLogs.addItem(os.path.basename(log), log)
+        self.cbxLogs.currentIndexChanged.connect(self.openLog)
+        mainLayout.addWidget(self.cbxLogs)
+
+        self.txtLog = QPlainTextEdit()
+        self.txtLog.setReadOnly(True)
+        self.txtLog.setFont(QFont('Courier', 9))
+        mainLayout.addWidget(self.txtLog)
+
+        boxLayout = QHBoxLayout()
+        self.btnPrevious = QPushButton()
+        self.btnPrevious.setIcon(QIcon(utils.resource_path("pix/16x16/Player Previous.png")))
+        self.btnPrevious.clicked.connect(lambda: self.showPage(self.page - 1))
+        self.lblPage = QLabel()
+        self.btnNext = QPushButton()
+        self.btnNext.setIcon(QIcon(utils.resource_path("pix/16x16/Player Next.png")))
+        self.btnNext.clicked.connect(lambda: self.showPage(self.page + 1))
+        self.btnSave = QPushButton()
+        self.btnSave.setIcon(QIcon(utils.resource_path("pix/16x16/Save.png")))
+        self.btnSave.setToolTip("Save the full log as a text file")
+        self.btnSave.clicked.connect(self.saveLog)
+        boxLayout.addWidget(self.btnPrevious)
+        boxLayout.addWidget(self.lblPage)
+        boxLayout.addWidget(self.btnNext)
+        boxLayout.addStretch(1)
+        boxLayout.addWidget(self.btnSave)
+        mainLayout.addLayout(boxLayout)
+
+        self.openLog(0)
+
+    # -------------------------------------------------------------------------------
+    # openLog()
+    # -------------------------------------------------------------------------------
+    def openLog(self, index):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+        if index >= 0 and self.cbxLogs.count() > 0:
+            import buildlog
+            self.reader = buildlog.BuildLogReader(self.cbxLogs.itemData(index), self.codepage)
+        self.showPage(0)
+
+    # -------------------------------------------------------------------------------
+    # showPage()
+    # -------------------------------------------------------------------------------
+    def showPage(self, page):
+        count = self.reader.chunkCount() if self.reader is not None else 0
+        self.page = max(0, min(page, count - 1))
+        self.txtLog.setPlainText(self.reader.chunk(self.page) if count > 0 else "")
+        self.lblPage.setText("%d / %d" % (self.page + 1 if count > 0 else 0, count))
+        self.btnPrevious.setEnabled(self.page > 0)
+        self.btnNext.setEnabled(self.page < count - 1)
+
+    # -------------------------------------------------------------------------------
+    # saveLog()
+    # -------------------------------------------------------------------------------
+    def saveLog(self):
+        if self.reader is not None:
+            filename = QFileDialog.getSaveFileName(self, 'Save log', './', "Log file (*.log);;All files (*.*)")[0]
+            if filename != "":
+                self.reader.saveAs(filename)
+
+    # -------------------------------------------------------------------------------
+    # done()
+    # -------------------------------------------------------------------------------
+    def done(self, result):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+        super().done(result)
+
+# -------------------------------------------------------------------------------
+# class DlgMatrix
+# -------------------------------------------------------------------------------
+class DlgMatrix(QDialog):
+    # -------------------------------------------------------------------------------
+    # __init__()
+    # -------------------------------------------------------------------------------
+    def __init__(self, parent, axes):
+        super().__init__(parent)
+
+        self.setWindowTitle("Matrix build")
+        mainLayout = QVBoxLayout(self)
+        mainLayout.addWidget(QLabel("Option axes to combine"))
+        self.chkAxes = {}
+        for axis in axes:
+            self.chkAxes[axis] = QCheckBox(axis)
+            mainLayout.addWidget(self.chkAxes[axis])
+        self.chkAxes[axes[0]].setChecked(True)
+
+        buttonBox = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        buttonBox.accepted.connect(self.accept)
+        buttonBox.rejected.connect(self.reject)
+        mainLayout.addWidget(buttonBox)
+
+    # -------------------------------------------------------------------------------
+    # getAxes()
+    # -------------------------------------------------------------------------------
+    def getAxes(self):
+        return [axis for axis, chk in self.chkAxes.items() if chk.isChecked()]
+
+# -------------------------------------------------------------------------------
+# class DlgTable
+# -------------------------------------------------------------------------------
+class DlgTable(QDialog):
+    # -------------------------------------------------------------------------------
+    # __init__()
+    # -------------------------------------------------------------------------------
+    def __init__(self, title, headers, rows, parent=None, exportData=None):
+        super().__init__(parent)
+
+        self.exportData = exportData
+        self.setWindowTitle(title)
+        self.resize(800, 400)
+        layout = QVBoxLayout(self)
+        self.tblRows = QTableWidget(len(rows), len(headers))
+        self.tblRows.setHorizontalHeaderLabels(headers)
+        self.tblRows.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                item = QTableWidgetItem()
+                # Keep numbers as numbers so that the columns sort correctly
+                item.setData(Qt.DisplayRole, value)
+                self.tblRows.setItem(r, c, item)
+        self.tblRows.setSortingEnabled(True)
+        self.tblRows.resizeColumnsToContents()
+        layout.addWidget(self.tblRows)
+
+        buttonBox = QDialogButtonBox(QDialogButtonBox.Ok, self)
+        buttonBox.accepted.connect(self.accept)
+        if exportData is not None:
+            btnExport = buttonBox.addButton("Export JSON", QDialogButtonBox.ActionRole)
+            btnExport.setIcon(QIcon(utils.resource_path("pix/16x16/Save.png")))
+            btnExport.clicked.connect(self.exportJSON)
+        layout.addWidget(buttonBox)
+
+    # -------------------------------------------------------------------------------
+    # exportJSON()
+    # -------------------------------------------------------------------------------
+    def exportJSON(self):
+        filename = QFileDialog.getSaveFileName(self, 'Export', './', "JSON file (*.json);;All files (*.*)")[0]
+        if filename:
+            with open(filename, "w") as f:
+                json.dump(self.exportData, f, indent=1)
+
+# -------------------------------------------------------------------------------
+# class DlgSizeReport
+# -------------------------------------------------------------------------------
+class DlgSizeReport(QDialog):
+    # -------------------------------------------------------------------------------
+    # __init__()
+    # -------------------------------------------------------------------------------
+    def __init__(self, parent, report, offenders):
+        super().__init__(parent)
+
+        self.report = report
+        self.setWindowTitle("Size of %s" % report['artifact'])
+        self.resize(900, 500)
+        layout = QVBoxLayout(self)
+        tabs = QTabWidget()
+        total = report['total'] if report['total'] else 1
+
+        self.trwSizes = QTreeWidget()
+        self.trwSizes.setHeaderLabels(["Name", "Kind", "Size (bytes)", "Size", "%"])
+        for group in report['groups']:
+            node = self.newItem(self.trwSizes, group['name'], group['kind'], group['size'], total)
+            for item in group['items']:
+                self.newItem(node, item['name'], "", item['size'], total)
+        self.trwSizes.setSortingEnabled(True)
+        self.trwSizes.sortByColumn(2, Qt.DescendingOrder)
+        self.trwSizes.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        tabs.addTab(self.trwSizes, QIcon(utils.resource_path("pix/16x16/Tree.png")), "Packages")
+
+        self.tblOffenders = QTableWidget(len(offenders), 4)
+        self.tblOffenders.setHorizontalHeaderLabels(["Group", "Name", "Size (bytes)", "Size"])
+        self.tblOffenders.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        for r, (group, name, size) in enumerate(offenders):
+            for c, value in enumerate([group, name, size, utils.getHumanSize(size)]):
+                item = QTableWidgetItem()
+                item.setData(Qt.DisplayRole, value)
+                self.tblOffenders.setItem(r, c, item)
+        self.tblOffenders.setSortingEnabled(True)
+        self.tblOffenders.resizeColumnsToContents()
+        tabs.addTab(self.tblOffenders, QIcon(utils.resource_path("pix/16x16/Stats.png")), "Top %d offenders" % len(offenders))
+        layout.addWidget(tabs)
+
+        buttonBox = QDialogButtonBox(QDialogButtonBox.Ok, self)
+        buttonBox.accepted.connect(self.accept)
+        btnExport = buttonBox.addButton("Export JSON", QDialogButtonBox.ActionRole)
+        btnExport.setIcon(QIcon(utils.resource_path("pix/16x16/Save.png")))
+        btnExport.clicked.connect(self.exportJSON)
+        layout.addWidget(buttonBox)
+
+    # -------------------------------------------------------------------------------
+    # newItem()
+    # -------------------------------------------------------------------------------
+    def newItem(self, parent, name, kind, size, total):
+        item = QTreeWidgetItem(parent)
+        item.setText(0, name)
+        item.setText(1, kind)
+        item.setData(2, Qt.DisplayRole, size)
+        item.setText(3, utils.getHumanSize(size))
+        item.setData(4, Qt.DisplayRole, round(size * 100.0 / total, 2))
+        return item
+
+    # -------------------------------------------------------------------------------
+    # exportJSON()
+    # -------------------------------------------------------------------------------
+    def exportJSON(self):
+        filename = QFileDialog.getSaveFileName(self, 'Export', './', "JSON file (*.json);;All files (*.*)")[0]
+        if filename:
+            with open(filename, "w") as f:
+                json.dump(self.report, f, indent=1)
+
+# -------------------------------------------------------------------------------
+# class DlgExcludes
+# Candidates of --exclude-module, the checked ones are added with addModules
+# -------------------------------------------------------------------------------
+class DlgExcludes(QDialog):
+    # -------------------------------------------------------------------------------
+    # __init__()
+    # -------------------------------------------------------------------------------
+    def __init__(self, parent, candidates, measure, addModules):
+        super().__init__(parent)
+
+        self.candidates = candidates
+        self.measure = measure
+        self.addModules = addModules
+        self.setWindowTitle("Modules to exclude")
+        self.resize(1000, 500)
+        layout = QVBoxLayout(self)
+
+        self.tblCandidates = QTableWidget(len(candidates), 6)
+        self.tblCandidates.setHorizontalHeaderLabels(["Module", "Imported", "Modules saved", "Size (bytes)", "Import time (ms)", "Imported by"])
+        self.tblCandidates.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tblCandidates.horizontalHeader().setSectionResizeMode(5, QHeaderView.Stretch)
+        self.fillTable()
+        layout.addWidget(self.tblCandidates)
+
+        buttonBox = QDialogButtonBox(QDialogButtonBox.Close, self)
+        buttonBox.rejected.connect(self.reject)
+        btnMeasure = buttonBox.addButton("Measure import time", QDialogButtonBox.ActionRole)
+        btnMeasure.setIcon(QIcon(utils.resource_path("pix/16x16/Clock.png")))
+        btnMeasure.clicked.connect(self.doMeasure)
+        btnAdd = buttonBox.addButton("Exclude checked modules", QDialogButtonBox.ActionRole)
+        btnAdd.setIcon(QIcon(utils.resource_path("pix/16x16/Forbidden.png")))
+        btnAdd.clicked.connect(self.doAdd)
+        layout.addWidget(buttonBox)
+
+    # -------------------------------------------------------------------------------
+    # fillTable()
+    # -------------------------------------------------------------------------------
+    def fillTable(self):
+        self.tblCandidates.setSortingEnabled(False)
+        for r, c in enumerate(self.candidates):
+            item = QTableWidgetItem(c['module'])
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.tblCandidates.setItem(r, 0, item)
+            for col, value in enumerate([", ".join(c['kinds']), c['modules'], c['size'], c['importTime'], ", ".join(c['via'])], 1):
+                item = QTableWidgetItem()
+                item.setData(Qt.DisplayRole, value)
+                self.tblCandidates.setItem(r, col, item)
+        self.tblCandidates.setSortingEnabled(True)
+        self.tblCandidates.resizeColumnsToContents()
+
+    # -------------------------------------------------------------------------------
+    # doMeasure()
+    # -------------------------------------------------------------------------------
+    def doMeasure(self):
+        self.setCursor(Qt.WaitCursor)
+        try:
+            self.measure(self.candidates)
+        finally:
+            self.setCursor(Qt.ArrowCursor)
+        times = dict((c['module'], c['importTime']) for c in self.candidates)
+        for r in range(self.tblCandidates.rowCount()):
+            self.tblCandidates.item(r, 4).setData(Qt.DisplayRole, times[self.tblCandidates.item(r, 0).text()])
+
+    # -------------------------------------------------------------------------------
+    # doAdd()
+    # -------------------------------------------------------------------------------
+    def doAdd(self):
+        modules = [self.tblCandidates.item(r, 0).text() for r in range(self.tblCandidates.rowCount()) if self.tblCandidates.item(r, 0).checkState() == Qt.Checked]
+        if modules:
+            self.addModules(modules)
+            self.accept()
+
+# -------------------------------------------------------------------------------
+# class FlameGraph
+# Imports drawn as boxes as wide as their cumulative time, children above
+# -------------------------------------------------------------------------------
+class FlameGraph(QWidget):
+    ROW_HEIGHT = 18
+
+    # -------------------------------------------------------------------------------
+    # __init__()
+    # -------------------------------------------------------------------------------
+    def __init__(self, roots, parent=None):
+        super().__init__(parent)
+
+        self.roots = roots
+        self.boxes = []
+        self.total = sum(r['cumulative'] for r in roots) or 1
+        self.setMouseTracking(True)
+        self.setMinimumHeight((self.getDepth(roots) + 1) * self.ROW_HEIGHT)
+
+    # -------------------------------------------------------------------------------
+    # getDepth()
+    # -------------------------------------------------------------------------------
+    def getDepth(self, nodes):
+        return max([1 + self.getDepth(n['children']) for n in nodes] + [0])
+
+    # -------------------------------------------------------------------------------
+    # paintEvent()
+    # -------------------------------------------------------------------------------
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        self.boxes = []
+        self.drawNodes(painter, self.roots, 0.0, 0)
+
+    # -------------------------------------------------------------------------------
+    # drawNodes()
+    # -------------------------------------------------------------------------------
+    def drawNodes(self, painter, nodes, x, depth):
+        scale = self.width() / self.total
+        y = self.height() - (depth + 1) * self.ROW_HEIGHT
+        for node in nodes:
+            width = node['cumulative'] * scale
+            if width >= 1:
+                rect = QRectF(x, y, width, self.ROW_HEIGHT - 1)
+                # Hot colors for the modules spending time by themselves
+                ratio = node['self'] / node['cumulative'] if node['cumulative'] else 0
+                painter.fillRect(rect, QColor(255, int(220 - 160 * ratio), 60))
+                if width > 30:
+                    painter.drawText(rect.adjusted(2, 0, -2, 0), Qt.AlignVCenter | Qt.AlignLeft, painter.fontMetrics().elidedText(node['name'], Qt.ElideRight, int(width) - 4))
+                self.boxes.append((rect, node))
+                self.drawNodes(painter, node['children'], x, depth + 1)
+            x = x + width
+
+    # -------------------------------------------------------------------------------
+    # mouseMoveEvent()
+    # -------------------------------------------------------------------------------
+    def mouseMoveEvent(self, event):
+        for rect, node in self.boxes:
+            if rect.contains(QPointF(event.pos())):
+                self.setToolTip("%s\nself %.2f ms\ncumulative %.2f ms" % (node['name'], node['self'] / 1000.0, node['cumulative'] / 1000.0))
+                return
+        self.setToolTip("")
+
+# -------------------------------------------------------------------------------
+# class DlgImportProfile
+# Imports of the frozen executable, the checked offenders are added with
+# addModules to the excluded modules
+# -------------------------------------------------------------------------------
+class DlgImportProfile(QDialog):
+    # -------------------------------------------------------------------------------
+    # __init__()
+    # -------------------------------------------------------------------------------
+    def __init__(self, parent, exe, roots, modules, packages, addModules):
+        super().__init__(parent)
+
+        self.roots = roots
+        self.addModules = addModules
+        self.setWindowTitle("Imports of %s" % exe)
+        self.resize(1000, 600)
+        layout = QVBoxLayout(self)
+        tabs = QTabWidget()
+        total = sum(r['cumulative'] for r in roots) or 1
+
+        trwImports = QTreeWidget()
+        trwImports.setHeaderLabels(["Module", "Self (ms)", "Cumulative (ms)", "%"])
+        self.fillTree(trwImports, roots, total)
+        trwImports.setSortingEnabled(True)
+        trwImports.sortByColumn(2, Qt.DescendingOrder)
+        trwImports.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        tabs.addTab(trwImports, QIcon(utils.resource_path("pix/16x16/Tree.png")), "Imports")
+
+        scrFlame = QScrollArea()
+        scrFlame.setWidgetResizable(True)
+        scrFlame.setWidget(FlameGraph(roots))
+        tabs.addTab(scrFlame, QIcon(utils.resource_path("pix/16x16/Burn.png")), "Flame graph")
+
+        self.tblOffenders = QTableWidget(len(modules) + len(packages), 3)
+        self.tblOffenders.setHorizontalHeaderLabels(["Name", "Kind", "Self (ms)"])
+        self.tblOffenders.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        for r, (name, kind, selfTime) in enumerate([(n, "package", t) for n, t in packages] + [(n, "module", t) for n, t in modules]):
+            item = QTableWidgetItem(name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.tblOffenders.setItem(r, 0, item)
+            self.tblOffenders.setItem(r, 1, QTableWidgetItem(kind))
+            item = QTableWidgetItem()
+            item.setData(Qt.DisplayRole, round(selfTime / 1000.0, 2))
+            self.tblOffenders.setItem(r, 2, item)
+        self.tblOffenders.setSortingEnabled(True)
+        self.tblOffenders.resizeColumnsToContents()
+        tabs.addTab(self.tblOffenders, QIcon(utils.resource_path("pix/16x16/Stats.png")), "Top offenders")
+        layout.addWidget(tabs)
+
+        buttonBox = QDialogButtonBox(QDialogButtonBox.Close, self)
+        buttonBox.rejected.connect(self.reject)
+        btnExport = buttonBox.addButton("Export JSON", QDialogButtonBox.ActionRole)
+        btnExport.setIcon(QIcon(utils.resource_path("pix/16x16/Save.png")))
+        btnExport.clicked.connect(self.exportJSON)
+        btnAdd = buttonBox.addButton("Exclude checked modules", QDialogButtonBox.ActionRole)
+        btnAdd.setIcon(QIcon(utils.resource_path("pix/16x16/Forbidden.png")))
+        btnAdd.clicked.connect(self.doAdd)
+        layout.addWidget(buttonBox)
+
+    # -------------------------------------------------------------------------------
+    # fillTree()
+    # -------------------------------------------------------------------------------
+    def fillTree(self, parent, nodes, total):
+        for node in nodes:
+            item = QTreeWidgetItem(parent)
+            item.setText(0, node['name'])
+            item.setData(1, Qt.DisplayRole, round(node['self'] / 1000.0, 2))
+            item.setData(2, Qt.DisplayRole, round(node['cumulative'] / 1000.0, 2))
+            item.setData(3, Qt.DisplayRole, round(node['cumulative'] * 100.0 / total, 2))
+            self.fillTree(item, node['children'], total)
+
+    # -------------------------------------------------------------------------------
+    # exportJSON()
+    # -------------------------------------------------------------------------------
+    def exportJSON(self):
+        filename = QFileDialog.getSaveFileName(self, 'Export', './', "JSON file (*.json);;All files (*.*)")[0]
+        if filename:
+            with open(filename, "w") as f:
+                json.dump(self.roots, f, indent=1)
+
+    # -------------------------------------------------------------------------------
+    # doAdd()
+    # -------------------------------------------------------------------------------
+    def doAdd(self):
+        modules = [self.tblOffenders.item(r, 0).text() for r in range(self.tblOffenders.rowCount()) if self.tblOffenders.item(r, 0).checkState() == Qt.Checked]
+        if modules:
+            self.addModules(modules)
+            self.accept()
+
+# -------------------------------------------------------------------------------
+# class DlgJobs
+# -------------------------------------------------------------------------------
+class DlgJobs(QDialog):
+    # -------------------------------------------------------------------------------
+    # __init__()
+    # -------------------------------------------------------------------------------
+    def __init__(self, parent, queue, addTarget):
+        super().__init__(parent)
+
+        self.queue = queue
+        self.addTarget = addTarget
+        self.setWindowTitle("Job queue")
+        self.resize(900, 400)
+        mainLayout = QVBoxLayout(self)
+
+        self.tblJobs = QTableWidget(0, 4)
+        self.tblJobs.setHorizontalHeaderLabels(["Target", "Status", "Return code", "Time"])
+        self.tblJobs.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tblJobs.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        mainLayout.addWidget(self.tblJobs)
+
+        boxLayout = QHBoxLayout()
+        self.btnAddFiles = QPushButton("Add files")
+        self.btnAddFiles.setIcon(QIcon(utils.resource_path("pix/16x16/Document New.png")))
+        self.btnAddFiles.clicked.connect(self.addFiles)
+        self.btnAddFolder = QPushButton("Add spec files from folder")
+        self.btnAddFolder.setIcon(QIcon(utils.resource_path("pix/16x16/Folder3.png")))
+        self.btnAddFolder.clicked.connect(self.addFolder)
+        self.btnClean = QPushButton("Remove finished")
+        self.btnClean.setIcon(QIcon(utils.resource_path("pix/16x16/Trash.png")))
+        self.btnClean.clicked.connect(self.queue.removeFinished)
+        self.btnStart = QPushButton("Start")
+        self.btnStart.setIcon(QIcon(utils.resource_path("pix/16x16/Player Play.png")))
+        self.btnStart.clicked.connect(self.startQueue)
+        boxLayout.addWidget(self.btnAddFiles)
+        boxLayout.addWidget(self.btnAddFolder)
+        boxLayout.addWidget(self.btnClean)
+        boxLayout.addStretch(1)
+        boxLayout.addWidget(self.btnStart)
+        mainLayout.addLayout(boxLayout)
+
+        self.queue.jobsChanged.connect(self.refresh)
+        self.refresh()
+
+    # -------------------------------------------------------------------------------
+    # refresh()
+    # -------------------------------------------------------------------------------
+    def refresh(self):
+        jobs = list(self.queue.jobs)
+        self.tblJobs.setRowCount(len(jobs))
+        for r, job in enumerate(jobs):
+            self.tblJobs.setItem(r, 0, QTableWidgetItem(job['target']))
+            self.tblJobs.setItem(r, 1, QTableWidgetItem(job['status']))
+            self.tblJobs.setItem(r, 2, QTableWidgetItem("" if job['rc'] is None else str(job['rc'])))
+            self.tblJobs.setItem(r, 3, QTableWidgetItem("" if job['elapsed'] is None else utils.getHumanTime(job['elapsed'])))
+
+    # -------------------------------------------------------------------------------
+    # addFiles()
+    # -------------------------------------------------------------------------------
+    def addFiles(self):
+        filenames = QFileDialog.getOpenFileNames(self, 'Add files', '', 'Python sources and spec files (*.py *.pyw *.spec);;All files (*.*)', options = QFileDialog.DontUseNativeDialog)[0]
+        for filename in filenames:
+            self.addTarget(filename)
+
+    # -------------------------------------------------------------------------------
+    # addFolder()
+    # -------------------------------------------------------------------------------
+    def addFolder(self):
+        import jobqueue
+        folder = QFileDialog.getExistingDirectory(self, "Open a folder", ".", options = QFileDialog.DontUseNativeDialog | QFileDialog.ShowDirsOnly)
+        if folder:
+            for filename in jobqueue.discoverSpecFiles(folder):
+                self.addTarget(filename)
+
+    # -------------------------------------------------------------------------------
+    # startQueue()
+    # -------------------------------------------------------------------------------
+    def startQueue(self):
+        if not self.queue.isRunning():
+            self.queue.start()
+
+    # -------------------------------------------------------------------------------
+    # done()
+    # -------------------------------------------------------------------------------
+    def done(self, result):
+        self.queue.jobsChanged.disconnect(self.refresh)
+        super().done(result)
@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, the workers run on build nodes without Qt
+#-------------------------------------------------------------------------------
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+
+import buildprofile
+import command
+import trash
+
+#-------------------------------------------------------------------------------
+# Distributed builds
+#
+# Build workers listen on a TCP port (host:port) or an Unix socket (a path).
+# A worker runs any build it is sent, so it requires a shared token, read from
+# the GUINSTALLER_DIST_TOKEN environment variable or from a file, in every
+# request. The messages are neither encrypted nor signed : TCP workers must
+# only be reachable from a trusted network, they listen on localhost unless
+# told otherwise.
+# Each message is a JSON line, followed by a blob when it has a size key, the
+# blob's sha256 is checked on reception :
+#   status  -> status       running builds, slots, load average and CPU count
+#           -> denied       wrong token, for any request
+#   build   -> accepted     the build options, relative to the source folder
+#           -> busy         no free slot, the coordinator tries another worker
+#   source                  the source folder as a tar.gz blob
+#           <- line         each line printed by PyInstaller
+#           <- result       return code, and the dist folder as a tar.gz blob
+# The build is killed if the coordinator goes away, and run again on another
+# worker if the worker goes away or if the artifact is corrupted.
+#-------------------------------------------------------------------------------
+DEFAULT_PORT = 8731
+TOKEN_VARIABLE = "GUINSTALLER_DIST_TOKEN"
+CHUNK_SIZE = 1024 * 1024
+CONNECT_TIMEOUT = 10
+BUSY_WAIT = 2
+SKIPPED_FOLDERS = ("build", "dist", "matrix", "__pycache__")
+PATH_OPTIONS = ('main', 'upx_dir', 'icon', 'version_file', 'manifest', 'osx_entitlements_file')
+PATH_LIST_OPTIONS = ('paths', 'additional_hooks_dir', 'runtime_hook')
+PAIR_OPTIONS = ('add_data', 'add_binary')
+
+#-------------------------------------------------------------------------------
+# Class ChecksumError
+# A blob corrupted on its way, handled as a lost connection
+#-------------------------------------------------------------------------------
+class ChecksumError(ConnectionError):
+    pass
+
+#-------------------------------------------------------------------------------
+# parseAddress()
+# Return (family, address) of host:port, or of an Unix socket's path
+#-------------------------------------------------------------------------------
+def parseAddress(text):
+    if os.sep in text or text.startswith('.'):
+        return socket.AF_UNIX, text
+    if ':' not in text:
+        return socket.AF_INET, (text, DEFAULT_PORT)
+    host, port = text.rsplit(':', 1)
+    return socket.AF_INET, (host, int(port))
+
+#-------------------------------------------------------------------------------
+# checkToken()
+#-------------------------------------------------------------------------------
+def checkToken(request, token):
+    return hmac.compare_digest(str(request.get('token', "")).encode("utf-8"), token.encode("utf-8"))
+
+#-------------------------------------------------------------------------------
+# getChecksum()
+#-------------------------------------------------------------------------------
+def getChecksum(f):
+    digest = hashlib.sha256()
+    f.seek(0)
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+#-------------------------------------------------------------------------------
+# sendMessage()
+# blob is an optional file object, sent after the header
+#-------------------------------------------------------------------------------
+def sendMessage(conn, header, blob=None):
+    if blob is not None:
+        header['sha256'] = getChecksum(blob)
+        header['size'] = blob.tell()
+        blob.seek(0)
+    conn.sendall(json.dumps(header).encode("utf-8") + b"\n")
+    if blob is not None:
+        for chunk in iter(lambda: blob.read(CHUNK_SIZE), b""):
+            conn.sendall(chunk)
+
+#-------------------------------------------------------------------------------
+# receiveMessage()
+# The blob, if any, is written into the file object blob
+#-------------------------------------------------------------------------------
+def receiveMessage(reader, blob=None):
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("connection closed")
+    header = json.loads(line)
+    if 'size' not in header:
+        return header
+    size = header['size']
+    digest = hashlib.sha256()
+    while size > 0:
+        chunk = reader.read(min(size, CHUNK_SIZE))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        digest.update(chunk)
+        if blob is not None:
+            blob.write(chunk)
+        size = size - len(chunk)
+    if digest.hexdigest() != header['sha256']:
+        raise ChecksumError("checksum mismatch of the %s received" % header['type'])
+    return header
+
+#-------------------------------------------------------------------------------
+# makeArchive()
+# Write the content of folder into f as a tar.gz, without PyInstaller outputs
+# nor hidden folders
+#-------------------------------------------------------------------------------
+def makeArchive(folder, f, skipped=()):
+    with tarfile.open(fileobj=f, mode="w:gz") as archive:
+        for root, dirs, files in os.walk(folder):
+            dirs[:] = sorted(d for d in dirs if d not in skipped and not d.startswith('.'))
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                archive.add(path, os.path.relpath(path, folder).replace(os.sep, "/"), recursive=False)
+            for name in dirs:
+                if os.path.islink(os.path.join(root, name)):
+                    path = os.path.join(root, name)
+                    archive.add(path, os.path.relpath(path, folder).replace(os.sep, "/"), recursive=False)
+
+#-------------------------------------------------------------------------------
+# extractArchive()
+# Extract the tar.gz f into folder, refusing the paths going out of it
+#-------------------------------------------------------------------------------
+def extractArchive(f, folder):
+    f.seek(0)
+    with tarfile.open(fileobj=f, mode="r:gz") as archive:
+        if hasattr(tarfile, "data_filter"):
+            archive.extractall(folder, filter="data")
+            return
+        for member in archive.getmembers():
+            names = [member.name] + ([member.linkname] if member.issym() or member.islnk() else [])
+            if member.isdev() or any(n.startswith('/') or ".." in n.split('/') for n in names):
+                raise tarfile.TarError("unsafe member %s" % member.name)
+        archive.extractall(folder)
+
+#-------------------------------------------------------------------------------
+# installArtifact()
+# Extract the artifact into dist_path, replacing the files and folders of the
+# previous build (a onefile executable where a onedir build goes or the
+# reverse). Extracted aside first, the previous build is kept if it fails.
+#-------------------------------------------------------------------------------
+def installArtifact(artifact, dist_path):
+    with tempfile.TemporaryDirectory(prefix="guinstaller-dist-", dir=os.path.dirname(dist_path)) as folder:
+        extractArchive(artifact, folder)
+        os.makedirs(dist_path, exist_ok=True)
+        for name in os.listdir(folder):
+            target = os.path.join(dist_path, name)
+            if os.path.isdir(target) and not os.path.islink(target):
+                trash.moveToTrash(target)
+            elif os.path.lexists(target):
+                os.remove(target)
+            os.replace(os.path.join(folder, name), target)
+
+#-------------------------------------------------------------------------------
+# toRelative()
+# A path under root made relative to it, the other ones are kept as they are
+# and have to exist on the workers
+#-------------------------------------------------------------------------------
+def toRelative(path, root):
+    if not path or not os.path.isabs(path):
+        return path
+    try:
+        relative = os.path.relpath(path, root)
+    except ValueError:
+        # Not on the same drive
+        return path
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return path
+    return relative.replace(os.sep, "/")
+
+#-------------------------------------------------------------------------------
+# exportOptions()
+# Build options of the profile with the paths relative to the source folder
+#-------------------------------------------------------------------------------
+def exportOptions(profile, root):
+    options = profile.toDict()
+    for name in PATH_OPTIONS:
+        options[name] = toRelative(options[name], root)
+    for name in PATH_LIST_OPTIONS:
+        options[name] = [toRelative(v, root) for v in options[name]]
+    for name in PAIR_OPTIONS:
+        pairs = []
+        for value in options[name]:
+            src, sep, dst = value.rpartition(os.pathsep)
+            pairs.append(toRelative(src, root) + sep + dst if sep else toRelative(value, root))
+        options[name] = pairs
+    # Written into the worker's temporary folder
+    for name in ('workpath', 'distpath', 'specpath'):
+        options[name] = ""
+    return options
+
+#-------------------------------------------------------------------------------
+# importOptions()
+# Profile of the options received by a worker, built under folder
+#-------------------------------------------------------------------------------
+def importOptions(options, pathsep, folder):
+    profile = buildprofile.BuildProfile(options)
+    pairs = {}
+    for name in PAIR_OPTIONS:
+        pairs[name] = [os.pathsep.join(v.rsplit(pathsep, 1)) for v in getattr(profile, name)]
+    return profile.replace(workpath=os.path.join(folder, "build"), distpath=os.path.join(folder, "dist"), specpath=os.path.join(folder, "source"), noconfirm=True, **pairs)
+
+#-------------------------------------------------------------------------------
+# Class WorkerHandler
+# One connection of the coordinator
+#-------------------------------------------------------------------------------
+class WorkerHandler(socketserver.StreamRequestHandler):
+
+#-------------------------------------------------------------------------------
+# handle()
+#-------------------------------------------------------------------------------
+    def handle(self):
+        try:
+            request = receiveMessage(self.rfile)
+            if not checkToken(request, self.server.token):
+                print("Request from %s denied : wrong token" % (self.client_address,), flush=True)
+                sendMessage(self.connection, {'type': "denied"})
+                return
+            if request['type'] == "status":
+                sendMessage(self.connection, self.server.getStatus())
+            elif request['type'] == "build":
+                if not self.server.acquire():
+                    sendMessage(self.connection, {'type': "busy"})
+                    return
+                try:
+                    sendMessage(self.connection, {'type': "accepted"})
+                    with tempfile.TemporaryDirectory(prefix="guinstaller-worker-") as folder:
+                        self.runBuild(request, folder)
+                finally:
+                    self.server.release()
+        except (OSError, ValueError, KeyError, tarfile.TarError) as error:
+            print("Build request from %s failed : %s" % (self.client_address, error), flush=True)
+
+#-------------------------------------------------------------------------------
+# sendLine()
+#-------------------------------------------------------------------------------
+    def sendLine(self, text):
+        sendMessage(self.connection, {'type': "line", 'text': text})
+
+#-------------------------------------------------------------------------------
+# runBuild()
+#-------------------------------------------------------------------------------
+    def runBuild(self, request, folder):
+        source = os.path.join(folder, "source")
+        with tempfile.TemporaryFile() as f:
+            receiveMessage(self.rfile, f)
+            extractArchive(f, source)
+        profile = importOptions(request['options'], request['pathsep'], folder)
+        argv = profile.getArgv()
+        self.sendLine("$> %s" % command.joinArgv(argv))
+        try:
+            process = subprocess.Popen(argv, cwd=source, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        except OSError as error:
+            self.sendLine("Can't run %s : %s" % (argv[0], error))
+            sendMessage(self.connection, {'type': "result", 'rc': 127})
+            return
+        try:
+            for line in iter(process.stdout.readline, b''):
+                self.sendLine(line.decode("utf-8", errors="replace").rstrip())
+            rc = process.wait()
+        except OSError:
+            # The coordinator went away
+            process.kill()
+            process.wait()
+            raise
+        if rc != 0:
+            sendMessage(self.connection, {'type': "result", 'rc': rc})
+            return
+        with tempfile.TemporaryFile() as f:
+            makeArchive(profile.distpath, f)
+            sendMessage(self.connection, {'type': "result", 'rc': rc}, f)
+
+#-------------------------------------------------------------------------------
+# Class WorkerServer
+#-------------------------------------------------------------------------------
+class WorkerServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, address, slots, token):
+        family, address = parseAddress(address)
+        self.address_family = family
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.remove(address)
+        super(WorkerServer, self).__init__(address, WorkerHandler)
+        self.slots = slots
+        self.token = token
+        self.running = 0
+        self.lock = threading.Lock()
+
+#-------------------------------------------------------------------------------
+# acquire()
+#-------------------------------------------------------------------------------
+    def acquire(self):
+        with self.lock:
+            if self.running >= self.slots:
+                return False
+            self.running = self.running + 1
+            return True
+
+#-------------------------------------------------------------------------------
+# release()
+#-------------------------------------------------------------------------------
+    def release(self):
+        with self.lock:
+            self.running = self.running - 1
+
+#-------------------------------------------------------------------------------
+# getStatus()
+#-------------------------------------------------------------------------------
+    def getStatus(self):
+        return {'type': "status", 'running': self.running, 'slots': self.slots, 'load': os.getloadavg()[0], 'cpus': os.cpu_count() or 1, 'host': socket.gethostname()}
+
+#-------------------------------------------------------------------------------
+# Class Coordinator
+# Place the builds on the least loaded workers
+#-------------------------------------------------------------------------------
+class Coordinator():
+
+#-------------------------------------------------------------------------------
+# __init__()
+# workers is a comma separated list of addresses, the token is read from the
+# environment if not given
+#-------------------------------------------------------------------------------
+    def __init__(self, workers, retries=3, token=None):
+        self.workers = [w.strip() for w in workers.split(',') if w.strip()]
+        self.retries = retries
+        self.token = token or os.environ.get(TOKEN_VARIABLE, "")
+
+#-------------------------------------------------------------------------------
+# connect()
+#-------------------------------------------------------------------------------
+    def connect(self, worker):
+        family, address = parseAddress(worker)
+        conn = socket.socket(family, socket.SOCK_STREAM)
+        conn.settimeout(CONNECT_TIMEOUT)
+        try:
+            conn.connect(address)
+        except OSError:
+            conn.close()
+            raise
+        conn.settimeout(None)
+        if family != socket.AF_UNIX:
+            # A node going down is noticed during the long silent phases too
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+        return conn
+
+#-------------------------------------------------------------------------------
+# getStatus()
+# Return the status of a worker, None if it can't be reached or denies the
+# token
+#-------------------------------------------------------------------------------
+    def getStatus(self, worker):
+        try:
+            with self.connect(worker) as conn:
+                conn.settimeout(CONNECT_TIMEOUT)
+                sendMessage(conn, {'type': "status", 'token': self.token})
+                status = receiveMessage(conn.makefile("rb"))
+        except (OSError, ValueError):
+            return None
+        return status if status['type'] == "status" else None
+
+#-------------------------------------------------------------------------------
+# getStatuses()
+# Return the dict of the reachable workers' status
+#-------------------------------------------------------------------------------
+    def getStatuses(self, excluded=()):
+        statuses = {}
+        for worker in self.workers:
+            if worker not in excluded:
+                status = self.getStatus(worker)
+                if status is not None:
+                    statuses[worker] = status
+        return statuses
+
+#-------------------------------------------------------------------------------
+# getCapacity()
+# Number of builds the reachable workers can run at the same time
+#-------------------------------------------------------------------------------
+    def getCapacity(self):
+        return sum(status['slots'] for status in self.getStatuses().values())
+
+#-------------------------------------------------------------------------------
+# pickWorker()
+# The worker with the most free slots, then the lowest load per CPU
+#-------------------------------------------------------------------------------
+    def pickWorker(self, statuses):
+        free = [w for w, s in statuses.items() if s['running'] < s['slots']]
+        if not free:
+            return None
+        return min(free, key=lambda w: (statuses[w]['running'] / statuses[w]['slots'], statuses[w]['load'] / statuses[w]['cpus']))
+
+#-------------------------------------------------------------------------------
+# build()
+# Build the profile on a worker and extract its dist folder locally, return
+# the return code, -1 if no worker could build it or if its artifact can't be
+# extracted. Only the connection and protocol errors are retried on another
+# worker.
+# printLine receives the build's output, printEvent the placements and retries
+#-------------------------------------------------------------------------------
+    def build(self, profile, printLine, printEvent):
+        source_path, dist_path, _, _, _ = profile.getPaths()
+        profile = profile.replace(main=os.path.join(source_path, os.path.basename(profile.main)))
+        if not profile.onefile:
+            dist_path = os.path.dirname(dist_path)
+        request = {'type': "build", 'token': self.token, 'options': exportOptions(profile, source_path), 'pathsep': os.pathsep}
+        with tempfile.TemporaryFile() as source, tempfile.TemporaryFile() as artifact:
+            makeArchive(source_path, source, SKIPPED_FOLDERS)
+            lost = set()
+            attempts = 0
+            while attempts <= self.retries:
+                # The lost workers are tried again when there's no other one
+                statuses = self.getStatuses(lost) or self.getStatuses()
+                if not statuses:
+                    break
+                worker = self.pickWorker(statuses)
+                if worker is None:
+                    time.sleep(BUSY_WAIT)
+                    continue
+                try:
+                    rc = self.runBuild(worker, statuses[worker], request, source, artifact, printLine, printEvent)
+                except (OSError, ValueError) as error:
+                    printEvent("Build worker %s lost : %s" % (worker, error))
+                    lost.add(worker)
+                    attempts = attempts + 1
+                    continue
+                if rc is None:
+                    continue
+                if rc == 0:
+                    try:
+                        installArtifact(artifact, dist_path)
+                    except (OSError, tarfile.TarError) as error:
+                        printEvent("Can't extract the artifact of %s into %s : %s" % (worker, dist_path, error))
+                        return -1
+                    printEvent("Artifact of %s checked and extracted into %s" % (worker, dist_path))
+                return rc
+        printEvent("No build worker available for %s" % profile.main)
+        return -1
+
+#-------------------------------------------------------------------------------
+# runBuild()
+# Return the return code, None if the worker was busy, the dist folder built
+# is written into artifact
+#-------------------------------------------------------------------------------
+    def runBuild(self, worker, status, request, source, artifact, printLine, printEvent):
+        artifact.seek(0)
+        artifact.truncate()
+        with self.connect(worker) as conn:
+            reader = conn.makefile("rb")
+            sendMessage(conn, request)
+            if receiveMessage(reader)['type'] != "accepted":
+                return None
+            printEvent("Building %s on %s (%s)" % (os.path.basename(request['options']['main']), worker, status['host']))
+            sendMessage(conn, {'type': "source"}, source)
+            message = receiveMessage(reader, artifact)
+            while message['type'] == "line":
+                printLine(message['text'])
+                message = receiveMessage(reader, artifact)
+            return message['rc']
+
+#-------------------------------------------------------------------------------
+# main()
+#-------------------------------------------------------------------------------
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(prog="distbuild.py", description="GUInstaller build worker, to be exposed on a trusted network only")
+    parser.add_argument("--worker", action="store_true", required=True, help="run a build worker")
+    parser.add_argument("--listen", default="127.0.0.1:%d" % DEFAULT_PORT, metavar="ADDRESS", help="host:port or Unix socket path (default: %(default)s)")
+    parser.add_argument("--slots", type=int, default=os.cpu_count() or 1, help="builds run at the same time (default: %(default)s)")
+    parser.add_argument("--token-file", metavar="FILE", help="file holding the shared token (default: the %s environment variable)" % TOKEN_VARIABLE)
+    opts = parser.parse_args()
+    if opts.token_file:
+        with open(opts.token_file, "r") as f:
+            token = f.read().strip()
+    else:
+        token = os.environ.get(TOKEN_VARIABLE, "")
+    if not token:
+        parser.error("a shared token is required, set %s or use --token-file" % TOKEN_VARIABLE)
+    server = WorkerServer(opts.listen, opts.slots, token)
+    print("Build worker listening on %s with %d slot(s)" % (opts.listen, opts.slots), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+#-------------------------------------------------------------------------------
+# Index of the distributions installed for this interpreter, read with
+# importlib.metadata and saved into the cache folder. It is valid as long as
+# the mtimes of the sys.path folders don't change, installing or removing a
+# distribution changes the mtime of its site-packages folder.
+#-------------------------------------------------------------------------------
+INDEX_VERSION = 1
+CHECK_INTERVAL = 2
+
+_lock = threading.Lock()
+_index = None
+_checked = 0
+
+#-------------------------------------------------------------------------------
+# normalizeName()
+# PEP 503 normalized name of a distribution
+#-------------------------------------------------------------------------------
+def normalizeName(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+#-------------------------------------------------------------------------------
+# indexFile()
+#-------------------------------------------------------------------------------
+def indexFile():
+    # Imported here, the index is loaded in the background
+    import buildcache
+    return os.path.join(buildcache.cacheDir("dists"), "index-%s.json" % buildcache.hashString(sys.executable))
+
+#-------------------------------------------------------------------------------
+# getPathTimes()
+# mtimes of the folders distributions are searched into
+#-------------------------------------------------------------------------------
+def getPathTimes():
+    times = {}
+    for folder in sys.path:
+        try:
+            times[folder or "."] = os.stat(folder or ".").st_mtime_ns
+        except OSError:
+            pass
+    return times
+
+#-------------------------------------------------------------------------------
+# buildIndex()
+# The first distribution found along sys.path wins, as for the imports
+#-------------------------------------------------------------------------------
+def buildIndex(times):
+    from importlib import metadata
+    dists = {}
+    for dist in metadata.distributions():
+        name = dist.metadata['Name']
+        if not name or normalizeName(name) in dists:
+            continue
+        dists[normalizeName(name)] = {
+            'name': name,
+            'version': dist.version,
+            'location': str(dist.locate_file("")),
+            'files': [str(f) for f in dist.files or []],
+        }
+    return {'version': INDEX_VERSION, 'paths': times, 'dists': dists}
+
+#-------------------------------------------------------------------------------
+# loadIndex()
+# Return the saved index if it is still valid, otherwise build and save it
+#-------------------------------------------------------------------------------
+def loadIndex(times):
+    filename = indexFile()
+    try:
+        with open(filename, "r") as f:
+            index = json.load(f)
+        if index['version'] == INDEX_VERSION and index['paths'] == times:
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    index = buildIndex(times)
+    try:
+        tmpName = "%s.%d.tmp" % (filename, os.getpid())
+        with open(tmpName, "w") as f:
+            json.dump(index, f)
+        os.replace(tmpName, filename)
+    except OSError:
+        pass
+    return index
+
+#-------------------------------------------------------------------------------
+# getIndex()
+# The sys.path folders are checked again every CHECK_INTERVAL seconds
+#-------------------------------------------------------------------------------
+def getIndex():
+    global _index
+    global _checked
+    with _lock:
+        if _index is None or time.time() - _checked > CHECK_INTERVAL:
+            times = getPathTimes()
+            if _index is None or _index['paths'] != times:
+                _index = loadIndex(times)
+            _checked = time.time()
+        return _index
+
+#-------------------------------------------------------------------------------
+# startLoading()
+# Load the index in the background, so that the first query doesn't wait
+#-------------------------------------------------------------------------------
+def startLoading():
+    threading.Thread(target=getIndex, daemon=True).start()
+
+#-------------------------------------------------------------------------------
+# getDistributions()
+# Return the list of (name, version) of all the distributions
+#-------------------------------------------------------------------------------
+def getDistributions():
+    return sorted((d['name'], d['version']) for d in getIndex()['dists'].values())
+
+#-------------------------------------------------------------------------------
+# getDistribution()
+# Return the dict name, version, location and files of a distribution, or None
+#-------------------------------------------------------------------------------
+def getDistribution(name):
+    return getIndex()['dists'].get(normalizeName(name))
+
+#-------------------------------------------------------------------------------
+# getVersion()
+#-------------------------------------------------------------------------------
+def getVersion(name):
+    dist = getDistribution(name)
+    return dist['version'] if dist is not None else None
+
+#-------------------------------------------------------------------------------
+# getFiles()
+# Files of a distribution, relative to its location
+#-------------------------------------------------------------------------------
+def getFiles(name):
+    dist = getDistribution(name)
+    return dist['files'] if dist is not None else []
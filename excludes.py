@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import ast
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+#-------------------------------------------------------------------------------
+# Kinds of the import edges, only the top level ones are always executed
+#-------------------------------------------------------------------------------
+EDGE_TOP = "top level"
+EDGE_GUARDED = "try/except"
+EDGE_CONDITIONAL = "conditional"
+EDGE_LAZY = "in function"
+EDGE_TYPING = "type checking"
+EDGE_DYNAMIC = "dynamic"
+
+GUARD_EXCEPTIONS = ("ImportError", "ModuleNotFoundError", "Exception", "BaseException")
+DYNAMIC_IMPORTS = ("import_module", "__import__")
+# Modules of PyInstaller's base_library.zip, needed by the bootloader
+BASE_LIBRARY = ("_collections_abc", "_weakrefset", "abc", "codecs", "collections", "copyreg", "encodings", "enum", "functools",
+                "genericpath", "heapq", "io", "keyword", "linecache", "locale", "ntpath", "operator", "os", "posixpath", "re",
+                "reprlib", "sre_compile", "sre_constants", "sre_parse", "stat", "traceback", "types", "warnings", "weakref")
+
+_interpreters = {}
+
+#-------------------------------------------------------------------------------
+# getInterpreterInfo()
+# Return the sys.path, extension suffixes and builtin modules of an interpreter
+#-------------------------------------------------------------------------------
+def getInterpreterInfo(interpreter):
+    if interpreter not in _interpreters:
+        script = "import importlib.machinery, json, sys; print(json.dumps({'path': sys.path[1:], 'suffixes': importlib.machinery.EXTENSION_SUFFIXES, 'builtins': sys.builtin_module_names}))"
+        try:
+            out = subprocess.check_output(interpreter.split() + ["-c", script], stderr=subprocess.DEVNULL, timeout=30)
+            _interpreters[interpreter] = json.loads(out.decode("utf-8", errors="replace"))
+        except (OSError, subprocess.SubprocessError, ValueError):
+            import importlib.machinery
+            _interpreters[interpreter] = {'path': sys.path[1:], 'suffixes': importlib.machinery.EXTENSION_SUFFIXES, 'builtins': sys.builtin_module_names}
+    return _interpreters[interpreter]
+
+#-------------------------------------------------------------------------------
+# isGuard()
+# True if a try statement catches a failed import
+#-------------------------------------------------------------------------------
+def isGuard(node):
+    for handler in node.handlers:
+        if handler.type is None:
+            return True
+        names = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+        for name in names:
+            if isinstance(name, ast.Name) and name.id in GUARD_EXCEPTIONS:
+                return True
+    return False
+
+#-------------------------------------------------------------------------------
+# Class ImportVisitor
+# Collect the imports of a module with the kind of their edge
+#-------------------------------------------------------------------------------
+class ImportVisitor(ast.NodeVisitor):
+
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, package):
+        self.package = package
+        self.kinds = [EDGE_TOP]
+        self.imports = []
+
+#-------------------------------------------------------------------------------
+# visitWithKind()
+#-------------------------------------------------------------------------------
+    def visitWithKind(self, nodes, kind):
+        self.kinds.append(kind)
+        for node in nodes:
+            self.visit(node)
+        self.kinds.pop()
+
+#-------------------------------------------------------------------------------
+# add()
+#-------------------------------------------------------------------------------
+    def add(self, name, isFrom=False):
+        if name:
+            self.imports.append((name, self.kinds[-1], isFrom))
+
+#-------------------------------------------------------------------------------
+# resolveRelative()
+#-------------------------------------------------------------------------------
+    def resolveRelative(self, module, level):
+        parts = self.package.split('.') if self.package else []
+        if level - 1 > len(parts):
+            return None
+        base = parts[:len(parts) - (level - 1)]
+        return ".".join(base + ([module] if module else []))
+
+#-------------------------------------------------------------------------------
+# visit_Import()
+#-------------------------------------------------------------------------------
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.add(alias.name)
+
+#-------------------------------------------------------------------------------
+# visit_ImportFrom()
+#-------------------------------------------------------------------------------
+    def visit_ImportFrom(self, node):
+        module = node.module if node.level == 0 else self.resolveRelative(node.module, node.level)
+        if module is None:
+            return
+        self.add(module)
+        for alias in node.names:
+            if alias.name != '*':
+                # Either a submodule or a name of the module, checked later
+                self.add((module + "." if module else "") + alias.name, True)
+
+#-------------------------------------------------------------------------------
+# visit_Try()
+#-------------------------------------------------------------------------------
+    def visit_Try(self, node):
+        if isGuard(node):
+            self.visitWithKind(node.body + node.handlers, EDGE_GUARDED)
+        else:
+            self.visitWithKind(node.body + node.handlers, self.kinds[-1])
+        self.visitWithKind(node.orelse + node.finalbody, self.kinds[-1])
+
+#-------------------------------------------------------------------------------
+# visit_If()
+#-------------------------------------------------------------------------------
+    def visit_If(self, node):
+        test = ast.dump(node.test)
+        if "TYPE_CHECKING" in test:
+            self.visitWithKind(node.body, EDGE_TYPING)
+            self.visitWithKind(node.orelse, self.kinds[-1])
+        elif "'__name__'" in test and "'__main__'" in test:
+            # The main block of the script is run
+            self.generic_visit(node)
+        else:
+            self.visitWithKind(node.body + node.orelse, EDGE_CONDITIONAL if self.kinds[-1] == EDGE_TOP else self.kinds[-1])
+
+#-------------------------------------------------------------------------------
+# visit_FunctionDef()
+#-------------------------------------------------------------------------------
+    def visit_FunctionDef(self, node):
+        self.visitWithKind(node.body, EDGE_LAZY)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+#-------------------------------------------------------------------------------
+# visit_Lambda()
+#-------------------------------------------------------------------------------
+    def visit_Lambda(self, node):
+        self.visitWithKind([node.body], EDGE_LAZY)
+
+#-------------------------------------------------------------------------------
+# visit_Call()
+# importlib.import_module("name") and __import__("name")
+#-------------------------------------------------------------------------------
+    def visit_Call(self, node):
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else func.id if isinstance(func, ast.Name) else None
+        if name in DYNAMIC_IMPORTS and node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+            self.kinds.append(EDGE_DYNAMIC)
+            self.add(node.args[0].value)
+            self.kinds.pop()
+        self.generic_visit(node)
+
+#-------------------------------------------------------------------------------
+# Class ImportGraph
+# Import graph of a script, built with ast, the modules are not imported
+#-------------------------------------------------------------------------------
+class ImportGraph():
+
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, main, paths=(), interpreter=None):
+        info = getInterpreterInfo(interpreter or sys.executable)
+        self.main = os.path.abspath(main)
+        self.projectRoots = [os.path.dirname(self.main)] + [os.path.abspath(p) for p in paths if os.path.isdir(p)]
+        self.roots = self.projectRoots + [p for p in info['path'] if p and os.path.isdir(p)]
+        self.suffixes = info['suffixes']
+        self.builtins = set(info['builtins'])
+        # name : (kind, filename, folder of a package or None)
+        self.modules = {}
+        # name : list of (imported name, edge kind)
+        self.edges = {}
+        self.build()
+
+#-------------------------------------------------------------------------------
+# findModule()
+# Return (kind, filename, package folder) of a module, or None
+#-------------------------------------------------------------------------------
+    def findModule(self, name):
+        if name in self.modules:
+            return self.modules[name]
+        found = None
+        if name in self.builtins:
+            found = ("builtin", None, None)
+        else:
+            parent, _, last = name.rpartition('.')
+            if parent:
+                parentModule = self.findModule(parent)
+                folders = [parentModule[2]] if parentModule is not None and parentModule[2] else []
+            else:
+                folders = self.roots
+            for folder in folders:
+                path = os.path.join(folder, last)
+                if os.path.isfile(os.path.join(path, "__init__.py")):
+                    found = ("package", os.path.join(path, "__init__.py"), path)
+                elif os.path.isfile(path + ".py"):
+                    found = ("module", path + ".py", None)
+                else:
+                    for suffix in self.suffixes:
+                        if os.path.isfile(path + suffix):
+                            found = ("extension", path + suffix, None)
+                            break
+                    if found is None and os.path.isdir(path) and not parent:
+                        found = ("namespace", None, path)
+                if found is not None:
+                    break
+        self.modules[name] = found
+        return found
+
+#-------------------------------------------------------------------------------
+# build()
+#-------------------------------------------------------------------------------
+    def build(self):
+        self.modules["__main__"] = ("script", self.main, None)
+        todo = ["__main__"]
+        while todo:
+            name = todo.pop()
+            kind, filename, folder = self.modules[name]
+            self.edges[name] = []
+            if kind not in ("script", "module", "package"):
+                continue
+            try:
+                with open(filename, "rb") as f:
+                    tree = ast.parse(f.read(), filename)
+            except (SyntaxError, ValueError, OSError):
+                continue
+            package = name if kind == "package" else name.rpartition('.')[0]
+            visitor = ImportVisitor("" if name == "__main__" else package)
+            visitor.visit(tree)
+            for imported, edgeKind, isFrom in visitor.imports:
+                if isFrom and self.findModule(imported) is None:
+                    continue
+                # Importing a.b.c runs a and a.b first
+                parts = imported.split('.')
+                for i in range(1, len(parts) + 1):
+                    target = ".".join(parts[:i])
+                    if self.findModule(target) is None:
+                        break
+                    self.edges[name].append((target, edgeKind))
+                    if target not in self.edges and target not in todo:
+                        todo.append(target)
+
+#-------------------------------------------------------------------------------
+# reach()
+# Modules reachable from the script, through the top level edges only if
+# strong, never entering the blocked top level packages
+#-------------------------------------------------------------------------------
+    def reach(self, strong=False, blocked=()):
+        seen = set(["__main__"])
+        todo = ["__main__"]
+        while todo:
+            for target, kind in self.edges.get(todo.pop(), []):
+                if target in seen or (strong and kind != EDGE_TOP) or target.split('.')[0] in blocked:
+                    continue
+                seen.add(target)
+                todo.append(target)
+        return seen
+
+#-------------------------------------------------------------------------------
+# getSize()
+#-------------------------------------------------------------------------------
+    def getSize(self, names):
+        size = 0
+        for name in names:
+            module = self.modules.get(name)
+            if module is not None and module[1] is not None:
+                try:
+                    size += os.path.getsize(module[1])
+                except OSError:
+                    pass
+        return size
+
+#-------------------------------------------------------------------------------
+# isProject()
+#-------------------------------------------------------------------------------
+    def isProject(self, name):
+        module = self.modules.get(name)
+        path = module[1] or module[2] if module is not None else None
+        return path is not None and any(path.startswith(root + os.sep) for root in self.projectRoots)
+
+#-------------------------------------------------------------------------------
+# isAccelerator()
+# A C accelerator of a pure Python module, like _json, imported under a guard
+# so that the module still works without it, but slower
+#-------------------------------------------------------------------------------
+    def isAccelerator(self, name, kinds):
+        return name.startswith('_') and self.modules[name][0] == "extension" and EDGE_GUARDED in kinds
+
+#-------------------------------------------------------------------------------
+# getCandidates()
+# Top level packages entered by an optional edge from a module of the project
+# always imported, and never by a top level one, with the modules and bytes
+# their exclusion would save. The optional imports of the stdlib and of the
+# third party packages are theirs, excluding them can break these packages.
+#-------------------------------------------------------------------------------
+    def getCandidates(self, excluded=()):
+        excluded = set(excluded)
+        reachable = self.reach(blocked=excluded)
+        strongModules = self.reach(strong=True, blocked=excluded)
+        strong = set(n.split('.')[0] for n in strongModules)
+        entries = {}
+        for importer in sorted(strongModules):
+            if not self.isProject(importer):
+                continue
+            for target, kind in self.edges.get(importer, []):
+                top = target.split('.')[0]
+                if top not in strong and top not in excluded and (importer, kind) not in entries.setdefault(top, []):
+                    entries[top].append((importer, kind))
+        candidates = []
+        for top, via in sorted(entries.items()):
+            kinds = sorted(set(kind for _, kind in via))
+            if self.modules[top][0] == "builtin" or top in BASE_LIBRARY or self.isProject(top) or self.isAccelerator(top, kinds):
+                continue
+            saved = reachable - self.reach(blocked=excluded | set([top]))
+            candidates.append({
+                'module': top,
+                'kinds': kinds,
+                'via': ["%s (%s)" % v for v in via],
+                'modules': len(saved),
+                'size': self.getSize(saved),
+                'importTime': None,
+            })
+        candidates.sort(key=lambda c: c['size'], reverse=True)
+        return candidates
+
+#-------------------------------------------------------------------------------
+# measureImportTime()
+# Cumulative import time of a module in ms, with python -X importtime
+#-------------------------------------------------------------------------------
+def measureImportTime(interpreter, name, cwd=None, timeout=60):
+    try:
+        process = subprocess.run(interpreter.split() + ["-X", "importtime", "-c", "import " + name], cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=timeout)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    for line in process.stderr.decode("utf-8", errors="replace").splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == name:
+            try:
+                return int(fields[1]) / 1000.0
+            except ValueError:
+                return None
+    return None
+
+#-------------------------------------------------------------------------------
+# measureImportTimes()
+# Fill the import time of the candidates, one interpreter per candidate
+#-------------------------------------------------------------------------------
+def measureImportTimes(interpreter, candidates, cwd=None, workers=4):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        times = pool.map(lambda c: measureImportTime(interpreter, c['module'], cwd), candidates)
+        for candidate, t in zip(candidates, times):
+            candidate['importTime'] = t
+    return candidates
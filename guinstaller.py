@@ -11,6 +11,17 @@
 #-------------------------------------------------------------------------------
 import sys
 import time
+
+# Start of the application, for --startup-check
+time0 = time.time()
+
+#-------------------------------------------------------------------------------
+# Headless mode, dispatched before any PyQt5 import
+#-------------------------------------------------------------------------------
+if __name__ == '__main__' and len(sys.argv) > 1 and sys.argv[1] == "--headless":
+    import headless
+    sys.exit(headless.main(sys.argv[2:]))
+
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
@@ -55,10 +66,24 @@ def setTheme(theme):
         palette.setColor(QPalette.HighlightedText, QColor(const.db['THEME_LIGHT_HIGHLIGHTED_TEXT']))
     app.setPalette(palette)
 
+#-------------------------------------------------------------------------------
+# checkStartup()
+# Called by the first paintEvent of the main window, quit with the return code
+# 1 if it came later than the startup budget
+#-------------------------------------------------------------------------------
+def checkStartup():
+    elapsed = time.time() - time0
+    print("Startup to first paint : %.3f s (budget %.3f s)" % (elapsed, const.db["STARTUP_BUDGET"]))
+    app.exit(0 if elapsed <= const.db["STARTUP_BUDGET"] else 1)
+
 #-------------------------------------------------------------------------------
 # main()
 #-------------------------------------------------------------------------------
 if __name__ == '__main__':
+    startupCheck = "--startup-check" in sys.argv
+    if startupCheck:
+        sys.argv.remove("--startup-check")
+
     # Create application
     app = QApplication(sys.argv)
     app.setOrganizationName(const.db["ORGANIZATION_NAME"])
@@ -126,8 +151,11 @@ if __name__ == '__main__':
     else:
         w = MainWindow()
     w.setWindowTitle("%s %s" % (const.db["APPLICATION_NAME"], const.db["VERSION"]))
+    if startupCheck:
+        w.firstPainted.connect(checkStartup)
     w.show()
 
     # Execute application
     currentExitCode = app.exec_()
     app = None
+    sys.exit(currentExitCode)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# The headless runner must not import PyQt5 (nor settings, utils, ...)
+#-------------------------------------------------------------------------------
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import const
+import command
+import phases
+import scanner
+import specgen
+import buildprofile
+import distbuild
+import collectcache
+
+#-------------------------------------------------------------------------------
+# parseArgs()
+#-------------------------------------------------------------------------------
+def parseArgs(args):
+    parser = argparse.ArgumentParser(prog="guinstaller --headless", description="%s %s headless build runner" % (const.db["APPLICATION_NAME"], const.db["VERSION"]))
+    parser.add_argument("main", help="main Python script or spec file to build")
+    parser.add_argument("--options", metavar="FILE", help="JSON or TOML file of build options, see command.DEFAULT_OPTIONS for the keys")
+    parser.add_argument("--json", metavar="FILE", help="write the build results into this JSON file")
+    parser.add_argument("--spec", action="store_true", help="generate the spec file only")
+    parser.add_argument("--workers", metavar="LIST", help="comma separated list of the build workers (host:port or Unix socket path) to build on, their token is read from GUINSTALLER_DIST_TOKEN")
+    parser.add_argument("--no-collect-cache", action="store_true", help="let PyInstaller expand the --collect-* options instead of the collect cache")
+    parser.epilog = "Extra PyInstaller options may be given after --"
+    # Everything after -- is handed over to PyInstaller
+    extra = []
+    if "--" in args:
+        extra = args[args.index("--") + 1:]
+        args = args[:args.index("--")]
+    opts = parser.parse_args(args)
+    opts.extra = extra
+    return opts
+
+#-------------------------------------------------------------------------------
+# main()
+# Return the PyInstaller's return code
+#-------------------------------------------------------------------------------
+def main(args):
+    opts = parseArgs(args)
+    try:
+        profile = buildprofile.BuildProfile.load(opts.options) if opts.options else buildprofile.BuildProfile()
+    except (OSError, KeyError, ValueError) as error:
+        print("Can't read the build options : %s" % error, file=sys.stderr)
+        return 2
+    profile = profile.replace(main=os.path.abspath(opts.main))
+    options = profile.toDict()
+    gen_mode = command.GEN_SPEC if opts.spec else command.GEN_EXE
+    argv = profile.getArgv(gen_mode)
+    if gen_mode == command.GEN_EXE and not opts.workers and not opts.no_collect_cache and not command.isSpecFile(profile.main):
+        expandedOptions, expanded = collectcache.expandOptions(options, os.path.dirname(profile.main))
+        if expanded:
+            print("Collect cache : %s" % ", ".join("--%s %s" % (o.replace('_', '-'), n) for o, n in expanded), flush=True)
+            argv = command.buildArgv(expandedOptions, gen_mode)
+    argv.extend(opts.extra)
+    source_path, dist_path, work_path, name_base, name_EXE = profile.getPaths()
+
+    print("$> %s" % (command.joinArgv(argv)), flush=True)
+    time1 = time.time()
+    parser = phases.PhaseParser()
+    # Written by PyInstaller's makespec in this process when possible
+    specFileName = specgen.makeSpec(argv[1:], source_path) if gen_mode == command.GEN_SPEC else None
+    if specFileName is not None:
+        print("Wrote %s." % specFileName, flush=True)
+        rc = 0
+    elif opts.workers and gen_mode == command.GEN_EXE:
+        def printLine(line):
+            print(line, flush=True)
+            parser.feed(line)
+        if opts.extra:
+            profile = profile.replace(extra_options=(profile.extra_options + " " + command.joinArgv(opts.extra)).strip())
+        rc = distbuild.Coordinator(opts.workers).build(profile, printLine, lambda line: print(line, flush=True))
+    else:
+        try:
+            process = subprocess.Popen(argv, cwd=source_path, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            for line in iter(process.stdout.readline, b''):
+                sys.stdout.buffer.write(line)
+                sys.stdout.flush()
+                parser.feed(line.decode("utf-8", errors="replace").rstrip())
+            rc = process.wait()
+        except OSError as error:
+            print("Can't run %s : %s" % (argv[0], error), file=sys.stderr)
+            rc = 127
+    elapsed = time.time() - time1
+
+    if opts.json:
+        artifact = name_EXE if rc == 0 and gen_mode == command.GEN_EXE and not command.isSpecFile(options['main']) else None
+        results = {
+            'main': options['main'],
+            'profile': profile.getHash(),
+            'argv': argv,
+            'returncode': rc,
+            'elapsed': elapsed,
+            'artifact': artifact,
+            'size': scanner.getSize(name_EXE if options.get('onefile') else dist_path) if artifact is not None and os.path.exists(artifact) else None,
+            'phases': parser.getReport(),
+        }
+        with open(opts.json, "w") as f:
+            json.dump(results, f, indent=1)
+    return rc
+
+#-------------------------------------------------------------------------------
+# main()
+#-------------------------------------------------------------------------------
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import json
+import os
+import sqlite3
+import statistics
+import time
+
+import const
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    time        REAL NOT NULL,
+    project     TEXT NOT NULL,
+    options     TEXT NOT NULL,
+    pyinstaller TEXT,
+    returncode  INTEGER NOT NULL,
+    elapsed     REAL NOT NULL,
+    size        INTEGER,
+    phases      TEXT,
+    startup     TEXT
+);
+CREATE INDEX IF NOT EXISTS builds_project ON builds (project, options, time);
+"""
+
+#-------------------------------------------------------------------------------
+# historyFile()
+#-------------------------------------------------------------------------------
+def historyFile():
+    return os.path.join(os.path.expanduser("~"), const.db["APP_FOLDER"], const.db["HISTORY_FILE"])
+
+#-------------------------------------------------------------------------------
+# getChange()
+# Return the change of value over baseline in percent, or None
+#-------------------------------------------------------------------------------
+def getChange(value, baseline):
+    if value is None or not baseline:
+        return None
+    return (value - baseline) * 100.0 / baseline
+
+#-------------------------------------------------------------------------------
+# Class BuildHistory
+#-------------------------------------------------------------------------------
+class BuildHistory():
+
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, filename=None):
+        self.db = sqlite3.connect(filename if filename is not None else historyFile())
+        self.db.executescript(SCHEMA)
+
+#-------------------------------------------------------------------------------
+# close()
+#-------------------------------------------------------------------------------
+    def close(self):
+        self.db.close()
+
+#-------------------------------------------------------------------------------
+# record()
+# Store a build, return its id
+#-------------------------------------------------------------------------------
+    def record(self, project, options, pyinstaller, returncode, elapsed, size, phases=None):
+        with self.db:
+            cursor = self.db.execute("INSERT INTO builds (time, project, options, pyinstaller, returncode, elapsed, size, phases) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                     (time.time(), project, options, pyinstaller, returncode, elapsed, size, json.dumps(phases) if phases is not None else None))
+        return cursor.lastrowid
+
+#-------------------------------------------------------------------------------
+# setStartup()
+# Attach the results of a startup benchmark to a build
+#-------------------------------------------------------------------------------
+    def setStartup(self, id, startup):
+        with self.db:
+            self.db.execute("UPDATE builds SET startup = ? WHERE id = ?", (json.dumps(startup), id))
+
+#-------------------------------------------------------------------------------
+# getBuilds()
+# Return the builds of a project as dicts, the most recent first
+#-------------------------------------------------------------------------------
+    def getBuilds(self, project, limit=1000):
+        cursor = self.db.execute("SELECT id, time, options, pyinstaller, returncode, elapsed, size, phases, startup FROM builds WHERE project = ? ORDER BY time DESC LIMIT ?", (project, limit))
+        builds = []
+        for row in cursor:
+            builds.append({
+                'id': row[0],
+                'time': row[1],
+                'options': row[2],
+                'pyinstaller': row[3],
+                'returncode': row[4],
+                'elapsed': row[5],
+                'size': row[6],
+                'phases': json.loads(row[7]) if row[7] else None,
+                'startup': json.loads(row[8]) if row[8] else None,
+            })
+        return builds
+
+#-------------------------------------------------------------------------------
+# getBaseline()
+# Median time and size of the last successful builds with the same options,
+# the build id excepted
+#-------------------------------------------------------------------------------
+    def getBaseline(self, project, options, count, exceptId=None):
+        cursor = self.db.execute("SELECT elapsed, size FROM builds WHERE project = ? AND options = ? AND returncode = 0 AND id != ? ORDER BY time DESC LIMIT ?",
+                                 (project, options, exceptId if exceptId is not None else -1, count))
+        rows = cursor.fetchall()
+        if not rows:
+            return None, None
+        sizes = [size for _, size in rows if size]
+        return statistics.median([elapsed for elapsed, _ in rows]), statistics.median(sizes) if sizes else None
+
+#-------------------------------------------------------------------------------
+# checkRegression()
+# Return the alerts raised by a build against the rolling baseline
+#-------------------------------------------------------------------------------
+    def checkRegression(self, id, percent, count):
+        row = self.db.execute("SELECT project, options, elapsed, size FROM builds WHERE id = ?", (id,)).fetchone()
+        if row is None:
+            return []
+        project, options, elapsed, size = row
+        baseElapsed, baseSize = self.getBaseline(project, options, count, id)
+        alerts = []
+        change = getChange(elapsed, baseElapsed)
+        if change is not None and change > percent:
+            alerts.append("build time %.1f s is %.0f%% slower than the median %.1f s of the previous builds" % (elapsed, change, baseElapsed))
+        change = getChange(size, baseSize)
+        if change is not None and change > percent:
+            alerts.append("artifact size %d bytes is %.0f%% bigger than the median %d bytes of the previous builds" % (size, change, baseSize))
+        return alerts
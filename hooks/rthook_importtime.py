@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# PyInstaller runtime hook tracing the imports of the frozen application
+#
+# Inactive unless GUINSTALLER_PROFILE_IMPORTS is the name of a file, where
+# each import is written when it ends, in the format of python -X importtime.
+# The bootloader ignores PYTHONPROFILEIMPORTTIME, so the import machinery is
+# patched instead. The modules imported before the runtime hooks are not seen.
+#-------------------------------------------------------------------------------
+import os
+
+def _guinstallerProfileImports(filename):
+    import sys
+    import time
+    import _frozen_importlib
+
+    original = _frozen_importlib._find_and_load
+    out = open(filename, "w", buffering=1)
+    out.write("import time: self [us] | cumulative | imported package\n")
+    children = []
+
+    def _find_and_load(name, import_):
+        # The import lock is per module, imports of other threads may interleave
+        if name in sys.modules:
+            return original(name, import_)
+        children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, import_)
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = children.pop()
+            if children:
+                children[-1] += elapsed
+            out.write("import time: %9d | %10d | %s%s\n" % ((elapsed - inner) * 1e6, elapsed * 1e6, "  " * len(children), name))
+
+    _frozen_importlib._find_and_load = _find_and_load
+
+if os.environ.get("GUINSTALLER_PROFILE_IMPORTS"):
+    _guinstallerProfileImports(os.environ["GUINSTALLER_PROFILE_IMPORTS"])
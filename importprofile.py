@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+import os
+import shlex
+import subprocess
+import tempfile
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+import sizeanalyzer
+import startbench
+import utils
+
+#-------------------------------------------------------------------------------
+# The runtime hook, bundled with PROFILE_IMPORTS_HOOK, see its header
+#-------------------------------------------------------------------------------
+HOOK_FILE = "hooks/rthook_importtime.py"
+HOOK_VARIABLE = "GUINSTALLER_PROFILE_IMPORTS"
+POLL_INTERVAL = 0.1
+
+#-------------------------------------------------------------------------------
+# getHookFile()
+#-------------------------------------------------------------------------------
+def getHookFile():
+    return utils.resource_path(HOOK_FILE)
+
+#-------------------------------------------------------------------------------
+# hasHook()
+# True if the runtime hook is bundled into the executable
+#-------------------------------------------------------------------------------
+def hasHook(exe):
+    name = os.path.splitext(os.path.basename(HOOK_FILE))[0]
+    try:
+        archive = sizeanalyzer.readCArchive(exe)
+    except OSError:
+        return False
+    return archive is not None and any(entry[0] == name for entry in archive[1])
+
+#-------------------------------------------------------------------------------
+# parseImportTime()
+# Return the list of (depth, module, self us, cumulative us) of the output of
+# python -X importtime or of the runtime hook, children come before parents
+#-------------------------------------------------------------------------------
+def parseImportTime(lines):
+    records = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split('|')
+        if len(fields) != 3:
+            continue
+        try:
+            selfTime = int(fields[0])
+            cumulative = int(fields[1])
+        except ValueError:
+            # The header line
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        records.append((max(0, depth), name.strip(), selfTime, cumulative))
+    return records
+
+#-------------------------------------------------------------------------------
+# buildTree()
+# Return the list of the top level imports as dicts with their children
+#-------------------------------------------------------------------------------
+def buildTree(records):
+    pending = {}
+    for depth, name, selfTime, cumulative in records:
+        node = {'name': name, 'self': selfTime, 'cumulative': cumulative, 'children': pending.pop(depth + 1, [])}
+        pending.setdefault(depth, []).append(node)
+    # Imports left unfinished by a killed program
+    roots = []
+    for depth in sorted(pending):
+        roots.extend(pending[depth])
+    return roots
+
+#-------------------------------------------------------------------------------
+# getOffenders()
+# The count modules with the biggest self time, and the top level packages
+# with the biggest total of their modules' self times, as (name, self us)
+#-------------------------------------------------------------------------------
+def getOffenders(records, count):
+    packages = {}
+    for _, name, selfTime, _ in records:
+        top = name.split('.')[0]
+        packages[top] = packages.get(top, 0) + selfTime
+    modules = sorted(((r[1], r[2]) for r in records), key=lambda m: m[1], reverse=True)
+    return modules[:count], sorted(packages.items(), key=lambda p: p[1], reverse=True)[:count]
+
+#-------------------------------------------------------------------------------
+# profileImports()
+# Run the executable with the runtime hook active, return the records and
+# True if it was stopped after timeout seconds
+#-------------------------------------------------------------------------------
+def profileImports(exe, params, timeout):
+    fd, filename = tempfile.mkstemp(prefix="guinstaller-imports-", suffix=".txt")
+    os.close(fd)
+    env = dict(os.environ)
+    env[HOOK_VARIABLE] = filename
+    timedOut = False
+    try:
+        process = subprocess.Popen([exe] + shlex.split(params), cwd=os.path.dirname(exe), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        start = time.time()
+        while process.poll() is None:
+            if time.time() - start > timeout:
+                # Each import is written when it ends, nothing is lost
+                startbench.killTree(process.pid)
+                process.wait()
+                timedOut = True
+                break
+            time.sleep(POLL_INTERVAL)
+        with open(filename, "r", errors="replace") as f:
+            records = parseImportTime(f)
+    finally:
+        os.remove(filename)
+    return records, timedOut
+
+#-------------------------------------------------------------------------------
+# Class ImportProfiler
+# Profile the imports of an executable in the background
+#-------------------------------------------------------------------------------
+class ImportProfiler(QThread):
+
+    linePrinted = pyqtSignal(str)
+    profileCompleted = pyqtSignal(list)
+
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, parent, exe, params, timeout):
+        super(ImportProfiler, self).__init__(parent)
+        self.exe = exe
+        self.params = params
+        self.timeout = timeout
+
+#-------------------------------------------------------------------------------
+# run()
+#-------------------------------------------------------------------------------
+    def run(self):
+        self.linePrinted.emit("Profiling the imports of %s, stopped after %d s" % (self.exe, self.timeout))
+        try:
+            records, timedOut = profileImports(self.exe, self.params, self.timeout)
+        except OSError as error:
+            self.linePrinted.emit("Can't profile %s : %s" % (self.exe, error))
+            records = []
+        else:
+            if timedOut:
+                self.linePrinted.emit("%s stopped after %d s" % (self.exe, self.timeout))
+        self.profileCompleted.emit(records)
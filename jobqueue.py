@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+import const
+import settings
+import buildprofile
+import distbuild
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+# Seconds the concurrency is reused before being computed again
+CONCURRENCY_TTL = 5
+
+_concurrency = (0, None)
+
+#-------------------------------------------------------------------------------
+# discoverSpecFiles()
+# Return all the spec files found under folder, skipping PyInstaller outputs
+#-------------------------------------------------------------------------------
+def discoverSpecFiles(folder):
+    specs = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if d not in ("build", "dist", "matrix", "__pycache__") and not d.startswith('.')]
+        for f in files:
+            if f.endswith(".spec"):
+                specs.append(os.path.join(root, f))
+    return sorted(specs)
+
+#-------------------------------------------------------------------------------
+# getConcurrency()
+# Number of builds allowed to run together, computed at most every
+# CONCURRENCY_TTL seconds : asking the build workers may take seconds
+#-------------------------------------------------------------------------------
+def getConcurrency():
+    global _concurrency
+    if _concurrency[1] is None or time.time() - _concurrency[0] > CONCURRENCY_TTL:
+        _concurrency = (time.time(), computeConcurrency())
+    return _concurrency[1]
+
+#-------------------------------------------------------------------------------
+# computeConcurrency()
+# Number of builds allowed to run together, according to CPU count and RAM
+#-------------------------------------------------------------------------------
+def computeConcurrency():
+    if settings.db['JOBS_MAX'] > 0:
+        return settings.db['JOBS_MAX']
+    if settings.db['DIST_WORKERS']:
+        # The slots of the reachable workers
+        return max(1, distbuild.Coordinator(settings.db['DIST_WORKERS'], token=settings.db['DIST_TOKEN']).getCapacity())
+    import psutil
+    cpus = os.cpu_count() or 1
+    available = psutil.virtual_memory().available
+    byMemory = available // (settings.db['JOBS_MEMORY_PER_BUILD'] * 1024 * 1024)
+    return int(max(1, min(cpus, byMemory)))
+
+#-------------------------------------------------------------------------------
+# Class JobQueue
+# Persistent queue of build jobs, run in the background by a scheduler thread
+#-------------------------------------------------------------------------------
+class JobQueue(QThread):
+
+    linePrinted = pyqtSignal(str)
+    jobsChanged = pyqtSignal()
+
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, parent):
+        super(JobQueue, self).__init__(parent)
+        self.fileName = os.path.join(os.path.expanduser("~"), const.db["APP_FOLDER"], const.db["JOBS_FILE"])
+        self.condition = threading.Condition()
+        self.running = 0
+        self.lockedPaths = set()
+        self.jobs = []
+        self.load()
+
+#-------------------------------------------------------------------------------
+# load()
+#-------------------------------------------------------------------------------
+    def load(self):
+        try:
+            with open(self.fileName, "r") as f:
+                self.jobs = json.load(f)
+        except (OSError, ValueError):
+            self.jobs = []
+        # Jobs running when the application stopped have to be run again
+        for job in self.jobs:
+            if job['status'] == JOB_RUNNING:
+                job['status'] = JOB_QUEUED
+
+#-------------------------------------------------------------------------------
+# save()
+#-------------------------------------------------------------------------------
+    def save(self):
+        with self.condition:
+            tmpName = self.fileName + ".tmp"
+            with open(tmpName, "w") as f:
+                json.dump(self.jobs, f, indent=1)
+            os.replace(tmpName, self.fileName)
+
+#-------------------------------------------------------------------------------
+# addJob()
+# Identical jobs already waiting or running are coalesced
+# options are the build options of the command, needed by the build workers
+#-------------------------------------------------------------------------------
+    def addJob(self, target, command, cwd, workpath, options=None):
+        key = hashlib.sha1(("%s\0%s\0%s" % (target, command, cwd)).encode("utf-8")).hexdigest()
+        with self.condition:
+            for job in self.jobs:
+                if job['key'] == key and job['status'] in (JOB_QUEUED, JOB_RUNNING):
+                    return False
+            self.jobs.append({'key': key, 'target': target, 'command': command, 'cwd': cwd, 'workpath': os.path.normcase(os.path.abspath(workpath)), 'status': JOB_QUEUED, 'rc': None, 'elapsed': None, 'options': options})
+            self.condition.notify_all()
+        self.save()
+        self.jobsChanged.emit()
+        return True
+
+#-------------------------------------------------------------------------------
+# removeFinished()
+#-------------------------------------------------------------------------------
+    def removeFinished(self):
+        with self.condition:
+            self.jobs = [job for job in self.jobs if job['status'] in (JOB_QUEUED, JOB_RUNNING)]
+        self.save()
+        self.jobsChanged.emit()
+
+#-------------------------------------------------------------------------------
+# lockPath()
+# Lock a workpath for this process and for the other GUInstaller instances
+#-------------------------------------------------------------------------------
+    def lockPath(self, path):
+        if path in self.lockedPaths:
+            return False
+        try:
+            fd = os.open(path + ".lock", os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if not self.isStaleLock(path + ".lock"):
+                return False
+            os.remove(path + ".lock")
+            return self.lockPath(path)
+        except OSError:
+            # Parent folder doesn't exist yet, the in-process lock is enough
+            fd = None
+        if fd is not None:
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+        self.lockedPaths.add(path)
+        return True
+
+#-------------------------------------------------------------------------------
+# isStaleLock()
+# A lock left by a GUInstaller instance which is not running anymore
+#-------------------------------------------------------------------------------
+    def isStaleLock(self, lockName):
+        try:
+            with open(lockName, "r") as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError):
+            return False
+        import psutil
+        return pid != os.getpid() and not psutil.pid_exists(pid)
+
+#-------------------------------------------------------------------------------
+# unlockPath()
+#-------------------------------------------------------------------------------
+    def unlockPath(self, path):
+        self.lockedPaths.discard(path)
+        try:
+            os.remove(path + ".lock")
+        except OSError:
+            pass
+
+#-------------------------------------------------------------------------------
+# nextJob()
+# First queued job whose workpath is not locked, called with condition held
+#-------------------------------------------------------------------------------
+    def nextJob(self):
+        for job in self.jobs:
+            if job['status'] == JOB_QUEUED and self.lockPath(job['workpath']):
+                return job
+        return None
+
+#-------------------------------------------------------------------------------
+# run()
+#-------------------------------------------------------------------------------
+    def run(self):
+        while True:
+            # Out of the lock, the workers may be slow to answer
+            concurrency = getConcurrency()
+            with self.condition:
+                if not any(job['status'] == JOB_QUEUED for job in self.jobs) and self.running == 0:
+                    break
+                job = self.nextJob() if self.running < concurrency else None
+                if job is None:
+                    self.condition.wait(timeout=5)
+                    continue
+                job['status'] = JOB_RUNNING
+                self.running = self.running + 1
+            self.save()
+            self.jobsChanged.emit()
+            threading.Thread(target=self.runJob, args=(job,), daemon=True).start()
+        self.linePrinted.emit("Job queue is empty")
+
+#-------------------------------------------------------------------------------
+# runJob()
+#-------------------------------------------------------------------------------
+    def runJob(self, job):
+        self.linePrinted.emit("Job started for %s" % job['target'])
+        time1 = time.time()
+        try:
+            logName = job['workpath'] + ".log"
+            os.makedirs(os.path.dirname(logName), exist_ok=True)
+            with open(logName, "wb") as log:
+                if settings.db['DIST_WORKERS'] and job.get('options') is not None:
+                    rc = self.runRemoteJob(job, log)
+                else:
+                    rc = subprocess.call(job['command'], cwd=job['cwd'], stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, shell=True)
+        except OSError:
+            rc = -1
+        with self.condition:
+            job['rc'] = rc
+            job['elapsed'] = time.time() - time1
+            job['status'] = JOB_DONE if rc == 0 else JOB_FAILED
+            self.running = self.running - 1
+            self.unlockPath(job['workpath'])
+            self.condition.notify_all()
+        self.save()
+        self.linePrinted.emit("Job for %s completed with return code %d" % (job['target'], rc))
+        self.jobsChanged.emit()
+
+#-------------------------------------------------------------------------------
+# runRemoteJob()
+# Run the job on the least loaded build worker, its output goes to the log
+#-------------------------------------------------------------------------------
+    def runRemoteJob(self, job, log):
+        def printLine(line):
+            log.write((line + "\n").encode("utf-8"))
+            log.flush()
+        def printEvent(line):
+            printLine(line)
+            self.linePrinted.emit(line)
+        coordinator = distbuild.Coordinator(settings.db['DIST_WORKERS'], settings.db['DIST_RETRIES'], settings.db['DIST_TOKEN'])
+        return coordinator.build(buildprofile.BuildProfile(job['options']), printLine, printEvent)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+import array
+import tempfile
+
+#-------------------------------------------------------------------------------
+# Class LogStore
+# Compact storage for the lines captured by a shreald : one contiguous bytes
+# buffer, an offsets array and a stream id array. When the buffer grows over
+# the memory cap, its content is spilled to a temporary file.
+#-------------------------------------------------------------------------------
+class LogStore(object):
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, memoryCap=4 * 1024 * 1024, codepage="utf-8"):
+        self.memoryCap = memoryCap
+        self.codepage = codepage
+        self.buffer = bytearray()
+        self.offsets = array.array('Q', [0])
+        self.streams = array.array('B')
+        self.markers = {}
+        self.spill = None
+        self.spillSize = 0
+
+#-------------------------------------------------------------------------------
+# append()
+# Line is given in the shreald's format, ie prefixed by its stream id
+#-------------------------------------------------------------------------------
+    def append(self, line):
+        stream = line[0]
+        text = line[1:]
+        if stream == '1' and text[:6].lower() == "wrote ":
+            wrote = text.split(' ', maxsplit=1)[1].strip()
+            # PyInstaller >= 5 ends the line with a period
+            if wrote.endswith(".spec."):
+                wrote = wrote[:-1]
+            self.markers['wrote'] = wrote
+        self.buffer += text.encode(self.codepage, errors='replace')
+        self.streams.append(int(stream))
+        self.offsets.append(self.spillSize + len(self.buffer))
+        if len(self.buffer) > self.memoryCap:
+            self.spillToDisk()
+
+#-------------------------------------------------------------------------------
+# spillToDisk()
+#-------------------------------------------------------------------------------
+    def spillToDisk(self):
+        if self.spill is None:
+            self.spill = tempfile.TemporaryFile(prefix="guinstaller-log-")
+        self.spill.seek(0, 2)
+        self.spill.write(self.buffer)
+        self.spillSize = self.spillSize + len(self.buffer)
+        self.buffer = bytearray()
+
+#-------------------------------------------------------------------------------
+# marker()
+# O(1) access to the special lines extracted while capturing
+#-------------------------------------------------------------------------------
+    def marker(self, name, default=None):
+        return self.markers.get(name, default)
+
+#-------------------------------------------------------------------------------
+# __len__()
+#-------------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.streams)
+
+#-------------------------------------------------------------------------------
+# __getitem__()
+# Return the line in the shreald's format
+#-------------------------------------------------------------------------------
+    def __getitem__(self, i):
+        if i < 0:
+            i = i + len(self.streams)
+        if i < 0 or i >= len(self.streams):
+            raise IndexError("log line index out of range")
+        start = self.offsets[i]
+        end = self.offsets[i + 1]
+        if start >= self.spillSize:
+            data = self.buffer[start - self.spillSize:end - self.spillSize]
+        else:
+            self.spill.seek(start)
+            data = self.spill.read(end - start)
+        return str(self.streams[i]) + bytes(data).decode(self.codepage, errors='replace')
+
+#-------------------------------------------------------------------------------
+# __iter__()
+#-------------------------------------------------------------------------------
+    def __iter__(self):
+        for i in range(len(self.streams)):
+            yield self[i]
+
+#-------------------------------------------------------------------------------
+# close()
+#-------------------------------------------------------------------------------
+    def close(self):
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
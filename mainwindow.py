@@ -16,8 +16,6 @@ from PyQt5.QtWidgets import *
 import os
 import platform
 import sys
-import datetime
-import pickle
 
 # These imports are project specific
 import settings
@@ -27,11 +25,15 @@ import dialog
 import utils
 import QCodeEditor
 import syntax
+import console
+import trash
+import distindex
 
 #-------------------------------------------------------------------------------
 # Class MainWindow
 #-------------------------------------------------------------------------------
 class MainWindow(QMainWindow):
+    firstPainted = pyqtSignal()
     appDir = ""
     CurrentOS = platform.system()
     CurrentDrive = os.path.splitdrive(os.path.realpath(__file__))[0]
@@ -39,6 +41,12 @@ class MainWindow(QMainWindow):
     source_path = ""
     filename = None
     dirtyFlag = False
+    lastLogFile = None
+    lastPhases = None
+    lastBuildId = None
+    lastMatrix = None
+    specOptions = None
+    painted = False
 
 #-------------------------------------------------------------------------------
 # __init__()
@@ -50,6 +58,11 @@ class MainWindow(QMainWindow):
         self.appDir = os.path.join(os.path.expanduser("~"), const.db["APP_FOLDER"])
         if not os.path.exists(self.appDir):
             os.makedirs(self.appDir)
+        self.trashTimer = QTimer(self)
+        self.trashTimer.timeout.connect(self.showTrashProgress)
+        trash.collectGarbage()
+        self.watchTrash()
+        distindex.startLoading()
         pyinstall.initFormEXE(self)
         self.btnBuildEXE.clicked.connect(self.doBuildEXE)
         self.btnBuildEXE.setToolTip("Launch the build process")
@@ -57,6 +70,11 @@ class MainWindow(QMainWindow):
         self.btnGenSpec.clicked.connect(self.doGenSpec)
         self.btnGenSpec.setToolTip("Generate the spec file only")
         self.btnGenSpec.setEnabled(False)
+        self.btnBuildMatrix.clicked.connect(lambda: pyinstall.buildMatrix(self))
+        self.btnBuildMatrix.setToolTip("Build several variants of the main script concurrently")
+        self.btnBuildMatrix.setEnabled(False)
+        self.btnJobQueue.clicked.connect(lambda: pyinstall.showJobQueue(self))
+        self.btnJobQueue.setToolTip("Queue and run the builds of several projects")
         self.lblRCBuild.setFont(QFont('Courier', 10))
         self.lblTimeBuild.setFont(QFont('Courier', 10))
         self.btnBrowseMainFile.clicked.connect(lambda: pyinstall.browseMainFile(self))
@@ -75,6 +93,12 @@ class MainWindow(QMainWindow):
         self.btnClearOutput.setToolTip("Clear the output")
         self.btnCopyOutput.clicked.connect(self.doCopyOutput)
         self.btnCopyOutput.setToolTip("Copy the output to clipboard")
+        self.btnShowLogs.clicked.connect(self.doShowLogs)
+        self.btnShowLogs.setToolTip("Browse the full logs of the previous operations")
+        self.btnShowPhases.clicked.connect(self.doShowPhases)
+        self.btnShowPhases.setToolTip("Show the time spent into each phase of the previous build")
+        self.btnShowHistory.clicked.connect(lambda: pyinstall.showHistory(self))
+        self.btnShowHistory.setToolTip("Show the history of the builds of this project")
         self.btnShowDoc.clicked.connect(self.doShowDoc)
         self.btnShowDoc.setToolTip("Open the PyInstaller documentation")
         self.btnOpenFolder.clicked.connect(self.doOpenFolder)
@@ -83,6 +107,12 @@ class MainWindow(QMainWindow):
         self.btnRunEXE.setEnabled(False)
         self.btnBreakEXE.setEnabled(False)
         self.btnBreakEXE.setToolTip("Try to stop and kill the running generated executable file")
+        self.btnBenchEXE.clicked.connect(lambda: pyinstall.benchEXE(self))
+        self.btnBenchEXE.setToolTip("Benchmark the startup time of the generated executable file")
+        self.btnSizeEXE.clicked.connect(lambda: pyinstall.showSizes(self))
+        self.btnSizeEXE.setToolTip("Show what takes place into the generated executable file")
+        self.btnProfileEXE.clicked.connect(lambda: pyinstall.profileEXE(self))
+        self.btnProfileEXE.setToolTip("Profile the imports of the generated executable file, built with PROFILE_IMPORTS_HOOK")
 
         self.lstAddData.setContextMenuPolicy(Qt.CustomContextMenu)
         self.lstAddData.customContextMenuRequested.connect(lambda position, w = self.lstAddData : self.onListContext(position, w))
@@ -108,6 +138,8 @@ class MainWindow(QMainWindow):
         css = 'font: %dpt "%s"; color: %s; background-color: %s;' % (settings.db['OUTPUT_STYLE_FONT_SIZE'],settings.db['OUTPUT_STYLE_FONT_NAME'],settings.db['OUTPUT_STYLE_COLOR'],settings.db['OUTPUT_STYLE_COLOR_BACKGROUND'])
         self.txtBuildOutput.setStyleSheet(css)
         self.txtBuildOutput.setReadOnly(True)
+        self.txtBuildOutput.setMaximumBlockCount(settings.db['OUTPUT_MAX_BLOCKS'])
+        self.output = console.OutputSink(self.txtBuildOutput)
 
         self.txtSpecFile = QCodeEditor.QCodeEditor(self)
         self.lytEditor.addWidget(self.txtSpecFile)
@@ -116,7 +148,9 @@ class MainWindow(QMainWindow):
         self.txtSpecFile.textChanged.connect(self.changedText)
         self.txtSpecFile.selectionChanged.connect(self.handleSelectionChanged)
         self.txtSpecFile.cursorPositionChanged.connect(self.cursorPosition)
-        self.txtSpecFile.highlight = syntax.PythonHighlighter(self.txtSpecFile.document())
+        # The highlighter is built once the window has been painted
+        self.txtSpecFile.highlight = None
+        QTimer.singleShot(0, self.setHighlighter)
         self.btnSaveSpecFile.clicked.connect(self.saveFile)
 
         self.tabSettings = settings.TabSettings(self)
@@ -198,6 +232,7 @@ class MainWindow(QMainWindow):
         menu = QMenu("Menu", self)
         deleteRowAction = menu.addAction("Delete one row")
         deleteAllAction = menu.addAction("Delete all rows")
+        suggestAction = menu.addAction("Suggest modules to exclude") if widget is self.lstExcludeModule else None
         action = menu.exec_(widget.mapToGlobal(position))
         if action == deleteRowAction:
             if widget.count() > 0:
@@ -211,6 +246,8 @@ class MainWindow(QMainWindow):
                 widget.clear()
             else:
                 self.showMessage("List is already empty")
+        elif action is not None and action == suggestAction:
+            pyinstall.suggestExcludes(self)
 
 #-------------------------------------------------------------------------------
 # doBuildEXE()
@@ -305,6 +342,40 @@ class MainWindow(QMainWindow):
         settings.db.sync()
         self.showMessage("Settings saved")
 
+#-------------------------------------------------------------------------------
+# paintEvent()
+#-------------------------------------------------------------------------------
+    def paintEvent(self, event):
+        super(MainWindow, self).paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            self.firstPainted.emit()
+
+#-------------------------------------------------------------------------------
+# setHighlighter()
+#-------------------------------------------------------------------------------
+    def setHighlighter(self):
+        self.txtSpecFile.highlight = syntax.PythonHighlighter(self.txtSpecFile.document())
+
+#-------------------------------------------------------------------------------
+# watchTrash()
+# Show the progress of the background deletions in the status bar
+#-------------------------------------------------------------------------------
+    def watchTrash(self):
+        if not self.trashTimer.isActive():
+            self.trashTimer.start(500)
+
+#-------------------------------------------------------------------------------
+# showTrashProgress()
+#-------------------------------------------------------------------------------
+    def showTrashProgress(self):
+        folders, files = trash.getProgress()
+        if folders > 0:
+            self.statusBar.showMessage("Deleting %d old folder(s) in background, %d files deleted" % (folders, files), 1000)
+        else:
+            self.trashTimer.stop()
+            self.statusBar.clearMessage()
+
 #-------------------------------------------------------------------------------
 # showMessage()
 #-------------------------------------------------------------------------------
@@ -316,9 +387,7 @@ class MainWindow(QMainWindow):
 # outputMessage()
 #-------------------------------------------------------------------------------
     def outputMessage(self, msg):
-        now = datetime.datetime.now()
-        self.txtBuildOutput.appendPlainText(now.strftime(settings.db['OUTPUT_TIMESTAMP']) + msg)
-        self.txtBuildOutput.moveCursor(QTextCursor.End)
+        self.output.write(msg)
 
 #-------------------------------------------------------------------------------
 # closeEvent()
@@ -351,16 +420,48 @@ class MainWindow(QMainWindow):
 # doClearOutput()
 #-------------------------------------------------------------------------------
     def doClearOutput(self):
-        self.txtBuildOutput.setPlainText("")
+        self.output.clear()
 
 #-------------------------------------------------------------------------------
 # doCopyOutput()
 #-------------------------------------------------------------------------------
     def doCopyOutput(self):
+        self.output.flush()
+        if self.lastLogFile is not None and self.txtBuildOutput.blockCount() >= settings.db['OUTPUT_MAX_BLOCKS']:
+            result = QMessageBox.question(self, "Large output", "The output has been truncated.\n Would you like to save the full log of the last operation instead ?", QMessageBox.Yes | QMessageBox.No)
+            if result == QMessageBox.Yes:
+                filename = QFileDialog.getSaveFileName(self, 'Save log', './', "Log file (*.log);;All files (*.*)")[0]
+                if filename != "":
+                    import buildlog
+                    reader = buildlog.BuildLogReader(self.lastLogFile, settings.db['SHELL_CODEPAGE'])
+                    reader.saveAs(filename)
+                    reader.close()
+                    self.showMessage("Full log saved as %s" % (filename))
+                return
         qc = QApplication.clipboard()
         qc.setText(self.txtBuildOutput.toPlainText(), mode=qc.Clipboard)
         self.showMessage("Output copied to clipboard")
 
+#-------------------------------------------------------------------------------
+# doShowLogs()
+#-------------------------------------------------------------------------------
+    def doShowLogs(self):
+        dlg = dialog.DlgLogViewer(self, settings.db['SHELL_CODEPAGE'])
+        dlg.exec()
+
+#-------------------------------------------------------------------------------
+# doShowPhases()
+#-------------------------------------------------------------------------------
+    def doShowPhases(self):
+        if self.lastPhases is None:
+            self.showMessage("No build yet")
+            return
+        report = self.lastPhases.getReport()
+        rows = [("Phase", p['phase'], p['ms']) for p in report['phases']]
+        rows.extend([("Hook", h['hook'], h['ms']) for h in report['hooks']])
+        dlg = dialog.DlgTable("Build phases", ["Kind", "Name", "Time (ms)"], rows, self, exportData=report)
+        dlg.exec()
+
 #-------------------------------------------------------------------------------
 # doShowDoc()
 #-------------------------------------------------------------------------------
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+import itertools
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+import utils
+import scanner
+
+#-------------------------------------------------------------------------------
+# Option axes available for a matrix build
+# Each axis is a list of (label, overrides) values, see pyinstall.buildCommand()
+#-------------------------------------------------------------------------------
+AXES = {
+    "mode"  : [("onedir", {'onefile': False}), ("onefile", {'onefile': True})],
+    "strip" : [("", {'strip': False}), ("strip", {'strip': True})],
+    "noupx" : [("", {'noupx': False}), ("noupx", {'noupx': True})],
+    "debug" : [("", {'debug': "none"}), ("debug", {'debug': "all"})],
+}
+
+#-------------------------------------------------------------------------------
+# getVariants()
+# Return the list of (label, overrides) for the cartesian product of the axes
+#-------------------------------------------------------------------------------
+def getVariants(axes):
+    variants = []
+    for combination in itertools.product(*(AXES[axis] for axis in axes)):
+        labels = [label for label, _ in combination if label != ""]
+        overrides = {}
+        for _, values in combination:
+            overrides.update(values)
+        variants.append(("-".join(labels) if labels else "default", overrides))
+    return variants
+
+#-------------------------------------------------------------------------------
+# Class MatrixBuilder
+# Run all the variants of a matrix concurrently, each one in its own folder
+#-------------------------------------------------------------------------------
+class MatrixBuilder(QThread):
+
+    linePrinted = pyqtSignal(str)
+    matrixCompleted = pyqtSignal(list)
+
+#-------------------------------------------------------------------------------
+# __init__()
+# jobs is a list of dicts with the keys label, command, cwd, folder, artifact
+#-------------------------------------------------------------------------------
+    def __init__(self, parent, jobs, maxWorkers):
+        super(MatrixBuilder, self).__init__(parent)
+        self.jobs = jobs
+        self.maxWorkers = maxWorkers
+
+#-------------------------------------------------------------------------------
+# run()
+#-------------------------------------------------------------------------------
+    def run(self):
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as pool:
+            results = list(pool.map(self.buildVariant, self.jobs))
+        self.matrixCompleted.emit(results)
+
+#-------------------------------------------------------------------------------
+# buildVariant()
+#-------------------------------------------------------------------------------
+    def buildVariant(self, job):
+        self.linePrinted.emit("Matrix variant %s started" % job['label'])
+        time1 = time.time()
+        logName = os.path.join(job['folder'], "build.log")
+        with open(logName, "wb") as log:
+            process = subprocess.Popen(job['command'], cwd=job['cwd'], stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, shell=True)
+            rc = process.wait()
+        elapsed = time.time() - time1
+        size = scanner.getSize(job['artifact']) if rc == 0 else 0
+        self.linePrinted.emit("Matrix variant %s completed with return code %d in %s" % (job['label'], rc, utils.getHumanTime(elapsed)))
+        return {'label': job['label'], 'rc': rc, 'elapsed': elapsed, 'size': size, 'artifact': job['artifact'], 'log': logName}
+
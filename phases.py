@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import json
+import re
+import sys
+
+#-------------------------------------------------------------------------------
+# PyInstaller's log lines begin with the time (in ms) since its start :
+#   1234 INFO: Running Analysis Analysis-00.toc
+# The hooks are logged as, up to PyInstaller 5 :
+#   Loading module hook 'hook-heapq.py' from '...'...
+#   Processing pre-find module path hook distutils from '...'.
+#   Processing pre-safe import module hook six.moves from '...'.
+# and since PyInstaller 6 :
+#   Processing standard module hook 'hook-heapq.py' from '...'
+#   Processing pre-find-module-path hook 'hook-distutils.py' from '...'
+#   Processing pre-safe-import-module hook 'hook-six.moves.py' from '...'
+#-------------------------------------------------------------------------------
+RE_LOG_LINE = re.compile(r"^(\d+) (?:[A-Z]+): (.*)$")
+HOOK_MESSAGES = ("Loading module hook", "Processing standard module hook",
+                 "Processing pre-find module path hook", "Processing pre-find-module-path hook",
+                 "Processing pre-safe import module hook", "Processing pre-safe-import-module hook")
+RE_HOOK = re.compile(r"^(?:%s|Executing hook) '?([\w.\-]+)'?" % "|".join(re.escape(m) for m in HOOK_MESSAGES))
+
+#-------------------------------------------------------------------------------
+# Phases in build order, with the beginning of the messages starting them
+#-------------------------------------------------------------------------------
+PHASES = [
+    ("Startup",     ()),
+    ("Analysis",    ("checking Analysis", "Building Analysis", "Running Analysis", "Initializing module dependency graph", "Analyzing ", "Looking for ", "Caching module dependency graph")),
+    ("Hooks",       ("Processing module hooks",) + HOOK_MESSAGES),
+    ("PYZ",         ("checking PYZ", "Building PYZ")),
+    ("PKG",         ("checking PKG", "Building PKG")),
+    ("EXE",         ("checking EXE", "Building EXE")),
+    ("COLLECT",     ("checking COLLECT", "Building COLLECT")),
+]
+# Hooks analyze the modules they bring, the Analysis goes on only after these.
+# The module hooks are also run while the graph is built, until it is cached.
+RESUME_ANALYSIS = ("Looking for ", "Analyzing run-time hooks", "Caching module dependency graph")
+RE_UPX = re.compile(r"\bupx\b.*\b(?:compress|executing)", re.IGNORECASE)
+
+#-------------------------------------------------------------------------------
+# Class PhaseParser
+# Streaming parser of the PyInstaller's log, one line at a time
+#-------------------------------------------------------------------------------
+class PhaseParser():
+
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self):
+        self.durations = {}
+        self.hooks = {}
+        self.phase = None
+        self.phaseStart = 0
+        self.hook = None
+        self.hookStart = 0
+        self.last = 0
+
+#-------------------------------------------------------------------------------
+# feed()
+#-------------------------------------------------------------------------------
+    def feed(self, line):
+        m = RE_LOG_LINE.match(line)
+        if m is None:
+            return
+        ms = int(m.group(1))
+        message = m.group(2)
+        self.last = ms
+        if self.phase is None:
+            self.phase = "Startup"
+
+        phase = self.getPhase(message)
+        if phase == "Analysis" and self.phase == "Hooks" and not message.startswith(RESUME_ANALYSIS):
+            phase = None
+
+        # A hook lasts, with the imports it brings, until the next hook or
+        # the end of the hooks processing
+        h = RE_HOOK.match(message)
+        if self.hook is not None and (h is not None or (phase is not None and phase != "Hooks")):
+            self.hooks[self.hook] = self.hooks.get(self.hook, 0) + ms - self.hookStart
+            self.hook = None
+        if h is not None:
+            self.hook = h.group(1)
+            self.hookStart = ms
+
+        if phase is not None and phase != self.phase:
+            self.enterPhase(phase, ms)
+
+#-------------------------------------------------------------------------------
+# getPhase()
+#-------------------------------------------------------------------------------
+    def getPhase(self, message):
+        for name, starts in PHASES:
+            if starts and message.startswith(starts):
+                return name
+        if RE_UPX.search(message):
+            return "UPX"
+        return None
+
+#-------------------------------------------------------------------------------
+# enterPhase()
+#-------------------------------------------------------------------------------
+    def enterPhase(self, phase, ms):
+        self.durations[self.phase] = self.durations.get(self.phase, 0) + ms - self.phaseStart
+        self.phase = phase
+        self.phaseStart = ms
+
+#-------------------------------------------------------------------------------
+# getDurations()
+# Return the list of (phase, ms), the current phase ends at the last line
+#-------------------------------------------------------------------------------
+    def getDurations(self):
+        durations = dict(self.durations)
+        if self.phase is not None:
+            durations[self.phase] = durations.get(self.phase, 0) + self.last - self.phaseStart
+        order = [name for name, _ in PHASES] + ["UPX"]
+        return [(name, durations[name]) for name in order if name in durations]
+
+#-------------------------------------------------------------------------------
+# getSlowestHooks()
+#-------------------------------------------------------------------------------
+    def getSlowestHooks(self, count=10):
+        return sorted(self.hooks.items(), key=lambda h: h[1], reverse=True)[:count]
+
+#-------------------------------------------------------------------------------
+# getReport()
+#-------------------------------------------------------------------------------
+    def getReport(self):
+        return {
+            'total': self.last,
+            'phases': [{'phase': name, 'ms': ms} for name, ms in self.getDurations()],
+            'hooks': [{'hook': name, 'ms': ms} for name, ms in sorted(self.hooks.items(), key=lambda h: h[1], reverse=True)],
+        }
+
+#-------------------------------------------------------------------------------
+# saveReport()
+#-------------------------------------------------------------------------------
+    def saveReport(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.getReport(), f, indent=1)
+
+#-------------------------------------------------------------------------------
+# Self-check of the parser on PyInstaller 5 and 6 logs, run as a script :
+#     python phases.py --check
+#-------------------------------------------------------------------------------
+SAMPLE_LOGS = {
+    "5.x": (
+        "76 INFO: PyInstaller: 5.13.2",
+        "1000 INFO: checking Analysis",
+        "1000 INFO: Building Analysis because Analysis-00.toc is non existent",
+        "1010 INFO: Initializing module dependency graph...",
+        "1020 INFO: Analyzing base_library.zip ...",
+        "1500 INFO: Loading module hook 'hook-heapq.py' from '/usr/lib/python3/site-packages/PyInstaller/hooks'...",
+        "1600 INFO: Loading module hook 'hook-encodings.py' from '/usr/lib/python3/site-packages/PyInstaller/hooks'...",
+        "2000 INFO: Caching module dependency graph...",
+        "2100 INFO: running Analysis Analysis-00.toc",
+        "2200 INFO: Analyzing /tmp/hello/hello.py",
+        "2300 INFO: Processing module hooks...",
+        "2310 INFO: Processing pre-safe import module hook six.moves from '/usr/lib/python3/site-packages/PyInstaller/hooks/pre_safe_import_module/hook-six.moves.py'.",
+        "2400 INFO: Processing pre-find module path hook distutils from '/usr/lib/python3/site-packages/PyInstaller/hooks/pre_find_module_path/hook-distutils.py'.",
+        "2500 INFO: Looking for ctypes DLLs",
+        "2600 INFO: checking PYZ",
+        "2700 INFO: checking PKG",
+        "2800 INFO: checking EXE",
+        "3000 INFO: Building EXE from EXE-00.toc completed successfully.",
+    ),
+    "6.x": (
+        "54 INFO: PyInstaller: 6.22.3, contrib hooks: 2026.8",
+        "213 INFO: checking Analysis",
+        "213 INFO: Building Analysis because Analysis-00.toc is non existent",
+        "220 INFO: Running Analysis Analysis-00.toc",
+        "231 INFO: Analyzing modules for base_library.zip ...",
+        "854 INFO: Processing standard module hook 'hook-heapq.py' from '/tmp/venv/lib/python3.11/site-packages/PyInstaller/hooks'",
+        "956 INFO: Processing standard module hook 'hook-encodings.py' from '/tmp/venv/lib/python3.11/site-packages/PyInstaller/hooks'",
+        "1200 INFO: Processing pre-safe-import-module hook 'hook-six.moves.py' from '/tmp/venv/lib/python3.11/site-packages/PyInstaller/hooks/pre_safe_import_module'",
+        "1300 INFO: Processing pre-find-module-path hook 'hook-distutils.py' from '/tmp/venv/lib/python3.11/site-packages/PyInstaller/hooks/pre_find_module_path'",
+        "4502 INFO: Caching module dependency graph...",
+        "4539 INFO: Analyzing /tmp/hello/hello.py",
+        "4540 INFO: Processing module hooks (post-graph stage)...",
+        "4548 INFO: Looking for ctypes DLLs",
+        "4798 INFO: checking PYZ",
+        "4978 INFO: checking PKG",
+        "5001 INFO: checking EXE",
+        "5100 INFO: checking COLLECT",
+        "5200 INFO: Building COLLECT COLLECT-00.toc completed successfully.",
+    ),
+}
+SAMPLE_RESULTS = {
+    "5.x": ([("Startup", 1000), ("Analysis", 900), ("Hooks", 700), ("PYZ", 100), ("PKG", 100), ("EXE", 200)],
+            {"hook-heapq.py": 100, "hook-encodings.py": 400, "six.moves": 90, "distutils": 100}),
+    "6.x": ([("Startup", 213), ("Analysis", 929), ("Hooks", 3656), ("PYZ", 180), ("PKG", 23), ("EXE", 99), ("COLLECT", 100)],
+            {"hook-heapq.py": 102, "hook-encodings.py": 244, "hook-six.moves.py": 100, "hook-distutils.py": 3202}),
+}
+
+#-------------------------------------------------------------------------------
+# check()
+#-------------------------------------------------------------------------------
+def check():
+    failed = []
+    for version in sorted(SAMPLE_LOGS):
+        parser = PhaseParser()
+        for line in SAMPLE_LOGS[version]:
+            parser.feed(line)
+        durations, hooks = SAMPLE_RESULTS[version]
+        for name, got, expected in (("phases", parser.getDurations(), durations), ("hooks", parser.hooks, hooks)):
+            if got != expected:
+                print("%s %s : got %r, expected %r" % (version, name, got, expected))
+                failed.append(version)
+        print("PyInstaller %s log : %s" % (version, "FAILED" if version in failed else "ok"))
+    return failed
+
+#-------------------------------------------------------------------------------
+# main()
+#-------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if len(sys.argv) == 2 and sys.argv[1] == "--check":
+        sys.exit(1 if check() else 0)
+    print("usage: phases.py --check")
+    sys.exit(2)
@@ -12,13 +12,12 @@
 from PyQt5.QtGui import *
 from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
-import shutil
 import os
 import time
 import datetime
 from subprocess import Popen, PIPE
-from importlib import util
-import tempfile
+import threading
+import json
 from os.path import splitext
 
 import const
@@ -26,11 +25,45 @@ import utils
 import dialog
 import shrealding
 import settings
+import console
+import command
+import scanner
+import trash
+import specreader
+import buildprofile
 
 MODE_RUN = 0
 MODE_BUILD = 1
-GEN_EXE = 0
-GEN_SPEC = 1
+GEN_EXE = command.GEN_EXE
+GEN_SPEC = command.GEN_SPEC
+
+#-------------------------------------------------------------------------------
+# Options read from a spec file, see specreader.SPEC_OPTIONS
+# option : name of its widgets without the lbl, lst, txt, chk or cbx prefix
+#-------------------------------------------------------------------------------
+SPEC_WIDGETS = {
+    'paths'                         : "Paths",
+    'add_data'                      : "AddData",
+    'add_binary'                    : "AddBinary",
+    'hidden_import'                 : "HiddenImport",
+    'additional_hooks_dir'          : "AdditionalHooksDir",
+    'runtime_hook'                  : "RuntimeHook",
+    'exclude_module'                : "ExcludeModule",
+    'name'                          : "Name",
+    'strip'                         : "Strip",
+    'noupx'                         : "NoUPX",
+    'console'                       : "Console",
+    'windowed'                      : "Windowed",
+    'disable_windowed_traceback'    : "DisableWindowedTraceback",
+    'runtime_tmpdir'                : "RuntimeTmpDir",
+    'icon'                          : "Icon",
+    'version_file'                  : "VersionFile",
+    'uac_admin'                     : "UACAdmin",
+    'uac_uiaccess'                  : "UACUIAccess",
+    'target_architecture'           : "TargetArchitecture",
+    'codesign_identity'             : "CodesignIdentity",
+    'osx_entitlements_file'         : "OSXEntitlementsFile",
+}
 
 #-------------------------------------------------------------------------------
 # Globals Vars
@@ -43,6 +76,15 @@ mode = None
 gen = None
 time1 = None
 tCmd = None
+tMatrix = None
+jobQueue = None
+cacheHit = None
+cacheBuild = None
+cacheWork = None
+buildOptions = None
+buildElapsed = None
+tBench = None
+tProfile = None
 
 #-------------------------------------------------------------------------------
 # initFormEXE()
@@ -130,6 +172,10 @@ def initFormEXE(mw):
     mw.lblCollectAll.mousePressEvent = lambda event, widget=mw.lstCollectAll : doClickForModule(event, widget)
     mw.lblCollectAll.setToolTip("Collect all submodules, data files, and binaries from the specified package or module. This option can be usedmultiple times")
 
+    # The packages are expanded into the collect cache as soon as they are given
+    for widget in (mw.lstCollectSubmodules, mw.lstCollectData, mw.lstCollectBinaries, mw.lstCollectAll):
+        widget.model().rowsInserted.connect(lambda *args, mw=mw: prefetchCollect(mw))
+
     mw.lblCopyMetadata.setFrameStyle(QFrame.Panel | QFrame.Raised)
     mw.lblCopyMetadata.mousePressEvent = lambda event, widget=mw.lstCopyMetadata : doClickForModule(event, widget)
     mw.lblCopyMetadata.setToolTip("Copy metadata for the specified package. This option can be used multiple times")
@@ -149,6 +195,7 @@ def initFormEXE(mw):
     mw.lblExcludeModule.setFrameStyle(QFrame.Panel | QFrame.Raised)
     mw.lblExcludeModule.mousePressEvent = lambda event, widget=mw.lstExcludeModule : doClickForModule(event, widget)
     mw.lblExcludeModule.setToolTip("Optional module or package (the Python name, not the path name) that will be ignored (as though it was not found). This option can be used multiple times")
+    mw.lstExcludeModule.setToolTip("Right click to get the modules only imported optionally by the main script")
 
     mw.lblRuntimeTmpDir.setFrameStyle(QFrame.Panel | QFrame.Raised)
     mw.lblRuntimeTmpDir.mousePressEvent = lambda event, widget=mw.txtRuntimeTmpDir : doClickForPath(event, widget)
@@ -261,59 +308,44 @@ def doClickForAddBinary(event, mw):
         mw.lstAddBinary.addItem("%s%s%s" % (src, os.pathsep, dst))
 
 #-------------------------------------------------------------------------------
-# getAddOptionsFromList()
+# setBuildPaths()
+# Set the paths of the build from the profile, return (source_file, work_path)
 #-------------------------------------------------------------------------------
-def getAddOptionsFromList(lstWidget, prefix):
-    rc = ""
-    for i in range(lstWidget.count()):
-        rc = rc + '%s="%s" ' % (prefix, str(lstWidget.item(i).text()))
-    return rc
+def setBuildPaths(mw, profile):
+    global name_base
+    global dist_path
+    global name_EXE
+    mw.source_path, dist_path, work_path, name_base, name_EXE = profile.getPaths()
+    return os.path.join(mw.source_path, os.path.basename(profile.main)), work_path
 
 #-------------------------------------------------------------------------------
 # genSpec()
 #-------------------------------------------------------------------------------
 def genSpec(mw):
     global gen
+    import specgen
     gen = GEN_SPEC
     mw.showMessage("Generating the spec file")
     mw.btnRunEXE.setEnabled(False)
     mw.btnOpenFolder.setEnabled(False)
-    source_file = mw.txtMainFile.text()
-    if source_file == "":
+    profile = getFormProfile(mw)
+    if profile.main == "":
         mw.showMessage("Nothing to build")
         return
-
-    if not os.path.isabs(source_file):
-        source_file = os.path.join(os.path.abspath('.'), source_file)
-    mw.source_path = os.path.split(source_file)[0]
-    # print("SF=%s\nSP=%s"%(source_file, mw.source_path))
-    global name_base
-    name_base = mw.txtName.text() if mw.txtName.text() else os.path.splitext(os.path.basename(source_file))[0]
-
-    global dist_path
-    dist_path = mw.txtDistPath.text() if mw.txtDistPath.text() else os.path.join(mw.source_path, "dist")
-    work_path = mw.txtWorkPath.text() if mw.txtWorkPath.text() else os.path.join(mw.source_path, "build")
-
-    if not os.path.isabs(dist_path):
-        dist_path = os.path.join(mw.source_path, dist_path)
-        # source_file = os.path.join(source_file, dist_path)
-
-    if not os.path.isabs(work_path):
-        work_path = os.path.join(mw.source_path, work_path)
-
-    if mw.chkOneDir.isChecked():
-        dist_path = os.path.join(dist_path, name_base)
-
-    global name_EXE
-    name_EXE = os.path.join(dist_path, name_base)
-
-    if mw.CurrentOS == "Windows":
-        name_EXE = name_EXE + ".exe" if name_EXE[-3:].lower() != ".exe" else name_EXE
+    setBuildPaths(mw, profile)
 
     if mw.chkCleanBeforeBuild.isChecked():
         cleanUp(mw)
 
-    command_line = buildCommand(mw, GEN_SPEC)
+    # Written by PyInstaller's makespec in this process when possible
+    specFileName = specgen.makeSpec(profile.getArgv(GEN_SPEC)[1:], mw.source_path)
+    if specFileName is not None:
+        openSpecFile(mw, specFileName)
+        mw.txtMainFile.deselect()
+        mw.showMessage("Spec file successfully generated")
+        return
+
+    command_line = profile.getCommandLine(GEN_SPEC)
     mw.showMessage("Generating spec file with %s" % command_line)
     runCommand(command_line, mw.source_path, mw, MODE_BUILD)
     # postProcess(mw)
@@ -326,231 +358,356 @@ def buildEXE(mw):
     gen = GEN_EXE
     mw.btnRunEXE.setEnabled(False)
     mw.btnOpenFolder.setEnabled(False)
-    source_file = mw.txtMainFile.text()
-    if source_file == "":
+    if mw.txtMainFile.text() == "":
         mw.showMessage("Nothing to build")
         return
+    if command.isSpecFile(mw.txtMainFile.text()):
+        patchSpecFromForm(mw)
 
-    if not os.path.isabs(source_file):
-        source_file = os.path.join(os.path.abspath('.'), source_file)
-    mw.source_path = os.path.split(source_file)[0]
-    # print("SF=%s\nSP=%s"%(source_file, mw.source_path))
-    global name_base
-    name_base = mw.txtName.text() if mw.txtName.text() else os.path.splitext(os.path.basename(source_file))[0]
+    # The form is read once, everything else is computed from the profile
+    profile = getFormProfile(mw)
+    source_file, work_path = setBuildPaths(mw, profile)
 
-    global dist_path
-    dist_path = mw.txtDistPath.text() if mw.txtDistPath.text() else os.path.join(mw.source_path, "dist")
-    work_path = mw.txtWorkPath.text() if mw.txtWorkPath.text() else os.path.join(mw.source_path, "build")
+    global buildOptions
+    buildOptions = profile.toDict()
 
-    if not os.path.isabs(dist_path):
-        dist_path = os.path.join(mw.source_path, dist_path)
-        # source_file = os.path.join(source_file, dist_path)
-
-    if not os.path.isabs(work_path):
-        work_path = os.path.join(mw.source_path, work_path)
-
-    if mw.chkOneDir.isChecked():
-        dist_path = os.path.join(dist_path, name_base)
-
-    global name_EXE
-    name_EXE = os.path.join(dist_path, name_base)
-
-    if mw.CurrentOS == "Windows":
-        name_EXE = name_EXE + ".exe" if name_EXE[-3:].lower() != ".exe" else name_EXE
+    # Set by prepareBuild()
+    global cacheHit
+    global cacheBuild
+    global cacheWork
+    cacheHit = None
+    cacheBuild = None
+    cacheWork = None
 
     if mw.chkCleanBeforeBuild.isChecked():
         cleanUp(mw)
 
-    command_line = buildCommand(mw, GEN_EXE)
+    # The build cache, the workpath cache and the collect cache read the
+    # project files and run the interpreter of PyInstaller, they are looked
+    # up by the build thread
+    prepare = lambda printLine, cwd=mw.source_path, local_work_path=os.path.join(work_path, name_base), artifact=getArtifactPath(mw): prepareBuild(profile, cwd, source_file, local_work_path, artifact, printLine)
+
+    command_line = getBuildCommandLine(profile)
     mw.showMessage("Building with %s" % command_line)
     mw.tbwBuild.setCurrentIndex(0)
-    runCommand(command_line, mw.source_path, mw, MODE_BUILD)
+    runCommand(command_line, mw.source_path, mw, MODE_BUILD, prepare)
     # postProcess(mw)
 
+#-------------------------------------------------------------------------------
+# prepareBuild()
+# Run by the build thread : restore the previous executable if none of the
+# build inputs has changed, otherwise reuse the analysis of another build node
+# from the shared workpath cache and expand the cached --collect-* options.
+# Return the command line, or None if the build has been restored.
+#-------------------------------------------------------------------------------
+def prepareBuild(profile, cwd, source_file, local_work_path, artifact, printLine):
+    import buildcache
+    import workcache
+    global cacheHit
+    global cacheBuild
+    global cacheWork
+    if command.isSpecFile(source_file):
+        return getBuildCommandLine(profile)
+    options = profile.toDict()
+
+    if settings.db['BUILD_CACHE_ENABLED']:
+        inputs = buildcache.getInputs(options)
+        key = buildcache.getKey(inputs)
+        if buildcache.lookup(key) is not None:
+            try:
+                buildcache.restore(key, artifact)
+                printLine("Build cache hit, nothing has changed since the build %s" % key[:12])
+                printLine("Restored %s" % artifact)
+                cacheHit = key
+                return None
+            except OSError as error:
+                printLine("Can't restore the build from cache : %s" % error)
+        for reason in buildcache.explainMiss(source_file, inputs):
+            printLine("Build cache miss : %s" % reason)
+        cacheBuild = (source_file, inputs)
+
+    # The toolchain recorded into the history is asked while PyInstaller runs
+    threading.Thread(target=workcache.getToolchain, args=(buildcache.getInterpreter(),), daemon=True).start()
+
+    if settings.db['WORKPATH_CACHE_ROOT']:
+        key = workcache.getKey(options)
+        local_source_path = os.path.dirname(os.path.abspath(options['main']))
+        if not os.path.exists(local_work_path):
+            if workcache.fetch(settings.db['WORKPATH_CACHE_ROOT'], key, local_work_path, local_source_path):
+                printLine("Workpath %s restored from the shared cache" % local_work_path)
+        cacheWork = (key, local_work_path, local_source_path)
+
+    if settings.db['COLLECT_CACHE_ENABLED']:
+        return expandCollect(profile, cwd, printLine)
+    return getBuildCommandLine(profile)
+
+#-------------------------------------------------------------------------------
+# getBuildCommandLine()
+#-------------------------------------------------------------------------------
+def getBuildCommandLine(profile):
+    import warmworker
+    command_line = profile.getCommandLine(GEN_EXE)
+    if settings.db['WARM_WORKER_ENABLED'] and os.name != "nt":
+        command_line = warmworker.wrapCommandLine(command_line, settings.db['WARM_WORKER_MAX_BUILDS'])
+    return command_line
+
+#-------------------------------------------------------------------------------
+# expandCollect()
+# Run by prepareBuild() : return the command line with the cached
+# --collect-* options replaced by their hook. The ones not cached yet are
+# left to PyInstaller, prefetchCollect() computes them after the build.
+#-------------------------------------------------------------------------------
+def expandCollect(profile, cwd, printLine):
+    import collectcache
+    options, expanded = collectcache.expandOptions(profile.toDict(), cwd, collectMissing=False)
+    if not expanded:
+        return getBuildCommandLine(profile)
+    printLine("Collect cache : %s" % ", ".join("--%s %s" % (o.replace('_', '-'), n) for o, n in expanded))
+    return getBuildCommandLine(buildprofile.BuildProfile(options))
+
+#-------------------------------------------------------------------------------
+# prefetchCollect()
+# Fill the collect cache in the background, the next build won't wait for it
+#-------------------------------------------------------------------------------
+def prefetchCollect(mw):
+    import collectcache
+    if not settings.db['COLLECT_CACHE_ENABLED'] or mw.txtMainFile.text() == "" or command.isSpecFile(mw.txtMainFile.text()):
+        return
+    options = getFormOptions(mw)
+    cwd = os.path.dirname(os.path.abspath(options['main']))
+    threading.Thread(target=collectcache.resolve, args=(options, cwd), daemon=True).start()
+
+#-------------------------------------------------------------------------------
+# getArtifactPath()
+# The folder for a onedir build, the executable for a onefile build
+#-------------------------------------------------------------------------------
+def getArtifactPath(mw):
+    return dist_path if mw.chkOneDir.isChecked() else name_EXE
+
+#-------------------------------------------------------------------------------
+# restoreFromCache()
+# The build has been restored from the cache by prepareBuild()
+#-------------------------------------------------------------------------------
+def restoreFromCache(mw):
+    mw.lblRunEXE.setText(name_EXE)
+    mw.btnRunEXE.setEnabled(True)
+    mw.btnOpenFolder.setEnabled(True)
+    mw.showMessage("Build restored from cache")
+
+#-------------------------------------------------------------------------------
+# buildMatrix()
+# Build concurrently several variants of the main script, each one with its
+# own workpath, distpath and specpath under <source>/matrix/<variant>
+#-------------------------------------------------------------------------------
+def buildMatrix(mw):
+    import matrix
+    source_file = mw.txtMainFile.text()
+    if source_file == "":
+        mw.showMessage("Nothing to build")
+        return
+
+    dlg = dialog.DlgMatrix(mw, list(matrix.AXES.keys()))
+    if dlg.exec() != QDialog.Accepted:
+        return
+    axes = dlg.getAxes()
+    if not axes:
+        mw.showMessage("No option axis selected")
+        return
+
+    if not os.path.isabs(source_file):
+        source_file = os.path.join(os.path.abspath('.'), source_file)
+    mw.source_path = os.path.split(source_file)[0]
+    name = mw.txtName.text() if mw.txtName.text() else os.path.splitext(os.path.basename(source_file))[0]
+
+    jobs = []
+    for label, overrides in matrix.getVariants(axes):
+        folder = os.path.join(mw.source_path, "matrix", label)
+        trash.moveToTrash(folder)
+        os.makedirs(folder)
+        overrides.update({'main': source_file, 'workpath': os.path.join(folder, "build"), 'distpath': os.path.join(folder, "dist"), 'specpath': folder, 'noconfirm': True})
+        artifact = os.path.join(folder, "dist", name)
+        if overrides.get('onefile', not mw.chkOneDir.isChecked()) and mw.CurrentOS == "Windows":
+            artifact = artifact + ".exe"
+        jobs.append({'label': label, 'command': buildCommand(mw, GEN_EXE, overrides), 'cwd': mw.source_path, 'folder': folder, 'artifact': artifact})
+    mw.watchTrash()
+
+    maxJobs = settings.db['MATRIX_MAX_JOBS'] if settings.db['MATRIX_MAX_JOBS'] > 0 else os.cpu_count()
+    mw.showMessage("Building %d variants, %d at a time" % (len(jobs), maxJobs))
+    mw.btnBuildEXE.setEnabled(False)
+    mw.btnBuildMatrix.setEnabled(False)
+    mw.lblLEDBuild.setPixmap(QPixmap("pix/led_red.png"))
+    mw.tbwBuild.setCurrentIndex(0)
+    global tMatrix
+    global time1
+    time1 = time.time()
+    tMatrix = matrix.MatrixBuilder(mw, jobs, maxJobs)
+    tMatrix.linePrinted.connect(mw.showMessage)
+    tMatrix.matrixCompleted.connect(lambda results, mw=mw: finalizeMatrix(results, mw))
+    tMatrix.start()
+
+#-------------------------------------------------------------------------------
+# finalizeMatrix()
+#-------------------------------------------------------------------------------
+def finalizeMatrix(results, mw):
+    mw.lblTimeBuild.setText(utils.getHumanTime(time.time() - time1))
+    mw.lblLEDBuild.setPixmap(QPixmap("pix/led_green.png"))
+    mw.btnBuildEXE.setEnabled(True)
+    mw.btnBuildMatrix.setEnabled(True)
+    mw.lastMatrix = results
+
+    rows = []
+    mw.output.write("")
+    mw.output.write("Matrix build summary")
+    mw.output.write("====================")
+    for r in results:
+        mw.output.write("{}\tRC={}\t{}\t{}".format(r['label'], r['rc'], utils.getHumanTime(r['elapsed']), utils.getHumanSize(r['size'])))
+        rows.append([r['label'], r['rc'], round(r['elapsed'], 2), r['size'], utils.getHumanSize(r['size']), r['artifact']])
+    mw.output.write("")
+    failed = len([r for r in results if r['rc'] != 0])
+    mw.lblRCBuild.setText("RC=%d" % (1 if failed > 0 else 0))
+    mw.showMessage("Matrix build completed, %d variant(s) failed" % (failed))
+    dlg = dialog.DlgTable("Matrix build summary", ["Variant", "Return code", "Wall time (s)", "Size (bytes)", "Size", "Artifact"], rows, mw)
+    dlg.exec()
+
+#-------------------------------------------------------------------------------
+# showJobQueue()
+#-------------------------------------------------------------------------------
+def showJobQueue(mw):
+    global jobQueue
+    import jobqueue
+    if jobQueue is None:
+        jobQueue = jobqueue.JobQueue(mw)
+        jobQueue.linePrinted.connect(mw.showMessage)
+    dlg = dialog.DlgJobs(mw, jobQueue, lambda target, mw=mw: addJob(mw, target))
+    dlg.exec()
+
+#-------------------------------------------------------------------------------
+# addJob()
+# Queue the build of a main script or spec file with the current form options
+#-------------------------------------------------------------------------------
+def addJob(mw, target):
+    target = os.path.abspath(target)
+    cwd = os.path.dirname(target)
+    work_path = mw.txtWorkPath.text() if mw.txtWorkPath.text() else "build"
+    if not os.path.isabs(work_path):
+        work_path = os.path.join(cwd, work_path)
+    profile = getFormProfile(mw, {'main': target, 'name': "", 'noconfirm': True})
+    if jobQueue.addJob(target, profile.getCommandLine(GEN_EXE), cwd, work_path, profile.toDict()):
+        mw.showMessage("Job queued for %s" % (target))
+    else:
+        mw.showMessage("Same job already queued for %s" % (target))
+
 #-------------------------------------------------------------------------------
 # cleanUp()
 #-------------------------------------------------------------------------------
 def cleanUp(mw):
     dist_path = mw.txtDistPath.text() if mw.txtDistPath.text() else os.path.join(mw.source_path, "dist")
     if os.path.normpath(dist_path) == os.path.normpath(mw.source_path):
-        dist_path = os.path.join(source_path, "dist")
+        dist_path = os.path.join(mw.source_path, "dist")
     work_path = mw.txtWorkPath.text() if mw.txtWorkPath.text() else os.path.join(mw.source_path, "build")
     if os.path.normpath(work_path) == os.path.normpath(mw.source_path):
         work_path = os.path.join(mw.source_path, "build")
-    utils.deleteFolder(dist_path)
-    utils.deleteFolder(work_path)
+    # Renamed aside at once, the old trees are deleted while PyInstaller runs
+    trash.moveToTrash(dist_path)
+    trash.moveToTrash(work_path)
+    mw.watchTrash()
 
 #-------------------------------------------------------------------------------
-# isEXE()
+# getEXE()
 #-------------------------------------------------------------------------------
-def isEXE(fpath):
-      return os.path.isfile(fpath) and os.access(fpath, os.X_OK)
+def getEXE(fpath):
+    return scanner.getExecutables(fpath)
 
 #-------------------------------------------------------------------------------
-# getEXE()
+# getListItems()
 #-------------------------------------------------------------------------------
-def getEXE(fpath):
-    aEXE = []
-    for r, d, f in os.walk(fpath):
-        for file in f:
-            if isEXE(os.path.join(r, file)):
-                aEXE.append(os.path.join(r, file))
-    print(aEXE)
-    return aEXE
+def getListItems(lstWidget):
+    return [str(lstWidget.item(i).text()) for i in range(lstWidget.count())]
+
+#-------------------------------------------------------------------------------
+# getFormOptions()
+# Read the build options from the GUI, see command.DEFAULT_OPTIONS
+# overrides is a dict of options taking precedence over the GUI widgets
+#-------------------------------------------------------------------------------
+def getFormOptions(mw, overrides=None):
+    options = {
+        'main'                          : mw.txtMainFile.text(),
+        'onefile'                       : not mw.chkOneDir.isChecked(),
+        'workpath'                      : mw.txtWorkPath.text(),
+        'distpath'                      : mw.txtDistPath.text(),
+        'specpath'                      : mw.txtSpecPath.text(),
+        'upx_dir'                       : mw.txtUPXDir.text(),
+        'ascii'                         : mw.chkAscii.isChecked(),
+        'clean'                         : mw.chkClean.isChecked(),
+        'log_level'                     : mw.cbxLogLevel.currentText(),
+        'noconfirm'                     : mw.chkNoConfirm.isChecked(),
+        'name'                          : mw.txtName.text(),
+        'key'                           : mw.txtKey.text(),
+        'debug'                         : mw.cbxDebug.currentText(),
+        'strip'                         : mw.chkStrip.isChecked(),
+        'noupx'                         : mw.chkNoUPX.isChecked(),
+        'paths'                         : getListItems(mw.lstPaths),
+        'add_data'                      : getListItems(mw.lstAddData),
+        'add_binary'                    : getListItems(mw.lstAddBinary),
+        'hidden_import'                 : getListItems(mw.lstHiddenImport),
+        'collect_submodules'            : getListItems(mw.lstCollectSubmodules),
+        'collect_data'                  : getListItems(mw.lstCollectData),
+        'collect_binaries'              : getListItems(mw.lstCollectBinaries),
+        'collect_all'                   : getListItems(mw.lstCollectAll),
+        'copy_metadata'                 : getListItems(mw.lstCopyMetadata),
+        'recursive_copy_metadata'       : getListItems(mw.lstRecursiveCopyMetadata),
+        'additional_hooks_dir'          : getListItems(mw.lstAdditionalHooksDir),
+        'runtime_hook'                  : getListItems(mw.lstRuntimeHook) + getProfileHook(),
+        'exclude_module'                : getListItems(mw.lstExcludeModule),
+        'runtime_tmpdir'                : mw.txtRuntimeTmpDir.text(),
+        'bootloader_ignore_signals'     : mw.chkBootloaderIgnoreSignals.isChecked(),
+        'extra_options'                 : mw.txtExtraOptions.text(),
+        'console'                       : mw.chkConsole.isChecked(),
+        'windowed'                      : mw.chkWindowed.isChecked(),
+        'icon'                          : mw.txtIcon.text(),
+        'disable_windowed_traceback'    : mw.chkDisableWindowedTraceback.isChecked(),
+        'version_file'                  : mw.txtVersionFile.text(),
+        'manifest'                      : mw.txtManifest.text(),
+        'resource'                      : getListItems(mw.lstResource),
+        'uac_admin'                     : mw.chkUACAdmin.isChecked(),
+        'uac_uiaccess'                  : mw.chkUACUIAccess.isChecked(),
+        'win_private_assemblies'        : mw.chkWinPrivateAssemblies.isChecked(),
+        'win_no_prefer_redirects'       : mw.chkWinNoPreferRedirects.isChecked(),
+        'osx_bundle_identifier'         : mw.txtOSXBundleIdentifier.text(),
+        'target_architecture'           : mw.cbxTargetArchitecture.currentText(),
+        'codesign_identity'             : mw.txtCodesignIdentity.text(),
+        'osx_entitlements_file'         : mw.txtOSXEntitlementsFile.text(),
+    }
+    if overrides is not None:
+        options.update(overrides)
+    return options
+
+#-------------------------------------------------------------------------------
+# getProfileHook()
+# The import tracing runtime hook, when it has to be bundled
+#-------------------------------------------------------------------------------
+def getProfileHook():
+    if not settings.db['PROFILE_IMPORTS_HOOK']:
+        return []
+    import importprofile
+    return [importprofile.getHookFile()]
+
+#-------------------------------------------------------------------------------
+# getFormProfile()
+#-------------------------------------------------------------------------------
+def getFormProfile(mw, overrides=None):
+    return buildprofile.BuildProfile(getFormOptions(mw, overrides))
 
 #-------------------------------------------------------------------------------
 # buildCommand()
 #-------------------------------------------------------------------------------
-def buildCommand(mw, gen_mode):
-    if mw.txtMainFile.text() == "":
+def buildCommand(mw, gen_mode, overrides=None):
+    profile = getFormProfile(mw, overrides)
+    if profile.main == "":
         mw.showMessage("Nothing to build")
         return
 
-    #---------------------------------------------------------------------------
-    # Build the command line
-    #---------------------------------------------------------------------------
-    source_file = '"{}"'.format(mw.txtMainFile.text())
-    _, extension = splitext(source_file)
-    if extension == ".spec":
-        workPath_option = '--workpath "{}" '.format(mw.txtWorkPath.text()) if mw.txtWorkPath.text() else ''
-        distPath_option = '--distpath "{}" '.format(mw.txtDistPath.text()) if mw.txtDistPath.text() else ''
-        UPXDir_option = '--upx-dir "{}" '.format(mw.txtUPXDir.text()) if mw.txtUPXDir.text() else ''
-        ascii_option = '--ascii ' if mw.chkAscii.isChecked() else ''
-        clean_option = '--clean ' if mw.chkClean.isChecked() else ''
-        noConfirm_option = '--noconfirm ' if mw.chkNoConfirm.isChecked() else ''
-
-        command_line = 'pyinstaller {} {}{}{}{}{}{}'.format(\
-        source_file,\
-        workPath_option,\
-        distPath_option,\
-        UPXDir_option,\
-        ascii_option,\
-        clean_option,\
-        noConfirm_option)
-    else:
-    #---------------------------------------------------------------------------
-    # Set the general options according to the GUI
-    #---------------------------------------------------------------------------
-        gen_option = '-D ' if mw.chkOneDir.isChecked() else '-F '
-        workPath_option = '--workpath "{}" '.format(mw.txtWorkPath.text()) if mw.txtWorkPath.text() else ''
-        distPath_option = '--distpath "{}" '.format(mw.txtDistPath.text()) if mw.txtDistPath.text() else ''
-        specPath_option = '--specpath "{}" '.format(mw.txtSpecPath.text()) if mw.txtSpecPath.text() else ''
-        UPXDir_option = '--upx-dir "{}" '.format(mw.txtUPXDir.text()) if mw.txtUPXDir.text() else ''
-        ascii_option = '--ascii ' if mw.chkAscii.isChecked() else ''
-        clean_option = '--clean ' if mw.chkClean.isChecked() else ''
-        logLevel_option = '--log-level "{}" '.format(mw.cbxLogLevel.currentText()) if mw.cbxLogLevel.currentText() else ''
-        noConfirm_option = '--noconfirm ' if mw.chkNoConfirm.isChecked() else ''
-        name_option = '--name "{}" '.format(mw.txtName.text()) if mw.txtName.text() else ''
-        key_option = '--key {} '.format(mw.txtKey.text()) if mw.txtKey.text() else ''
-        debug_option = '--debug "{}" '.format(mw.cbxDebug.currentText()) if mw.cbxDebug.currentText() != "none" else ''
-        strip_option = '--strip ' if mw.chkStrip.isChecked() else ''
-        noUPX_option = '--noupx ' if mw.chkNoUPX.isChecked() else ''
-        paths_option = getAddOptionsFromList(mw.lstPaths, "--paths")
-        addData_option = getAddOptionsFromList(mw.lstAddData, "--add-data")
-        addBinary_option = getAddOptionsFromList(mw.lstAddBinary, "--add-binary")
-        hiddenImport_option = getAddOptionsFromList(mw.lstHiddenImport, "--hidden-import")
-        collectSubmodules_option = getAddOptionsFromList(mw.lstPaths, "--collect-submodules")
-        collectData_option = getAddOptionsFromList(mw.lstPaths, "--collect-data")
-        collectBinaries_option = getAddOptionsFromList(mw.lstPaths, "--collect-binaries")
-        collectAll_option = getAddOptionsFromList(mw.lstPaths, "--collect-all")
-        copyMetadata_option = getAddOptionsFromList(mw.lstPaths, "--copy-metadata")
-        recursiveCopyMetadata_option = getAddOptionsFromList(mw.lstPaths, "--recursive-copy-metadata")
-        additionalHooksDir_option = getAddOptionsFromList(mw.lstAdditionalHooksDir, "--additional-hooks-dir")
-        runtimeHook_option = getAddOptionsFromList(mw.lstRuntimeHook, "--runtime-hook")
-        excludeModule_option = getAddOptionsFromList(mw.lstExcludeModule, "--exclude-module")
-        runtimeTmpDir_option = '--runtime-tmpdir "{}" '.format(mw.txtRuntimeTmpDir.text()) if mw.txtRuntimeTmpDir.text() else ''
-        bootloaderIgnoreSignals_option = '--bootloader-ignore-signals ' if mw.chkBootloaderIgnoreSignals.isChecked() else ''
-        extraOptions_option = "{}".format(mw.txtExtraOptions.text()) if mw.txtExtraOptions.text() else ''
-
-        #---------------------------------------------------------------------------
-        # Set the Windows and Mac OS X specific options according to the GUI
-        #---------------------------------------------------------------------------
-        console_option = '--console ' if mw.chkConsole.isChecked() else ''
-        windowed_option = '--windowed ' if mw.chkWindowed.isChecked() else ''
-        icon_option = '--icon "{}" '.format(mw.txtIcon.text()) if mw.txtIcon.text() else ''
-        disableWindowedTraceback_option = '--disable-windowed-traceback ' if mw.chkDisableWindowedTraceback.isChecked() else ''
-
-        #---------------------------------------------------------------------------
-        # Set the Windows specific options according to the GUI
-        #---------------------------------------------------------------------------
-        versionFile_option = '--version-file "{}" '.format(mw.txtVersionFile.text()) if mw.txtVersionFile.text() else ''
-        manifest_option = '--manifest "{}" '.format(mw.txtManifest.text()) if mw.txtManifest.text() else ''
-        resource_option = getAddOptionsFromList(mw.lstResource, "--resource")
-        UACAdmin_option = '--uac-admin ' if mw.chkUACAdmin.isChecked() else ''
-        UACUIAccess_option = '--uac-uiaccess ' if mw.chkUACUIAccess.isChecked() else ''
-        winPrivateAssemblies_option = '--win-private-assemblies ' if mw.chkWinPrivateAssemblies.isChecked() else ''
-        winNoPreferRedirects_option = '--win-no-prefer-redirects ' if mw.chkWinNoPreferRedirects.isChecked() else ''
-
-        #---------------------------------------------------------------------------
-        # Set the Mac OS X specific options according to the GUI
-        #---------------------------------------------------------------------------
-        OSXBundleIdentifier_option = '--osx-bundle-identifier "{}" '.format(mw.txtOSXBundleIdentifier.text()) if mw.txtOSXBundleIdentifier.text() else ''
-        targetArchitecture_option = '--target-architecture "{}" '.format(mw.cbxTargetArchitecture.currentText()) if mw.cbxTargetArchitecture.currentText() != "current" else ''
-        codesignIdentity_option = '--codesign-identity "{}" '.format(mw.txtCodesignIdentity.text()) if mw.txtCodesignIdentity.text() else ''
-        OSXEntitlementsFile_option = '--osx-entitlements-file "{}" '.format(mw.txtOSXEntitlementsFile.text()) if mw.txtOSXEntitlementsFile.text() else ''
-
-        if gen_mode == GEN_EXE:
-            program = 'pyinstaller'
-        else:
-            program = 'pyi-makespec'
-            # The following options are not recognized when generating a spec file
-            # So, we clear them just in case of...
-            ascii_option = ""
-            clean_option = ""
-            noConfirm_option = ""
-
-        command_line = '{} {}{} {}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}'.format(\
-        program,\
-        gen_option,\
-        source_file,\
-        workPath_option,\
-        distPath_option,\
-        specPath_option,\
-        addData_option,\
-        addBinary_option,\
-        paths_option,\
-        name_option,\
-        UPXDir_option,\
-        ascii_option,\
-        clean_option,\
-        logLevel_option,\
-        noConfirm_option,\
-        key_option,\
-        debug_option,\
-        strip_option,\
-        noUPX_option,\
-        hiddenImport_option,\
-        collectSubmodules_option,\
-        collectData_option,\
-        collectBinaries_option,\
-        collectAll_option,\
-        copyMetadata_option,\
-        recursiveCopyMetadata_option,\
-        additionalHooksDir_option,\
-        runtimeHook_option,\
-        excludeModule_option,\
-        runtimeTmpDir_option,\
-        bootloaderIgnoreSignals_option,\
-        extraOptions_option,\
-        console_option,\
-        windowed_option,\
-        icon_option,\
-        disableWindowedTraceback_option,\
-        versionFile_option,\
-        manifest_option,\
-        resource_option,\
-        UACAdmin_option,\
-        UACUIAccess_option,\
-        winPrivateAssemblies_option,\
-        winNoPreferRedirects_option,\
-        OSXBundleIdentifier_option,\
-        targetArchitecture_option,\
-        codesignIdentity_option,\
-        OSXEntitlementsFile_option,\
-        extraOptions_option\
-        )
-    print(command_line)
-    return command_line
+    return profile.getCommandLine(gen_mode)
 
 #-------------------------------------------------------------------------------
 # browseMainFile()
@@ -570,33 +727,10 @@ def setMainFile(mw, filename):
         mw.txtMainFile.setText(filename)
         _, extension = splitext(filename)
         if extension == ".spec":
-            # readSpecFile(filename)
-            spec = open(filename, 'r').read()
-            mw.filename = filename
-            mw.txtSpecFile.setPlainText(spec)
-            mw.tbwBuild.setCurrentIndex(2)
             mw.showMessage("Opening %s file" % (filename))
-            mw.txtSpecFile.textChanged.connect(mw.changedText)
-            mw.lblModified.setText("")
-            mw.dirtyFlag = False
-            mw.setEnabledGUI(False)
-            # Only these options are available when building from spec file
-            mw.lblDistPath.setEnabled(True)
-            mw.txtDistPath.setEnabled(True)
-            mw.lblWorkPath.setEnabled(True)
-            mw.txtWorkPath.setEnabled(True)
-            mw.lblUPXDir.setEnabled(True)
-            mw.txtUPXDir.setEnabled(True)
-            mw.lblAscii.setEnabled(True)
-            mw.chkAscii.setEnabled(True)
-            mw.lblClean.setEnabled(True)
-            mw.chkClean.setEnabled(True)
-            mw.lblNoConfirm.setEnabled(True)
-            mw.chkNoConfirm.setEnabled(True)
-            # Enable the build button
-            mw.btnBuildEXE.setEnabled(True)
-            mw.btnGenSpec.setEnabled(False)
+            openSpecFile(mw, filename)
         else:
+            mw.specOptions = None
             mw.tbwBuild.setCurrentIndex(0)
             mw.showMessage("Main file set as %s" % (filename))
             mw.txtSpecFile.setPlainText("")
@@ -606,6 +740,7 @@ def setMainFile(mw, filename):
             # Enable the build and gen spec buttons
             mw.btnBuildEXE.setEnabled(True)
             mw.btnGenSpec.setEnabled(True)
+            mw.btnBuildMatrix.setEnabled(True)
     else:
         mw.showMessage("Unknown file %s" % (filename))
         mw.setEnabledGUI(False)
@@ -626,10 +761,195 @@ def runEXE(mw):
     else:
         mw.showMessage("Nothing to run")
 
+#-------------------------------------------------------------------------------
+# benchEXE()
+# Benchmark the startup of the built executable, and of the executables of
+# the last matrix build to compare them side by side
+#-------------------------------------------------------------------------------
+def benchEXE(mw, afterBuild=False):
+    import startbench
+    targets = []
+    if mw.lblRunEXE.text() != const.db['PROGRAM_NONE']:
+        targets.append(("onedir" if mw.chkOneDir.isChecked() else "onefile", mw.lblRunEXE.text()))
+    if not afterBuild and mw.lastMatrix is not None:
+        for r in mw.lastMatrix:
+            if r['rc'] == 0:
+                targets.append(("matrix %s" % r['label'], startbench.getExecutable(r['artifact'])))
+    if not targets:
+        mw.showMessage("Nothing to benchmark")
+        return
+
+    global tBench
+    mw.btnBenchEXE.setEnabled(False)
+    mw.btnRunEXE.setEnabled(False)
+    mw.lblLEDBuild.setPixmap(QPixmap("pix/led_red.png"))
+    tBench = startbench.StartupBench(mw, targets, settings.db['STARTUP_BENCH_RUNS'], settings.db['STARTUP_BENCH_WARMUPS'], settings.db['STARTUP_BENCH_PROBE'], settings.db['STARTUP_BENCH_TIMEOUT'])
+    tBench.linePrinted.connect(mw.showMessage)
+    tBench.benchCompleted.connect(lambda results, mw=mw, afterBuild=afterBuild: finalizeBench(results, mw, afterBuild))
+    tBench.start()
+
+#-------------------------------------------------------------------------------
+# finalizeBench()
+#-------------------------------------------------------------------------------
+def finalizeBench(results, mw, afterBuild):
+    import history
+    mw.btnBenchEXE.setEnabled(True)
+    mw.btnRunEXE.setEnabled(True)
+    mw.lblLEDBuild.setPixmap(QPixmap("pix/led_green.png"))
+    budget = settings.db['STARTUP_BUDGET_MS']
+
+    rows = []
+    overBudget = []
+    mw.output.write("")
+    mw.output.write("Startup benchmark (ms)")
+    mw.output.write("======================")
+    for r in results:
+        if 'error' in r:
+            mw.output.write("{}\t{}".format(r['label'], r['error']))
+            rows.append([r['label'], None, None, None, None, None, None, r['error']])
+            continue
+        mw.output.write("{}\tmin {}\tmedian {}\tp95 {}\tstdev {}\textracted {}".format(r['label'], r['min'], r['median'], r['p95'], r['stdev'], utils.getHumanSize(r['extracted'])))
+        rows.append([r['label'], r['runs'], r['min'], r['median'], r['p95'], r['stdev'], r['extracted'], r['executable']])
+        if budget > 0 and r['median'] > budget:
+            overBudget.append(r['label'])
+    mw.output.write("")
+
+    # The build is recorded and cached only now, as failed if over budget
+    if afterBuild:
+        completeBuild(mw, 1 if overBudget else 0)
+
+    # The first target is the executable just built
+    if mw.lastBuildId is not None and 'error' not in results[0] and results[0]['executable'] == mw.lblRunEXE.text():
+        try:
+            db = history.BuildHistory()
+            db.setStartup(mw.lastBuildId, results[0])
+            db.close()
+        except Exception as error:
+            mw.output.write("Can't record the benchmark into the history : %s" % error)
+
+    if overBudget:
+        mw.output.write("!!! STARTUP BUDGET OF %d ms EXCEEDED BY %s !!!" % (budget, ", ".join(overBudget)))
+        mw.output.write("")
+        if afterBuild:
+            mw.lblLEDBuild.setPixmap(QPixmap("pix/led_red.png"))
+            mw.lblRCBuild.setText("RC=1")
+            mw.showMessage("Build failed, the startup time exceeds the budget of %d ms" % budget)
+            return
+    mw.showMessage("Startup benchmark completed")
+    if not afterBuild:
+        dlg = dialog.DlgTable("Startup benchmark", ["Executable", "Runs", "Min (ms)", "Median (ms)", "P95 (ms)", "Stdev (ms)", "Extracted (bytes)", "Path"], rows, mw, exportData=results)
+        dlg.exec()
+
+#-------------------------------------------------------------------------------
+# suggestExcludes()
+# Look for the optional parts of the import graph, to fill lstExcludeModule
+#-------------------------------------------------------------------------------
+def suggestExcludes(mw):
+    import buildcache
+    import excludes
+    main = mw.txtMainFile.text()
+    if main and os.path.isfile(main) and command.isSpecFile(main):
+        try:
+            scripts = specreader.SpecFile(mw.txtSpecFile.toPlainText()).getScripts()
+        except SyntaxError:
+            scripts = []
+        main = os.path.join(os.path.dirname(main), scripts[0]) if scripts else ""
+    if not main or not os.path.isfile(main):
+        mw.showMessage("A main script is needed to analyze its imports")
+        return
+    interpreter = buildcache.getInterpreter()
+    mw.setCursor(Qt.WaitCursor)
+    try:
+        graph = excludes.ImportGraph(main, getListItems(mw.lstPaths), interpreter)
+        candidates = graph.getCandidates(getListItems(mw.lstExcludeModule))
+    finally:
+        mw.setCursor(Qt.ArrowCursor)
+    if not candidates:
+        mw.showMessage("No module to exclude found in %d modules" % len(graph.edges))
+        return
+
+    dlg = dialog.DlgExcludes(mw, candidates, lambda c: excludes.measureImportTimes(interpreter, c, os.path.dirname(os.path.abspath(main))), lambda modules: addExcludedModules(mw, modules))
+    dlg.exec()
+
+#-------------------------------------------------------------------------------
+# addExcludedModules()
+#-------------------------------------------------------------------------------
+def addExcludedModules(mw, modules):
+    current = getListItems(mw.lstExcludeModule)
+    mw.lstExcludeModule.addItems([m for m in modules if m not in current])
+    mw.showMessage("Excluded modules : %s" % ", ".join(modules))
+
+#-------------------------------------------------------------------------------
+# profileEXE()
+# Run the built executable with the import tracing runtime hook active
+#-------------------------------------------------------------------------------
+def profileEXE(mw):
+    import importprofile
+    exe = mw.lblRunEXE.text()
+    if exe == const.db['PROGRAM_NONE'] or not os.path.exists(exe):
+        mw.showMessage("Nothing to profile")
+        return
+    if not importprofile.hasHook(exe):
+        mw.showMessage("The import tracing hook is not bundled, enable PROFILE_IMPORTS_HOOK and build again")
+        return
+
+    global tProfile
+    mw.btnProfileEXE.setEnabled(False)
+    mw.btnRunEXE.setEnabled(False)
+    mw.lblLEDBuild.setPixmap(QPixmap("pix/led_red.png"))
+    tProfile = importprofile.ImportProfiler(mw, exe, mw.txtParamsEXE.text(), settings.db['PROFILE_IMPORTS_TIMEOUT'])
+    tProfile.linePrinted.connect(mw.showMessage)
+    tProfile.profileCompleted.connect(lambda records, mw=mw, exe=exe: finalizeProfile(records, mw, exe))
+    tProfile.start()
+
+#-------------------------------------------------------------------------------
+# finalizeProfile()
+#-------------------------------------------------------------------------------
+def finalizeProfile(records, mw, exe):
+    import importprofile
+    mw.btnProfileEXE.setEnabled(True)
+    mw.btnRunEXE.setEnabled(True)
+    mw.lblLEDBuild.setPixmap(QPixmap("pix/led_green.png"))
+    if not records:
+        mw.showMessage("No import traced")
+        return
+    modules, packages = importprofile.getOffenders(records, settings.db['PROFILE_IMPORTS_TOP'])
+    mw.output.write("")
+    mw.output.write("Slowest imports (self ms)")
+    mw.output.write("=========================")
+    for name, selfTime in modules:
+        mw.output.write("{}\t{:.2f}".format(name, selfTime / 1000.0))
+    mw.output.write("")
+    dlg = dialog.DlgImportProfile(mw, exe, importprofile.buildTree(records), modules, packages, lambda modules: addExcludedModules(mw, modules))
+    dlg.exec()
+
+#-------------------------------------------------------------------------------
+# showSizes()
+# Attribute the bytes of the built artifact to packages, libraries and data
+#-------------------------------------------------------------------------------
+def showSizes(mw):
+    import sizeanalyzer
+    if mw.lblRunEXE.text() == const.db['PROGRAM_NONE'] or not os.path.exists(mw.lblRunEXE.text()):
+        mw.showMessage("Nothing to analyze")
+        return
+    exe = mw.lblRunEXE.text()
+    artifact = os.path.dirname(exe) if mw.chkOneDir.isChecked() else exe
+    mw.setCursor(Qt.WaitCursor)
+    try:
+        report = sizeanalyzer.getReport(artifact, exe)
+    except OSError as error:
+        mw.showMessage("Can't analyze %s : %s" % (artifact, error))
+        return
+    finally:
+        mw.setCursor(Qt.ArrowCursor)
+    dlg = dialog.DlgSizeReport(mw, report, sizeanalyzer.getOffenders(report, settings.db['SIZE_TOP_OFFENDERS']))
+    dlg.exec()
+
 #-------------------------------------------------------------------------------
 # runCommand()
 #-------------------------------------------------------------------------------
-def runCommand(command, cwd, mw, typeRun):
+def runCommand(command, cwd, mw, typeRun, prepare=None):
+    import buildlog
     global mode
     mode = typeRun
 
@@ -637,15 +957,27 @@ def runCommand(command, cwd, mw, typeRun):
     mw.btnBuildEXE.setEnabled(False)
     mw.lblLEDBuild.setPixmap(QPixmap("pix/led_red.png"))
     mw.repaint()
-    mw.txtBuildOutput.appendPlainText("%s%s %s" % (nowPrompt(),settings.db['SHELL_PROMPT'], command))
+    mw.output.write("%s %s" % (settings.db['SHELL_PROMPT'], command))
     global time1
     time1 = time.time()
     mw.btnBreakEXE.setEnabled(True)
     mw.tbwBuild.setCurrentIndex(0)
     QGuiApplication.processEvents()
     global tCmd
-    tCmd = shrealding.Shreald(mw, command, cwd, shell=True)
+    if tCmd is not None:
+        tCmd.log.close()
+    if typeRun == MODE_RUN:
+        kind = "run"
+    elif gen == GEN_SPEC:
+        kind = "spec"
+    else:
+        kind = "build"
+    buildlog.pruneLogs(settings.db['OUTPUT_LOGS_KEEP'])
+    logFile = buildlog.BuildLogWriter(kind, settings.db['SHELL_CODEPAGE'])
+    mw.lastLogFile = logFile.path
+    tCmd = shrealding.Shreald(mw, command, cwd, shell=True, logFile=logFile, prepare=prepare)
     tCmd.linePrinted.connect(lambda line, mw=mw: handleLine(line, mw))
+    tCmd.start()
     mw.lblTimeBuild.setText("---")
 
 #-------------------------------------------------------------------------------
@@ -656,14 +988,14 @@ def handleLine(line, mw):
     if line !=  "":
         if line[0] == '1':
             if mode == MODE_BUILD:
-                mw.txtBuildOutput.appendPlainText("%s%s" % (nowPrompt(), line[1:].rstrip()))
+                mw.output.write("%s" % (line[1:].rstrip()))
             else:
-                mw.txtBuildOutput.appendPlainText("%s[OUT] %s" % (nowPrompt(), line[1:].rstrip()))
+                mw.output.write("[OUT] %s" % (line[1:].rstrip()))
         elif line[0] == '2':
             if mode == MODE_BUILD:
-                mw.txtBuildOutput.appendPlainText("%s%s" % (nowPrompt(), line[1:].rstrip()))
+                mw.output.write("%s" % (line[1:].rstrip()))
             else:
-                mw.txtBuildOutput.appendPlainText("%s[ERR] %s" % (nowPrompt(), line[1:].rstrip()))
+                mw.output.write("[ERR] %s" % (line[1:].rstrip()))
         elif line[0] == 'x':
             killProcess(mw)
 
@@ -684,9 +1016,10 @@ def killProcess(mw):
 def finalizeCommand(mw):
     global tCmd
     global time1
-    mw.txtBuildOutput.appendPlainText("%s" % nowPrompt())
-    mw.txtBuildOutput.appendPlainText("%sEnd of shreald with PID %s" % (nowPrompt(), str(tCmd.process.pid)))
-    mw.txtBuildOutput.appendPlainText("%sReturn code is %d" % (nowPrompt(), tCmd.returncode))
+    mw.output.write("")
+    if tCmd.process is not None:
+        mw.output.write("End of shreald with PID %s" % (str(tCmd.process.pid)))
+    mw.output.write("Return code is %d" % (tCmd.returncode))
     time2 = time.time()
     elapsed = time2 - time1
     mw.lblTimeBuild.setText(utils.getHumanTime(elapsed))
@@ -701,40 +1034,28 @@ def finalizeCommand(mw):
     global mode
     global gen
 
+    if gen == GEN_EXE and mode == MODE_BUILD and cacheHit is not None:
+        restoreFromCache(mw)
+        mw.setCursor(Qt.ArrowCursor)
+        return
+
+    if mode == MODE_BUILD:
+        showPhases(tCmd.phases, mw)
+        global buildElapsed
+        buildElapsed = elapsed
+        if gen == GEN_EXE:
+            # The --collect-* expansions the build didn't find are computed
+            # for the next one
+            prefetchCollect(mw)
+
     if gen == GEN_SPEC:
         if tCmd.returncode == 0:
             # Grab the generated spec filename from the shreald's log
             # and open this spec file into the editor
-            for line in tCmd.log:
-                if line.startswith("1wrote"):
-                    specFileName = line.split(' ', maxsplit=1)[1].strip()
-                    spec = open(specFileName, 'r').read()
-                    mw.filename = specFileName
-                    mw.txtSpecFile.setPlainText(spec)
-                    mw.txtMainFile.setText(specFileName)
-                    mw.txtMainFile.deselect()
-                    mw.tbwBuild.setCurrentIndex(2)
-                    mw.txtSpecFile.textChanged.connect(mw.changedText)
-                    mw.lblModified.setText("")
-                    mw.dirtyFlag = False
-                    mw.setEnabledGUI(False)
-                    # Only these options are available when building from spec file
-                    mw.lblDistPath.setEnabled(True)
-                    mw.txtDistPath.setEnabled(True)
-                    mw.lblWorkPath.setEnabled(True)
-                    mw.txtWorkPath.setEnabled(True)
-                    mw.lblUPXDir.setEnabled(True)
-                    mw.txtUPXDir.setEnabled(True)
-                    mw.lblAscii.setEnabled(True)
-                    mw.chkAscii.setEnabled(True)
-                    mw.lblClean.setEnabled(True)
-                    mw.chkClean.setEnabled(True)
-                    mw.lblNoConfirm.setEnabled(True)
-                    mw.chkNoConfirm.setEnabled(True)
-                    # Enable the build button
-                    mw.btnBuildEXE.setEnabled(True)
-                    mw.btnGenSpec.setEnabled(False)
-                    break
+            specFileName = tCmd.log.marker('wrote')
+            if specFileName is not None and os.path.isfile(specFileName):
+                openSpecFile(mw, specFileName)
+                mw.txtMainFile.deselect()
             mw.showMessage("Spec file successfully generated")
         else:
             mw.showMessage("Error when generating spec file")
@@ -747,24 +1068,32 @@ def finalizeCommand(mw):
                 # aEXE = getEXE(os.path.join(source_path,"dist"))
                 if os.path.exists(name_EXE):
                     fInfo = utils.getFileInfo(name_EXE)
-                    mw.txtBuildOutput.appendPlainText("%s" % nowPrompt())
-                    mw.txtBuildOutput.appendPlainText("%sExecutable file info" % nowPrompt())
-                    mw.txtBuildOutput.appendPlainText("%s====================" % nowPrompt())
+                    mw.output.write("")
+                    mw.output.write("Executable file info")
+                    mw.output.write("====================")
                     for key, value in fInfo.items():
-                        mw.txtBuildOutput.appendPlainText("{}{}\t{}".format(nowPrompt(), key, value))
-                    mw.txtBuildOutput.appendPlainText("%s" % nowPrompt())
+                        mw.output.write("{}\t{}".format(key, value))
+                    mw.output.write("")
                     mw.lblRunEXE.setText(name_EXE)
                     mw.showMessage("Build completed successfully")
+                    if settings.db['STARTUP_BENCH_AFTER_BUILD']:
+                        # The build is completed by finalizeBench(), it fails
+                        # if its startup time exceeds the budget
+                        benchEXE(mw, afterBuild=True)
+                    else:
+                        completeBuild(mw, 0)
                 else:
-                    mw.txtBuildOutput.appendPlainText("%s" % nowPrompt())
-                    mw.txtBuildOutput.appendPlainText("%s!!! BUILD FAILED !!!" % nowPrompt())
-                    mw.txtBuildOutput.appendPlainText("%sCan't find the generated file %s." % (nowPrompt(), name_EXE))
-                    mw.txtBuildOutput.appendPlainText("%s" % nowPrompt())
+                    mw.output.write("")
+                    mw.output.write("!!! BUILD FAILED !!!")
+                    mw.output.write("Can't find the generated file %s." % (name_EXE))
+                    mw.output.write("")
+                    recordBuild(mw, buildElapsed, tCmd.returncode)
             else:
-                mw.txtBuildOutput.appendPlainText("%s" % nowPrompt())
-                mw.txtBuildOutput.appendPlainText("%s!!! BUILD FAILED !!!" % nowPrompt())
-                mw.txtBuildOutput.appendPlainText("%sRetry with checking first the upper right \"Clean\" option." % nowPrompt())
-                mw.txtBuildOutput.appendPlainText("%s" % nowPrompt())
+                recordBuild(mw, buildElapsed, tCmd.returncode)
+                mw.output.write("")
+                mw.output.write("!!! BUILD FAILED !!!")
+                mw.output.write("Retry with checking first the upper right \"Clean\" option.")
+                mw.output.write("")
                 # mw.lblLEDBuild.setPixmap(QPixmap("pix/led_red.png"))
                 mw.btnRunEXE.setEnabled(False)
                 mw.btnOpenFolder.setEnabled(False)
@@ -776,12 +1105,106 @@ def finalizeCommand(mw):
             mw.showMessage("End of runnning builded executable with return code %d" % tCmd.returncode)
     mw.setCursor(Qt.ArrowCursor)
 
+#-------------------------------------------------------------------------------
+# showPhases()
+# Print the time spent into each phase of the build, and the slowest hooks
+#-------------------------------------------------------------------------------
+def showPhases(parser, mw):
+    mw.lastPhases = parser
+    durations = parser.getDurations()
+    if not durations:
+        return
+    mw.output.write("")
+    mw.output.write("Build phases")
+    mw.output.write("============")
+    for name, ms in durations:
+        mw.output.write("{}\t{}".format(name, utils.getHumanTime(ms / 1000)))
+    hooks = parser.getSlowestHooks(settings.db['PHASES_SLOWEST_HOOKS'])
+    if hooks:
+        mw.output.write("")
+        mw.output.write("Slowest hooks")
+        mw.output.write("=============")
+        for name, ms in hooks:
+            mw.output.write("{}\t{}".format(name, utils.getHumanTime(ms / 1000)))
+
+#-------------------------------------------------------------------------------
+# completeBuild()
+# Record a successful build into the history, then store it into the build
+# cache and publish its workpath
+#-------------------------------------------------------------------------------
+def completeBuild(mw, returncode):
+    import buildcache
+    import workcache
+    recordBuild(mw, buildElapsed, returncode)
+    if returncode != 0:
+        return
+    if cacheBuild is not None:
+        # Copy the artifact into the build cache in the background
+        threading.Thread(target=buildcache.store, args=(cacheBuild[0], cacheBuild[1], getArtifactPath(mw), settings.db['BUILD_CACHE_MAX_ENTRIES']), daemon=True).start()
+    if cacheWork is not None:
+        threading.Thread(target=workcache.publish, args=(settings.db['WORKPATH_CACHE_ROOT'], cacheWork[0], cacheWork[1], cacheWork[2], settings.db['WORKPATH_CACHE_MAX_SIZE'] * 1024 * 1024, settings.db['WORKPATH_CACHE_GRACE']), daemon=True).start()
+
+#-------------------------------------------------------------------------------
+# recordBuild()
+# Store the build into the history and warn about time or size regressions
+#-------------------------------------------------------------------------------
+def recordBuild(mw, elapsed, returncode):
+    import buildcache
+    import history
+    import workcache
+    artifact = getArtifactPath(mw)
+    size = scanner.getSize(artifact) if returncode == 0 and os.path.exists(artifact) else None
+    options = buildcache.hashString(json.dumps(command.buildArgv(buildOptions)))
+    try:
+        db = history.BuildHistory()
+        mw.lastBuildId = db.record(os.path.abspath(buildOptions['main']), options, workcache.getToolchain(buildcache.getInterpreter()), returncode, elapsed, size, tCmd.phases.getReport())
+        alerts = db.checkRegression(mw.lastBuildId, settings.db['HISTORY_ALERT_PERCENT'], settings.db['HISTORY_BASELINE_BUILDS']) if returncode == 0 else []
+        db.close()
+    except Exception as error:
+        mw.output.write("Can't record the build into the history : %s" % error)
+        return
+    for alert in alerts:
+        mw.output.write("!!! REGRESSION : %s" % alert)
+    if alerts:
+        mw.showMessage("Build regression : %s" % alerts[0])
+
+#-------------------------------------------------------------------------------
+# showHistory()
+# Trend of the builds of the current project
+#-------------------------------------------------------------------------------
+def showHistory(mw):
+    import history
+    source_file = mw.txtMainFile.text()
+    if source_file == "":
+        mw.showMessage("No project")
+        return
+    db = history.BuildHistory()
+    builds = db.getBuilds(os.path.abspath(source_file))
+    db.close()
+    rows = []
+    # Changes are computed against the previous build with the same options
+    for i, build in enumerate(builds):
+        previous = next((b for b in builds[i + 1:] if b['options'] == build['options'] and b['returncode'] == 0), None)
+        startup = build['startup']['median'] if build['startup'] else None
+        rows.append((
+            datetime.datetime.fromtimestamp(build['time']).strftime("%Y-%m-%d %H:%M:%S"),
+            build['options'][:8],
+            build['pyinstaller'],
+            build['returncode'],
+            round(build['elapsed'], 2),
+            round(history.getChange(build['elapsed'], previous['elapsed'] if previous else None) or 0, 1),
+            build['size'],
+            round(history.getChange(build['size'], previous['size'] if previous else None) or 0, 1),
+            startup,
+        ))
+    dlg = dialog.DlgTable("Build history of %s" % source_file, ["Date", "Options", "Python / PyInstaller", "RC", "Time (s)", "Time change (%)", "Size (bytes)", "Size change (%)", "Startup (ms)"], rows, mw, exportData=builds)
+    dlg.exec()
+
 #-------------------------------------------------------------------------------
 # nowPrompt()
 #-------------------------------------------------------------------------------
 def nowPrompt():
-    now = datetime.datetime.now()
-    return now.strftime(settings.db['OUTPUT_TIMESTAMP'])
+    return console.nowPrompt()
 
 #-------------------------------------------------------------------------------
 # patchChars()
@@ -795,24 +1218,105 @@ def patchChars(s):
     return(" ".join(ret))
 
 #-------------------------------------------------------------------------------
-# loadPythonFile()
+# openSpecFile()
+# Load a spec file into the editor, and its arguments into the form
+#-------------------------------------------------------------------------------
+def openSpecFile(mw, filename):
+    spec = open(filename, 'r').read()
+    mw.filename = filename
+    mw.txtSpecFile.setPlainText(spec)
+    mw.txtMainFile.setText(filename)
+    mw.tbwBuild.setCurrentIndex(2)
+    mw.lblModified.setText("")
+    mw.dirtyFlag = False
+    mw.setEnabledGUI(False)
+    # Only these options are available when building from spec file,
+    # with the arguments of the spec file enabled by fillFormFromSpec()
+    mw.lblDistPath.setEnabled(True)
+    mw.txtDistPath.setEnabled(True)
+    mw.lblWorkPath.setEnabled(True)
+    mw.txtWorkPath.setEnabled(True)
+    mw.lblUPXDir.setEnabled(True)
+    mw.txtUPXDir.setEnabled(True)
+    mw.lblAscii.setEnabled(True)
+    mw.chkAscii.setEnabled(True)
+    mw.lblClean.setEnabled(True)
+    mw.chkClean.setEnabled(True)
+    mw.lblNoConfirm.setEnabled(True)
+    mw.chkNoConfirm.setEnabled(True)
+    # Enable the build button
+    mw.btnBuildEXE.setEnabled(True)
+    mw.btnGenSpec.setEnabled(False)
+    mw.btnBuildMatrix.setEnabled(False)
+    fillFormFromSpec(mw, spec)
+
+#-------------------------------------------------------------------------------
+# getOptionWidget()
+#-------------------------------------------------------------------------------
+def getOptionWidget(mw, suffix):
+    for prefix in ("lst", "txt", "chk", "cbx"):
+        if hasattr(mw, prefix + suffix):
+            return getattr(mw, prefix + suffix)
+    return None
+
+#-------------------------------------------------------------------------------
+# fillFormFromSpec()
+# Fill the form with the arguments read from the spec file, without running it
 #-------------------------------------------------------------------------------
-def loadPythonFile(name, path):
-    spec = util.spec_from_file_location(name, path)
-    module = util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+def fillFormFromSpec(mw, spec):
+    mw.specOptions = None
+    try:
+        options, dynamic = specreader.SpecFile(spec).getOptions()
+    except SyntaxError as error:
+        mw.showMessage("Can't read the arguments of the spec file : %s" % error)
+        return
+    for option, suffix in SPEC_WIDGETS.items():
+        if option not in options:
+            continue
+        widget = getOptionWidget(mw, suffix)
+        if isinstance(widget, QListWidget):
+            widget.clear()
+            widget.addItems(options[option])
+        elif isinstance(widget, QLineEdit):
+            widget.setText(options[option])
+        elif isinstance(widget, QCheckBox):
+            widget.setChecked(options[option])
+        elif isinstance(widget, QComboBox):
+            widget.setCurrentText(options[option])
+        widget.setEnabled(True)
+        getattr(mw, "lbl" + suffix).setEnabled(True)
+    mw.chkOneDir.setChecked(not options['onefile'])
+    # What the form shows, its changes are patched into the spec file
+    mw.specOptions = getFormOptions(mw)
+    if dynamic:
+        mw.showMessage("Computed by the spec file, not in the form : %s" % ", ".join(dynamic))
 
 #-------------------------------------------------------------------------------
-# readSpecFile()
+# patchSpecFromForm()
+# Write the options changed in the form since the spec file was read into it,
+# the other arguments and the edits made in the editor are kept
 #-------------------------------------------------------------------------------
-def readSpecFile(specfile):
-    # not finished...
-    # The purpose of this function is to read options from spec file
-    # and fill the GUI options according to what we get from the spec file
-    pyfile = shutil.copy(specfile, os.path.join(tempfile.gettempdir(),"spec.py"))
-    specmodule = loadPythonFile("spec", pyfile)
-    print(specmodule.a.datas)
+def patchSpecFromForm(mw):
+    if mw.specOptions is None:
+        return
+    options = getFormOptions(mw)
+    # The import tracing hook is added to the build, never to the user's spec
+    options['runtime_hook'] = getListItems(mw.lstRuntimeHook)
+    changes = dict((k, v) for k, v in options.items() if k in SPEC_WIDGETS and v != mw.specOptions.get(k))
+    if not changes:
+        return
+    if 'console' in changes or 'windowed' in changes:
+        changes.update({'console': options['console'], 'windowed': options['windowed']})
+    try:
+        spec, changed = specreader.SpecFile(mw.txtSpecFile.toPlainText()).patch(changes)
+    except SyntaxError as error:
+        mw.showMessage("Can't patch the spec file : %s" % error)
+        return
+    mw.specOptions = options
+    if changed:
+        mw.txtSpecFile.setPlainText(spec)
+        mw.saveFile()
+        mw.showMessage("Spec file patched : %s" % ", ".join(changed))
 
 #-------------------------------------------------------------------------------
 # postProcess()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS = 8
+EXE_EXTENSIONS = (".exe", ".com", ".bat", ".cmd")
+
+#-------------------------------------------------------------------------------
+# isExecutable()
+#-------------------------------------------------------------------------------
+def isExecutable(name, st):
+    if os.name == "nt":
+        return name.lower().endswith(EXE_EXTENSIONS)
+    return bool(st.st_mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH))
+
+#-------------------------------------------------------------------------------
+# Class Scanner
+# Size, file count and executables of folder trees, in one pass of scandir
+#
+# The content of each folder is cached with the folder's mtime, which changes
+# when an entry is added, removed or renamed. A new scan only reads again the
+# folders having changed, the others just cost a stat. Files rewritten in
+# place keep their folder's mtime and are not seen, PyInstaller doesn't do so.
+#-------------------------------------------------------------------------------
+class Scanner():
+
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self.cache = {}
+        self.lock = threading.Lock()
+
+#-------------------------------------------------------------------------------
+# scanFolder()
+# Return the content of one folder : (size, files, executables, subfolders)
+#-------------------------------------------------------------------------------
+    def scanFolder(self, folder):
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            return 0, 0, [], []
+        with self.lock:
+            cached = self.cache.get(folder)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        size = 0
+        files = 0
+        executables = []
+        folders = []
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            folders.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            size += st.st_size
+                            files += 1
+                            if isExecutable(entry.name, st):
+                                executables.append(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            return 0, 0, [], []
+        content = (size, files, executables, folders)
+        with self.lock:
+            self.cache[folder] = (mtime, content)
+        return content
+
+#-------------------------------------------------------------------------------
+# scan()
+# Return a dict with the size, files, folders and executables of a tree
+#-------------------------------------------------------------------------------
+    def scan(self, root):
+        result = {'size': 0, 'files': 0, 'folders': 0, 'executables': []}
+        if os.path.isfile(root):
+            st = os.stat(root)
+            result.update({'size': st.st_size, 'files': 1, 'executables': [root] if isExecutable(root, st) else []})
+            return result
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = [pool.submit(self.scanFolder, os.path.abspath(root))]
+            while pending:
+                size, files, executables, folders = pending.pop().result()
+                result['size'] += size
+                result['files'] += files
+                result['folders'] += 1
+                result['executables'].extend(executables)
+                pending.extend(pool.submit(self.scanFolder, f) for f in folders)
+        result['executables'].sort()
+        return result
+
+#-------------------------------------------------------------------------------
+# forget()
+# Drop the cache of a tree, after deleting it for example
+#-------------------------------------------------------------------------------
+    def forget(self, root):
+        root = os.path.abspath(root)
+        with self.lock:
+            for folder in [f for f in self.cache if f == root or f.startswith(root + os.sep)]:
+                del self.cache[folder]
+
+#-------------------------------------------------------------------------------
+# The scanner shared by the whole application
+#-------------------------------------------------------------------------------
+scanner = Scanner()
+
+#-------------------------------------------------------------------------------
+# getSize()
+# Size of a file, or of all the files of a folder tree
+#-------------------------------------------------------------------------------
+def getSize(path):
+    if not os.path.exists(path):
+        return 0
+    return scanner.scan(path)['size']
+
+#-------------------------------------------------------------------------------
+# getExecutables()
+#-------------------------------------------------------------------------------
+def getExecutables(path):
+    return scanner.scan(path)['executables']
+
+#-------------------------------------------------------------------------------
+# listFiles()
+# Return the list of (relative path, size) of all the files under root, the
+# folders are scanned concurrently
+#-------------------------------------------------------------------------------
+def listFiles(root, workers=WORKERS):
+    def scan(folder):
+        files = []
+        folders = []
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        folders.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        files.append((os.path.relpath(entry.path, root).replace(os.sep, '/'), entry.stat(follow_symlinks=False).st_size))
+        except OSError:
+            pass
+        return files, folders
+
+    result = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = [pool.submit(scan, root)]
+        while pending:
+            files, folders = pending.pop().result()
+            result.extend(files)
+            pending.extend(pool.submit(scan, f) for f in folders)
+    return result
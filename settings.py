@@ -39,11 +39,42 @@ defaultValues = [
     ['APP_THEME', "LIGHT", "Look and feel theme for the application.\nThree values are available : LIGHT, DARK (both themes are hardcoded) and CUSTOM (which can be customized later)"],\
     ['SHELL_CODEPAGE', "utf-8", "Codepage used for running compiled application"],\
     ['SHELL_PROMPT', "$>", "Prompt displayed in output log when running compiled application"],\
+    ['SHELL_LOG_MEMORY_CAP', 4194304, "Size (in bytes) of the captured output kept in memory before spilling it to disk"],\
     ['OUTPUT_STYLE_FONT_SIZE', 9, "Output log font size"],\
     ['OUTPUT_STYLE_FONT_NAME', 'Courier', "Output log font name"],\
     ['OUTPUT_STYLE_COLOR', "#ffa500", "Output log text color"],\
     ['OUTPUT_STYLE_COLOR_BACKGROUND', "#49453e", "Output log background color"],\
+    ['JOBS_MAX', 0, "Maximum number of queued jobs built at the same time (0 means according to the CPU cores and the free memory)"],\
+    ['JOBS_MEMORY_PER_BUILD', 1024, "Memory (in MB) reserved for each queued job when computing how many can run at the same time"],\
+    ['DIST_WORKERS', "", "Comma separated list of the build workers (host:port or Unix socket path) building the queued jobs (empty means local builds)"],\
+    ['DIST_TOKEN', "", "Shared token of the build workers (empty means the GUINSTALLER_DIST_TOKEN environment variable)"],\
+    ['DIST_RETRIES', 3, "Number of times a queued job is built again on another worker when its worker is lost"],\
+    ['MATRIX_MAX_JOBS', 0, "Maximum number of variants built at the same time by a matrix build (0 means the number of CPU cores)"],\
+    ['BUILD_CACHE_ENABLED', True, "Restore the previous executable instead of rebuilding when nothing has changed"],\
+    ['BUILD_CACHE_MAX_ENTRIES', 20, "Number of builds kept in the build cache"],\
+    ['WORKPATH_CACHE_ROOT', "", "Folder, possibly shared by several machines, caching the PyInstaller's workpaths (empty means no cache)"],\
+    ['WORKPATH_CACHE_MAX_SIZE', 2048, "Maximum size (in MB) of the workpath cache"],\
+    ['WORKPATH_CACHE_GRACE', 600, "Time (in s) during which a workpath cache entry just used can't be evicted"],\
+    ['COLLECT_CACHE_ENABLED', True, "Expand the --collect-* options once and reuse them until the packages are upgraded"],\
+    ['WARM_WORKER_ENABLED', False, "Run the builds by a background process having PyInstaller already loaded (not on Windows)"],\
+    ['WARM_WORKER_MAX_BUILDS', 20, "Number of builds run by the background process before it is restarted"],\
     ['OUTPUT_TIMESTAMP', "[%Y%m%d-%H%M%S] ", "Output log timestamp displayed"],\
+    ['OUTPUT_FLUSH_INTERVAL', 33, "Time delay (in ms) between two refreshes of the output log"],\
+    ['OUTPUT_MAX_BLOCKS', 5000, "Maximum number of lines kept in the output log, the full logs are saved in the logs folder"],\
+    ['OUTPUT_LOGS_KEEP', 200, "Number of full logs kept in the logs folder"],\
+    ['PHASES_SLOWEST_HOOKS', 10, "Number of slowest hooks displayed after a build"],\
+    ['HISTORY_ALERT_PERCENT', 20, "Warn when a build is slower or bigger than the previous ones by more than this percentage"],\
+    ['HISTORY_BASELINE_BUILDS', 10, "Number of previous builds whose median is the baseline of the regression warnings"],\
+    ['STARTUP_BENCH_RUNS', 10, "Number of measured starts of the executable by the startup benchmark"],\
+    ['STARTUP_BENCH_WARMUPS', 2, "Number of starts of the executable before measuring them"],\
+    ['STARTUP_BENCH_PROBE', "", "Argument making the executable exit at once (empty means measuring until its first output line)"],\
+    ['STARTUP_BENCH_TIMEOUT', 60, "Time (in s) after which a start of the executable is killed"],\
+    ['STARTUP_BENCH_AFTER_BUILD', False, "Benchmark the startup of the executable after each successful build"],\
+    ['STARTUP_BUDGET_MS', 0, "Median startup time (in ms) above which the build fails (0 means no budget)"],\
+    ['SIZE_TOP_OFFENDERS', 20, "Number of biggest files or modules listed by the size analyzer"],\
+    ['PROFILE_IMPORTS_HOOK', False, "Bundle the runtime hook tracing the imports, needed to profile the imports of the executable"],\
+    ['PROFILE_IMPORTS_TIMEOUT', 30, "Seconds before stopping the executable whose imports are profiled"],\
+    ['PROFILE_IMPORTS_TOP', 20, "Number of slowest modules and packages listed by the import profiler"],\
     ['SYNTAX_PYTHON_KEYWORD', 'brown normal', "Python keyword color"],\
     ['SYNTAX_PYTHON_OPERATOR', 'red normal', "Python operator color"],\
     ['SYNTAX_PYTHON_BRACE', 'darkgray normal', "Python color for braces"],\
@@ -213,7 +244,7 @@ class TabSettings(QWidget):
                 fields.append(list([QLabel(key),QLineEdit(sValue)]))
                 fields[i][0].setStyleSheet("font-weight: normal;")
                 fields[i][0].setToolTip(toolTip)
-                if sValue[0] == "#" or utils.isColorName(sValue.split()[0]) == True:
+                if sValue.strip() != "" and (sValue[0] == "#" or utils.isColorName(sValue.split()[0]) == True):
                     fields[i][1].setStyleSheet("font-weight: normal; background-color: %s" % sValue.split()[0])
                 else:
                     fields[i][1].setStyleSheet("font-weight: normal;")
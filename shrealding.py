@@ -9,10 +9,11 @@
 #-------------------------------------------------------------------------------
 # Imports
 #-------------------------------------------------------------------------------
-import subprocess
-import psutil
+import os
 import queue
+import selectors
 import subprocess
+import sys
 import threading
 import time
 import traceback
@@ -20,6 +21,14 @@ import traceback
 from PyQt5.QtCore import QThread, pyqtSignal
 
 import settings
+import logstore
+import phases
+
+#-------------------------------------------------------------------------------
+# Once the process exited, its pipes are still read for DRAIN_TIMEOUT seconds,
+# they stay open when it started another process inheriting them
+#-------------------------------------------------------------------------------
+DRAIN_TIMEOUT = 1.0
 
 #-------------------------------------------------------------------------------
 # Class Shreald
@@ -32,17 +41,20 @@ class Shreald(QThread):
 #-------------------------------------------------------------------------------
 # __init__()
 #-------------------------------------------------------------------------------
-    def __init__(self, parent, cmd, cwd, shell=False):
+    def __init__(self, parent, cmd, cwd, shell=False, logFile=None, prepare=None):
         super(Shreald, self).__init__(parent)
         self.cmd = cmd
+        self.prepare = prepare
         self.cwd = cwd
         self.mw = parent
         self.shell = shell
         self.daemon = True
         self.returncode = None
-        self.log = []
+        self.process = None
+        self.logFile = logFile
+        self.log = logstore.LogStore(settings.db['SHELL_LOG_MEMORY_CAP'], settings.db['SHELL_CODEPAGE'])
+        self.phases = phases.PhaseParser()
         self.mw.showMessage("Shrealding %s " % (cmd))
-        self.start()
 
 #-------------------------------------------------------------------------------
 # run()
@@ -50,62 +62,256 @@ class Shreald(QThread):
     def run(self):
         if self.cmd:
             try:
-                self.process = subprocess.Popen(self.cmd, cwd=self.cwd, bufsize=1, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=self.shell)
-                ppid = psutil.Process(self.process.pid)
-                self.mw.showMessage("Running shreald with PID %d" % (ppid.pid))
-                q = queue.Queue()
-                ti = threading.Thread(target=self.enqueueStream, args=(self.process.stdin, q, 0))
-                to = threading.Thread(target=self.enqueueStream, args=(self.process.stdout, q, 1))
-                te = threading.Thread(target=self.enqueueStream, args=(self.process.stderr, q, 2))
-                tp = threading.Thread(target=self.enqueueProcess, args=(self.process, q))
-                te.start()
-                to.start()
-                ti.start()
-                tp.start()
-
-                while True:
-                    try:
-                        line = q.get_nowait()
-                        self.log.append(line)
-                        self.linePrinted.emit(line)
-                        if line[0] == 'x':
-                            break
-                    except:
-                        pass
-
-                tp.join()
-                ti.join()
-                to.join()
-                te.join()
+                if self.prepare is not None:
+                    # Returns the command actually run, computed in this
+                    # thread, or None if there is nothing left to run
+                    self.cmd = self.prepare(self.printLine)
+                    if self.cmd is None:
+                        self.returncode = 0
+                        self.closeLogFile()
+                        self.linePrinted.emit('x')
+                        return
+                self.process = subprocess.Popen(self.cmd, cwd=self.cwd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=self.shell)
+                self.mw.showMessage("Running shreald with PID %d" % (self.process.pid))
+                if os.name != "nt":
+                    self.pumpSelector()
+                else:
+                    self.pumpThreads()
+                self.returncode = self.process.wait()
+                self.closeLogFile()
+                self.linePrinted.emit('x')
             except Exception as error:
+                self.closeLogFile()
                 sError = traceback.format_exc()
                 self.mw.showMessage("Shreald exception raised")
                 self.mw.showMessage(sError)
+                if self.returncode is None:
+                    self.returncode = -1
+                self.linePrinted.emit('x')
+
+#-------------------------------------------------------------------------------
+# closeLogFile()
+#-------------------------------------------------------------------------------
+    def closeLogFile(self):
+        if self.logFile is not None:
+            self.logFile.close()
+
+#-------------------------------------------------------------------------------
+# waitProcess()
+# Run into a helper thread, calls notify when the process exited
+#-------------------------------------------------------------------------------
+    def waitProcess(self, notify):
+        self.process.wait()
+        notify()
+
+#-------------------------------------------------------------------------------
+# pumpSelector()
+# Block on the readiness of stdout/stderr pipes and of a pipe written when the
+# process exited, no busy loop. Returns when both pipes reached EOF, or
+# DRAIN_TIMEOUT seconds after the process exited.
+#-------------------------------------------------------------------------------
+    def pumpSelector(self):
+        codepage = settings.db['SHELL_CODEPAGE']
+        sel = selectors.DefaultSelector()
+        sel.register(self.process.stdout, selectors.EVENT_READ, '1')
+        sel.register(self.process.stderr, selectors.EVENT_READ, '2')
+        exitRead, exitWrite = os.pipe()
+        sel.register(exitRead, selectors.EVENT_READ, 'x')
+        waiter = threading.Thread(target=self.waitProcess, args=(lambda: os.close(exitWrite),), daemon=True)
+        waiter.start()
+        pending = {'1': b'', '2': b''}
+        streams = 2
+        deadline = None
+        while streams > 0:
+            events = sel.select(None if deadline is None else max(0, deadline - time.monotonic()))
+            if not events and deadline is not None:
+                break
+            for key, _ in events:
+                if key.data == 'x':
+                    sel.unregister(exitRead)
+                    deadline = time.monotonic() + DRAIN_TIMEOUT
+                    continue
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    key.fileobj.close()
+                    streams = streams - 1
+                    if pending[key.data]:
+                        self.emitLine(key.data, pending[key.data], codepage)
+                    continue
+                lines = (pending[key.data] + chunk).split(b'\n')
+                pending[key.data] = lines.pop()
+                for line in lines:
+                    self.emitLine(key.data, line + b'\n', codepage)
+        for key in list(sel.get_map().values()):
+            if key.data in pending:
+                # Still held open by a process started by the command
+                key.fileobj.close()
+                if pending[key.data]:
+                    self.emitLine(key.data, pending[key.data], codepage)
+        sel.close()
+        waiter.join()
+        os.close(exitRead)
+
+#-------------------------------------------------------------------------------
+# pumpThreads()
+# Fallback for platforms where pipes can't be selected (Windows) : one reader
+# per stream and one waiting for the process, the QThread blocks on the queue.
+# The readers still blocked DRAIN_TIMEOUT seconds after the process exited are
+# left behind.
+#-------------------------------------------------------------------------------
+    def pumpThreads(self):
+        codepage = settings.db['SHELL_CODEPAGE']
+        q = queue.Queue()
+        to = threading.Thread(target=self.enqueueStream, args=(self.process.stdout, q, '1'), daemon=True)
+        te = threading.Thread(target=self.enqueueStream, args=(self.process.stderr, q, '2'), daemon=True)
+        tw = threading.Thread(target=self.waitProcess, args=(lambda: q.put(('x', None)),), daemon=True)
+        to.start()
+        te.start()
+        tw.start()
+        running = 2
+        deadline = None
+        while running > 0:
+            try:
+                type, line = q.get(timeout=None if deadline is None else max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if type == 'x':
+                deadline = time.monotonic() + DRAIN_TIMEOUT
+            elif line is None:
+                running = running - 1
+            else:
+                self.emitLine(type, line, codepage)
+        tw.join()
+        if running == 0:
+            to.join()
+            te.join()
+
+#-------------------------------------------------------------------------------
+# printLine()
+# A line of GUInstaller into the output, as if printed by the command
+#-------------------------------------------------------------------------------
+    def printLine(self, text):
+        codepage = settings.db['SHELL_CODEPAGE']
+        self.emitLine('1', (text + "\n").encode(codepage, errors='replace'), codepage)
+
+#-------------------------------------------------------------------------------
+# emitLine()
+#-------------------------------------------------------------------------------
+    def emitLine(self, type, line, codepage):
+        line = type + line.decode(codepage, errors='replace')
+        self.log.append(line)
+        self.phases.feed(line[1:].rstrip())
+        if self.logFile is not None:
+            self.logFile.write(line[1:])
+        self.linePrinted.emit(line)
 
 #-------------------------------------------------------------------------------
 # enqueueStream()
 #-------------------------------------------------------------------------------
     def enqueueStream(self, stream, queue, type):
-        # print("enqueue", flush=True)
         for line in iter(stream.readline, b''):
-            queue.put(str(type) + line.decode(settings.db['SHELL_CODEPAGE']))
-        stream.flush()
+            queue.put((type, line))
         stream.close()
-
-#-------------------------------------------------------------------------------
-# enqueueProcess()
-#-------------------------------------------------------------------------------
-    def enqueueProcess(self, process, queue):
-        self.returncode = process.wait()
-        # let's add some ignition delay to let time to complete the output
-        time.sleep(0.3)
-        queue.put('x')
+        queue.put((type, None))
 
 #-------------------------------------------------------------------------------
 # kill()
 #-------------------------------------------------------------------------------
     def kill(self):
+        import psutil
         ppid = psutil.Process(self.process.pid)
         for proc in ppid.children(recursive=True):
             proc.kill()
         ppid.kill()
+
+#-------------------------------------------------------------------------------
+# Benchmark of the output pump, run as a script :
+#     python shrealding.py --bench [lines] [interval]
+# A child prints lines stamped with their emission time, every interval
+# seconds, and each pump reports the CPU time this process used while the
+# child was running and the latency between the print and the reception of
+# the lines.
+#-------------------------------------------------------------------------------
+BENCH_CHILD = "import sys, time\nfor i in range(%d):\n    print(repr(time.time()), flush=True)\n    time.sleep(%r)\n"
+
+#-------------------------------------------------------------------------------
+# Class BenchPump
+# Stand-in for the Shreald, without the QThread, the log and the signal
+#-------------------------------------------------------------------------------
+class BenchPump():
+
+    enqueueStream = Shreald.enqueueStream
+    waitProcess = Shreald.waitProcess
+
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self, process):
+        self.process = process
+        self.latencies = []
+
+#-------------------------------------------------------------------------------
+# emitLine()
+#-------------------------------------------------------------------------------
+    def emitLine(self, type, line, codepage):
+        if type == '1':
+            self.latencies.append(time.time() - float(line))
+
+#-------------------------------------------------------------------------------
+# pumpBusySpin()
+# The former pump : a reader thread per stream and one waiting for the
+# process, feeding a queue polled without blocking
+#-------------------------------------------------------------------------------
+    def pumpBusySpin(self):
+        q = queue.Queue()
+        def enqueueProcess():
+            self.process.wait()
+            time.sleep(0.3)
+            q.put(('x', None))
+        threads = [threading.Thread(target=self.enqueueStream, args=(self.process.stdout, q, '1')),
+                   threading.Thread(target=self.enqueueStream, args=(self.process.stderr, q, '2')),
+                   threading.Thread(target=enqueueProcess)]
+        for t in threads:
+            t.start()
+        while True:
+            try:
+                type, line = q.get_nowait()
+                if type == 'x':
+                    break
+                if line is not None:
+                    self.emitLine(type, line, None)
+            except queue.Empty:
+                pass
+        for t in threads:
+            t.join()
+
+#-------------------------------------------------------------------------------
+# bench()
+#-------------------------------------------------------------------------------
+def bench(lines=50, interval=0.05):
+    import statistics
+    child = [sys.executable, "-c", BENCH_CHILD % (lines, interval)]
+    pumps = [("busy-spin", BenchPump.pumpBusySpin), ("selector", Shreald.pumpSelector), ("threads", Shreald.pumpThreads)]
+    if os.name == "nt":
+        del pumps[1]
+    for name, pump in pumps:
+        process = subprocess.Popen(child, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        bp = BenchPump(process)
+        time1 = time.time()
+        cpu1 = time.process_time()
+        pump(bp)
+        process.wait()
+        cpu = time.process_time() - cpu1
+        elapsed = time.time() - time1
+        print("%-9s : cpu %.3f s for %.3f s, latency median %.3f ms, max %.3f ms" % (name, cpu, elapsed, statistics.median(bp.latencies) * 1000, max(bp.latencies) * 1000))
+
+#-------------------------------------------------------------------------------
+# main()
+#-------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        bench(*[t(a) for t, a in zip((int, float), sys.argv[2:4])])
+    else:
+        print("usage: shrealding.py --bench [lines] [interval]")
+        sys.exit(2)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import hashlib
+import json
+import marshal
+import os
+import re
+import struct
+
+import buildcache
+import scanner
+
+#-------------------------------------------------------------------------------
+# PyInstaller's archive formats, see PyInstaller/archive/readers.py
+#-------------------------------------------------------------------------------
+CARCHIVE_MAGIC = b"MEI\014\013\012\013\016"
+CARCHIVE_COOKIE = "!8sIIII64s"
+CARCHIVE_ENTRY = "!IIIIBc"
+PYZ_MAGIC = b"PYZ\0"
+COOKIE_SEARCH = 65536
+
+RE_SHARED_LIBRARY = re.compile(r"\.(so(\.[\d.]+)?|pyd|dll|dylib)$", re.IGNORECASE)
+# Folder of the dependencies of a onedir build since PyInstaller 6
+CONTENTS_FOLDER = "_internal"
+
+GROUP_BOOTLOADER = "Bootloader"
+GROUP_PACKAGE = "Python package"
+GROUP_MODULES = "Python modules"
+GROUP_LIBRARY = "Shared libraries"
+GROUP_DATA = "Data"
+
+#-------------------------------------------------------------------------------
+# readCArchive()
+# Return (package start, list of (name, typecode, offset, length)) of the
+# archive appended to a PyInstaller executable, or None
+#-------------------------------------------------------------------------------
+def readCArchive(filename):
+    with open(filename, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        fileSize = f.tell()
+        f.seek(max(0, fileSize - COOKIE_SEARCH))
+        tail = f.read()
+        pos = tail.rfind(CARCHIVE_MAGIC)
+        if pos < 0:
+            return None
+        cookieSize = struct.calcsize(CARCHIVE_COOKIE)
+        cookiePos = fileSize - len(tail) + pos
+        _, pkgLength, tocOffset, tocLength, _, _ = struct.unpack(CARCHIVE_COOKIE, tail[pos:pos + cookieSize])
+        pkgStart = cookiePos + cookieSize - pkgLength
+        f.seek(pkgStart + tocOffset)
+        toc = f.read(tocLength)
+    entries = []
+    entrySize = struct.calcsize(CARCHIVE_ENTRY)
+    pos = 0
+    while pos + entrySize <= len(toc):
+        length, offset, compressed, _, _, typecode = struct.unpack(CARCHIVE_ENTRY, toc[pos:pos + entrySize])
+        if length <= 0:
+            break
+        name = toc[pos + entrySize:pos + length].rstrip(b"\0").decode("utf-8", errors="replace")
+        entries.append((name, typecode.decode("ascii", errors="replace"), pkgStart + offset, compressed))
+        pos = pos + length
+    return pkgStart, entries
+
+#-------------------------------------------------------------------------------
+# readPYZ()
+# Return the list of (module name, compressed size) of a PYZ archive
+#-------------------------------------------------------------------------------
+def readPYZ(filename, offset):
+    with open(filename, "rb") as f:
+        f.seek(offset)
+        header = f.read(12)
+        if header[:4] != PYZ_MAGIC:
+            return []
+        tocOffset = struct.unpack("!i", header[8:12])[0]
+        f.seek(offset + tocOffset)
+        try:
+            toc = marshal.loads(f.read())
+        except (EOFError, ValueError, TypeError):
+            return []
+    if isinstance(toc, dict):
+        toc = list(toc.items())
+    modules = []
+    for name, entry in toc:
+        # Entries are (ispkg, pos, length), or (typecode, pos, length)
+        modules.append((name.decode() if isinstance(name, bytes) else name, entry[2]))
+    return modules
+
+#-------------------------------------------------------------------------------
+# getArtifactKey()
+# Hash of the executable, and of the listing of a onedir folder
+#-------------------------------------------------------------------------------
+def getArtifactKey(artifact, exe):
+    h = hashlib.sha256(buildcache.hashFile(exe).encode())
+    if os.path.isdir(artifact):
+        for root, dirs, files in os.walk(artifact):
+            dirs.sort()
+            for name in sorted(files):
+                st = os.lstat(os.path.join(root, name))
+                h.update(("%s/%s:%d:%d\n" % (root, name, st.st_size, st.st_mtime_ns)).encode("utf-8", errors="replace"))
+    return h.hexdigest()
+
+#-------------------------------------------------------------------------------
+# Class SizeReport
+# Bytes of an artifact grouped by package, shared library, data and bootloader
+#-------------------------------------------------------------------------------
+class SizeReport():
+
+#-------------------------------------------------------------------------------
+# __init__()
+#-------------------------------------------------------------------------------
+    def __init__(self):
+        self.groups = {}
+
+#-------------------------------------------------------------------------------
+# add()
+#-------------------------------------------------------------------------------
+    def add(self, kind, group, item, size):
+        key = (kind, group)
+        if key not in self.groups:
+            self.groups[key] = {}
+        items = self.groups[key]
+        items[item] = items.get(item, 0) + size
+
+#-------------------------------------------------------------------------------
+# toDict()
+#-------------------------------------------------------------------------------
+    def toDict(self, artifact):
+        groups = []
+        for (kind, group), items in self.groups.items():
+            groups.append({
+                'kind': kind,
+                'name': group,
+                'size': sum(items.values()),
+                'items': sorted(({'name': n, 'size': s} for n, s in items.items()), key=lambda i: i['size'], reverse=True),
+            })
+        groups.sort(key=lambda g: g['size'], reverse=True)
+        return {'artifact': artifact, 'total': sum(g['size'] for g in groups), 'groups': groups}
+
+#-------------------------------------------------------------------------------
+# addFile()
+# Group a file of the artifact according to its path
+#-------------------------------------------------------------------------------
+def addFile(report, packages, name, size):
+    parts = name.split('/')
+    if parts[0] == CONTENTS_FOLDER and len(parts) > 1:
+        parts = parts[1:]
+    top = parts[0]
+    if len(parts) > 1 and top in packages:
+        report.add(GROUP_PACKAGE, top, "/".join(parts), size)
+    elif len(parts) == 1 and RE_SHARED_LIBRARY.search(top):
+        report.add(GROUP_LIBRARY, GROUP_LIBRARY, top, size)
+    elif len(parts) > 1 and RE_SHARED_LIBRARY.search(parts[-1]):
+        # Extension modules of packages without pure Python modules
+        report.add(GROUP_LIBRARY, top, "/".join(parts), size)
+    elif len(parts) > 1:
+        report.add(GROUP_DATA, top, "/".join(parts), size)
+    else:
+        report.add(GROUP_DATA, GROUP_DATA, top, size)
+
+#-------------------------------------------------------------------------------
+# analyze()
+# Return the size report of an artifact (onefile executable or onedir folder)
+#-------------------------------------------------------------------------------
+def analyze(artifact, exe):
+    report = SizeReport()
+    packages = set()
+    archive = readCArchive(exe)
+    embedded = []
+    if archive is not None:
+        pkgStart, entries = archive
+        report.add(GROUP_BOOTLOADER, GROUP_BOOTLOADER, os.path.basename(exe), pkgStart)
+        for name, typecode, offset, length in entries:
+            if typecode == 'z':
+                modules = readPYZ(exe, offset)
+                for module, size in modules:
+                    top = module.split('.')[0]
+                    if '.' in module:
+                        packages.add(top)
+                    report.add(GROUP_PACKAGE if '.' in module else GROUP_MODULES, top if '.' in module else GROUP_MODULES, module, size)
+                report.add(GROUP_MODULES, GROUP_MODULES, "%s table of contents" % name, max(0, length - sum(m[1] for m in modules)))
+            elif typecode in ('s', 'm', 'M', 'o'):
+                report.add(GROUP_MODULES, "Scripts and options", name, length)
+            else:
+                embedded.append((name, length))
+        # Remaining bytes of the executable, TOC and cookie
+        report.add(GROUP_BOOTLOADER, GROUP_BOOTLOADER, "archive table of contents", max(0, os.path.getsize(exe) - pkgStart - sum(e[3] for e in entries)))
+    else:
+        report.add(GROUP_BOOTLOADER, GROUP_BOOTLOADER, os.path.basename(exe), os.path.getsize(exe))
+
+    # Files embedded into a onefile executable, extracted at runtime
+    for name, length in embedded:
+        addFile(report, packages, name, length)
+    if os.path.isdir(artifact):
+        exeName = os.path.relpath(exe, artifact).replace(os.sep, '/')
+        for name, size in scanner.listFiles(artifact):
+            if name != exeName:
+                addFile(report, packages, name, size)
+    return report.toDict(artifact)
+
+#-------------------------------------------------------------------------------
+# getReport()
+# Cached analyze(), the cache is keyed by the artifact's hash
+#-------------------------------------------------------------------------------
+def getReport(artifact, exe):
+    key = getArtifactKey(artifact, exe)
+    cacheName = os.path.join(buildcache.cacheDir("sizes"), key + ".json")
+    try:
+        with open(cacheName, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    report = analyze(artifact, exe)
+    with open(cacheName, "w") as f:
+        json.dump(report, f)
+    return report
+
+#-------------------------------------------------------------------------------
+# getOffenders()
+# The count biggest items of a report, as (group, item, size)
+#-------------------------------------------------------------------------------
+def getOffenders(report, count):
+    items = [(g['name'], i['name'], i['size']) for g in report['groups'] for i in g['items']]
+    items.sort(key=lambda i: i[2], reverse=True)
+    return items[:count]
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import argparse
+import importlib.util
+import os
+import sys
+import threading
+
+import buildcache
+
+#-------------------------------------------------------------------------------
+# Spec files are written by PyInstaller's own makespec module, called the way
+# pyi-makespec does (PyInstaller/utils/cliutils/makespec.py), so the output is
+# the same. This is only possible when PyInstaller is installed for the
+# interpreter running GUInstaller, otherwise the caller runs pyi-makespec.
+# The current folder of the process is never changed, other threads depend
+# on it : the paths pyi-makespec resolves from it are resolved from cwd.
+#-------------------------------------------------------------------------------
+_lock = threading.Lock()
+
+#-------------------------------------------------------------------------------
+# isAvailable()
+#-------------------------------------------------------------------------------
+def isAvailable():
+    if importlib.util.find_spec("PyInstaller") is None:
+        return False
+    interpreter = buildcache.getInterpreterPath(buildcache.getInterpreter())
+    return interpreter is not None and os.path.realpath(interpreter) == os.path.realpath(sys.executable)
+
+#-------------------------------------------------------------------------------
+# makeSpec()
+# Write the spec file of pyi-makespec's argv (without the program name) as
+# if run from cwd, return its name or None if it can't be done in-process
+#-------------------------------------------------------------------------------
+def makeSpec(argv, cwd):
+    if not isAvailable():
+        return None
+    try:
+        import PyInstaller.building.makespec as makespec
+        import PyInstaller.log as pyiLog
+    except ImportError:
+        return None
+    cwd = os.path.abspath(cwd)
+    parser = argparse.ArgumentParser(prog="pyi-makespec")
+    getattr(makespec, "__add_options")(parser)
+    getattr(pyiLog, "__add_options")(parser)
+    parser.add_argument('scriptname', nargs='+')
+    with _lock:
+        makeRelative = makespec.make_path_spec_relative
+        try:
+            args = parser.parse_args(argv)
+            getattr(pyiLog, "__process_options")(parser, args)
+            paths = args.pathex[:]
+            args.pathex = []
+            for path in paths:
+                args.pathex.extend(path.split(os.pathsep))
+            # The two uses of the current folder by makespec.main()
+            args.specpath = os.path.join(cwd, os.path.expanduser(args.specpath)) if args.specpath is not None else cwd
+            makespec.make_path_spec_relative = lambda filename, spec_dir: makePathSpecRelative(filename, spec_dir, cwd)
+            return os.path.normpath(os.path.join(cwd, makespec.main(args.scriptname, **vars(args))))
+        except (SystemExit, Exception):
+            # An option unknown to this version of PyInstaller for example, let
+            # pyi-makespec report it
+            return None
+        finally:
+            makespec.make_path_spec_relative = makeRelative
+
+#-------------------------------------------------------------------------------
+# makePathSpecRelative()
+# makespec.make_path_spec_relative() for relative paths from cwd
+#-------------------------------------------------------------------------------
+def makePathSpecRelative(filename, spec_dir, cwd):
+    if os.path.isabs(filename):
+        return filename
+    filename = os.path.normpath(os.path.join(cwd, filename))
+    try:
+        return os.path.relpath(filename, start=spec_dir)
+    except ValueError:
+        return filename
+
+#-------------------------------------------------------------------------------
+# compare()
+# Write the spec file of argv with pyi-makespec and with makeSpec(), from the
+# current folder into the same temporary specpath, return True if both are
+# the same bytes
+#-------------------------------------------------------------------------------
+def compare(argv):
+    import difflib
+    import subprocess
+    import tempfile
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Last, it wins over a --specpath of argv
+        argv = argv + ["--specpath", tmp]
+        out = subprocess.run(["pyi-makespec"] + argv, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        if out.returncode != 0:
+            print(out.stdout.decode("utf-8", errors="replace"))
+            return False
+        specFiles = [os.path.join(tmp, f) for f in os.listdir(tmp) if f.endswith(".spec")]
+        with open(specFiles[0], "rb") as f:
+            expected = f.read()
+        os.remove(specFiles[0])
+        specFileName = makeSpec(argv, cwd)
+        if specFileName is None:
+            print("makeSpec() is not available or failed")
+            return False
+        with open(specFileName, "rb") as f:
+            got = f.read()
+    if got == expected:
+        print("Same %d bytes as pyi-makespec" % len(got))
+        return True
+    diff = difflib.unified_diff(expected.decode("utf-8").splitlines(), got.decode("utf-8").splitlines(), "pyi-makespec", "specgen", lineterm="")
+    print("\n".join(diff))
+    return False
+
+#-------------------------------------------------------------------------------
+# main()
+# python specgen.py --compare <pyi-makespec arguments>
+#-------------------------------------------------------------------------------
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == "--compare":
+        sys.exit(0 if compare(sys.argv[2:]) else 1)
+    print("usage: specgen.py --compare <pyi-makespec arguments>")
+    sys.exit(2)
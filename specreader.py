@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import ast
+import os
+
+#-------------------------------------------------------------------------------
+# Arguments of the spec file mapped to the build options, see
+# command.DEFAULT_OPTIONS : (option, calls, keyword, kind)
+# A keyword is read from the first call having it, and patched in all of them
+#-------------------------------------------------------------------------------
+SPEC_OPTIONS = (
+    ('paths',                       ("Analysis",), "pathex", "list"),
+    ('add_data',                    ("Analysis",), "datas", "pairs"),
+    ('add_binary',                  ("Analysis",), "binaries", "pairs"),
+    ('hidden_import',               ("Analysis",), "hiddenimports", "list"),
+    ('additional_hooks_dir',        ("Analysis",), "hookspath", "list"),
+    ('runtime_hook',                ("Analysis",), "runtime_hooks", "list"),
+    ('exclude_module',              ("Analysis",), "excludes", "list"),
+    ('name',                        ("EXE", "COLLECT"), "name", "str"),
+    ('strip',                       ("EXE", "COLLECT"), "strip", "bool"),
+    ('noupx',                       ("EXE", "COLLECT"), "upx", "notbool"),
+    ('console',                     ("EXE",), "console", "console"),
+    ('disable_windowed_traceback',  ("EXE",), "disable_windowed_traceback", "bool"),
+    ('runtime_tmpdir',              ("EXE",), "runtime_tmpdir", "str"),
+    ('icon',                        ("EXE",), "icon", "str"),
+    ('version_file',                ("EXE",), "version", "str"),
+    ('uac_admin',                   ("EXE",), "uac_admin", "bool"),
+    ('uac_uiaccess',                ("EXE",), "uac_uiaccess", "bool"),
+    ('target_architecture',         ("EXE",), "target_arch", "str"),
+    ('codesign_identity',           ("EXE",), "codesign_identity", "str"),
+    ('osx_entitlements_file',       ("EXE",), "entitlements_file", "str"),
+)
+SPEC_CALLS = ("Analysis", "PYZ", "EXE", "COLLECT", "BUNDLE")
+
+#-------------------------------------------------------------------------------
+# Class SpecFile
+# Spec file read with ast, never executed
+#-------------------------------------------------------------------------------
+class SpecFile():
+
+#-------------------------------------------------------------------------------
+# __init__()
+# Raise SyntaxError if the spec file is not valid Python
+#-------------------------------------------------------------------------------
+    def __init__(self, text):
+        self.text = text
+        # ast's columns are offsets into the UTF-8 bytes of the lines
+        self.data = text.encode("utf-8")
+        self.lineStarts = [0]
+        for line in self.data.splitlines(True):
+            self.lineStarts.append(self.lineStarts[-1] + len(line))
+        tree = ast.parse(self.data)
+        self.calls = {}
+        self.assignments = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                name = node.func.id if isinstance(node.func, ast.Name) else node.func.attr if isinstance(node.func, ast.Attribute) else None
+                if name in SPEC_CALLS and name not in self.calls:
+                    self.calls[name] = node
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                self.assignments[node.targets[0].id] = node.value
+
+#-------------------------------------------------------------------------------
+# getOffset()
+#-------------------------------------------------------------------------------
+    def getOffset(self, line, col):
+        return self.lineStarts[line - 1] + col
+
+#-------------------------------------------------------------------------------
+# getValueNode()
+# Return the node holding the value of a keyword, through a module level
+# variable if any, or None if the keyword is not given
+#-------------------------------------------------------------------------------
+    def getValueNode(self, call, keyword):
+        for kw in self.calls[call].keywords:
+            if kw.arg == keyword:
+                node = kw.value
+                if isinstance(node, ast.Name) and node.id in self.assignments:
+                    node = self.assignments[node.id]
+                return node
+        return None
+
+#-------------------------------------------------------------------------------
+# getScripts()
+# The scripts given to Analysis, relative to the spec file's folder
+#-------------------------------------------------------------------------------
+    def getScripts(self):
+        if "Analysis" not in self.calls or not self.calls["Analysis"].args:
+            return []
+        node = self.calls["Analysis"].args[0]
+        if isinstance(node, ast.Name) and node.id in self.assignments:
+            node = self.assignments[node.id]
+        try:
+            scripts = ast.literal_eval(node)
+        except ValueError:
+            return []
+        return [scripts] if isinstance(scripts, str) else list(scripts)
+
+#-------------------------------------------------------------------------------
+# readOption()
+# Return the value of an option, None if it is not a literal
+#-------------------------------------------------------------------------------
+    def readOption(self, calls, keyword, kind):
+        for call in calls:
+            if call not in self.calls:
+                continue
+            node = self.getValueNode(call, keyword)
+            if node is None:
+                continue
+            try:
+                return toOption(kind, ast.literal_eval(node))
+            except (ValueError, TypeError):
+                return None
+        return toOption(kind, None)
+
+#-------------------------------------------------------------------------------
+# getOptions()
+# Return the build options found in the spec file, and the list of the
+# options whose value is computed and can't be read
+#-------------------------------------------------------------------------------
+    def getOptions(self):
+        options = {'onefile': "COLLECT" not in self.calls}
+        dynamic = []
+        for option, calls, keyword, kind in SPEC_OPTIONS:
+            value = self.readOption(calls, keyword, kind)
+            if value is None:
+                dynamic.append(option)
+            else:
+                options[option] = value
+        if 'console' in options:
+            options['windowed'] = not options['console']
+        return options, dynamic
+
+#-------------------------------------------------------------------------------
+# patch()
+# Return the text of the spec file with the given options changed, only the
+# values of the changed arguments are rewritten
+#-------------------------------------------------------------------------------
+    def patch(self, options):
+        edits = []
+        changed = []
+        for option, calls, keyword, kind in SPEC_OPTIONS:
+            if option not in options:
+                continue
+            value = options[option]
+            if kind == "console":
+                value = value and not options.get('windowed', False)
+            current = self.readOption(calls, keyword, kind)
+            if current is None or current == toOption(kind, fromOption(kind, value, None)):
+                continue
+            for call in calls:
+                if call not in self.calls:
+                    continue
+                node = self.getValueNode(call, keyword)
+                if node is not None:
+                    start = self.getOffset(node.lineno, node.col_offset)
+                    end = self.getOffset(node.end_lineno, node.end_col_offset)
+                    edits.append((start, end, repr(fromOption(kind, value, ast.literal_eval(node))).encode("utf-8")))
+                else:
+                    edits.append(self.getInsertion(self.calls[call], keyword, repr(fromOption(kind, value, None))))
+            changed.append(option)
+        data = self.data
+        for start, end, text in sorted(edits, reverse=True):
+            data = data[:start] + text + data[end:]
+        return data.decode("utf-8"), changed
+
+#-------------------------------------------------------------------------------
+# getInsertion()
+# Edit adding a keyword argument after the last argument of a call
+#-------------------------------------------------------------------------------
+    def getInsertion(self, call, keyword, value):
+        arguments = call.args + [kw.value for kw in call.keywords]
+        if not arguments:
+            start = self.getOffset(call.end_lineno, call.end_col_offset) - 1
+            return start, start, ("%s=%s" % (keyword, value)).encode("utf-8")
+        last = max(arguments, key=lambda n: (n.end_lineno, n.end_col_offset))
+        start = self.getOffset(last.end_lineno, last.end_col_offset)
+        if call.lineno == last.end_lineno:
+            return start, start, (", %s=%s" % (keyword, value)).encode("utf-8")
+        # One argument per line, as written by pyi-makespec
+        line = self.data[self.lineStarts[last.lineno - 1]:self.lineStarts[last.lineno]].decode("utf-8")
+        indent = line[:len(line) - len(line.lstrip())]
+        return start, start, (",\n%s%s=%s" % (indent, keyword, value)).encode("utf-8")
+
+#-------------------------------------------------------------------------------
+# toOption()
+# Convert the value of a spec argument into the value of a build option
+#-------------------------------------------------------------------------------
+def toOption(kind, value):
+    if kind == "list":
+        return [str(v) for v in value] if value else []
+    if kind == "pairs":
+        return ["%s%s%s" % (src, os.pathsep, dst) for src, dst in value] if value else []
+    if kind == "bool":
+        return bool(value)
+    if kind == "notbool":
+        return not value if value is not None else False
+    if kind == "console":
+        return bool(value) if value is not None else True
+    if isinstance(value, (list, tuple)):
+        # icon=['app.ico'] since PyInstaller 5
+        value = value[0] if value else None
+    return str(value) if value is not None else ""
+
+#-------------------------------------------------------------------------------
+# fromOption()
+# Convert the value of a build option into the value of a spec argument,
+# original is the value it replaces, to keep its form
+#-------------------------------------------------------------------------------
+def fromOption(kind, value, original):
+    if kind == "list":
+        return list(value)
+    if kind == "pairs":
+        return [tuple(v.rsplit(os.pathsep, 1)) if os.pathsep in v else (v, ".") for v in value]
+    if kind == "bool" or kind == "console":
+        return bool(value)
+    if kind == "notbool":
+        return not value
+    if not value:
+        return None
+    return [value] if isinstance(original, (list, tuple)) else value
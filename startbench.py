@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+#-------------------------------------------------------------------------------
+import math
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+POLL_INTERVAL = 0.01
+
+#-------------------------------------------------------------------------------
+# getExecutable()
+# The executable of an artifact, which is a folder for a onedir build
+#-------------------------------------------------------------------------------
+def getExecutable(artifact):
+    if os.path.isdir(artifact):
+        exe = os.path.join(artifact, os.path.basename(artifact))
+        if os.name == "nt":
+            exe = exe + ".exe"
+        return exe
+    return artifact
+
+#-------------------------------------------------------------------------------
+# getExtractedSize()
+# Bytes extracted by the onefile bootloaders into the _MEIxxxxxx folders
+#-------------------------------------------------------------------------------
+def getExtractedSize(tmpdir):
+    total = 0
+    for name in os.listdir(tmpdir):
+        if name.startswith("_MEI"):
+            for root, dirs, files in os.walk(os.path.join(tmpdir, name)):
+                for f in files:
+                    try:
+                        total += os.path.getsize(os.path.join(root, f))
+                    except OSError:
+                        pass
+    return total
+
+#-------------------------------------------------------------------------------
+# killTree()
+#-------------------------------------------------------------------------------
+def killTree(pid):
+    import psutil
+    try:
+        parent = psutil.Process(pid)
+        for proc in parent.children(recursive=True):
+            proc.kill()
+        parent.kill()
+    except psutil.Error:
+        pass
+
+#-------------------------------------------------------------------------------
+# runOnce()
+# Return (ms, extracted bytes, timed out) for one start of argv
+# With a probe argument, the time runs until the program exits, otherwise
+# until it prints its first line on stdout
+#-------------------------------------------------------------------------------
+def runOnce(argv, probe, timeout):
+    tmpdir = tempfile.mkdtemp(prefix="guinstaller-bench-")
+    env = dict(os.environ)
+    # The bootloader extracts into the temp folder, a private one is measured
+    for var in ("TMPDIR", "TEMP", "TMP"):
+        env[var] = tmpdir
+    extracted = [0]
+    stop = threading.Event()
+    def watch():
+        while not stop.is_set():
+            extracted[0] = max(extracted[0], getExtractedSize(tmpdir))
+            stop.wait(POLL_INTERVAL)
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+
+    time1 = time.perf_counter()
+    process = subprocess.Popen(argv + ([probe] if probe else []), cwd=os.path.dirname(argv[0]), env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    timer = threading.Timer(timeout, killTree, (process.pid,))
+    timer.start()
+    if probe:
+        process.wait()
+    else:
+        process.stdout.readline()
+    elapsed = (time.perf_counter() - time1) * 1000
+    timedOut = not timer.is_alive()
+    timer.cancel()
+
+    stop.set()
+    watcher.join()
+    extracted[0] = max(extracted[0], getExtractedSize(tmpdir))
+    killTree(process.pid)
+    process.wait()
+    process.stdout.close()
+    shutil.rmtree(tmpdir, ignore_errors=True)
+    return elapsed, extracted[0], timedOut
+
+#-------------------------------------------------------------------------------
+# getStatistics()
+#-------------------------------------------------------------------------------
+def getStatistics(times):
+    ordered = sorted(times)
+    return {
+        'runs': len(times),
+        'min': round(ordered[0], 1),
+        'median': round(statistics.median(ordered), 1),
+        'p95': round(ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)], 1),
+        'stdev': round(statistics.stdev(ordered), 1) if len(ordered) > 1 else 0.0,
+    }
+
+#-------------------------------------------------------------------------------
+# runBenchmark()
+# Start argv warmups times unmeasured, then runs times
+#-------------------------------------------------------------------------------
+def runBenchmark(argv, runs, warmups, probe, timeout):
+    for _ in range(warmups):
+        runOnce(argv, probe, timeout)
+    times = []
+    extracted = 0
+    for _ in range(runs):
+        elapsed, size, timedOut = runOnce(argv, probe, timeout)
+        if timedOut:
+            return {'error': "no output after %d s" % timeout}
+        times.append(elapsed)
+        extracted = max(extracted, size)
+    results = getStatistics(times)
+    results['extracted'] = extracted
+    return results
+
+#-------------------------------------------------------------------------------
+# Class StartupBench
+# Benchmark the startup of several executables, one after the other
+#-------------------------------------------------------------------------------
+class StartupBench(QThread):
+
+    linePrinted = pyqtSignal(str)
+    benchCompleted = pyqtSignal(list)
+
+#-------------------------------------------------------------------------------
+# __init__()
+# targets is a list of (label, executable)
+#-------------------------------------------------------------------------------
+    def __init__(self, parent, targets, runs, warmups, probe, timeout):
+        super(StartupBench, self).__init__(parent)
+        self.targets = targets
+        self.runs = runs
+        self.warmups = warmups
+        self.probe = probe
+        self.timeout = timeout
+
+#-------------------------------------------------------------------------------
+# run()
+#-------------------------------------------------------------------------------
+    def run(self):
+        results = []
+        for label, exe in self.targets:
+            self.linePrinted.emit("Benchmarking the startup of %s" % label)
+            try:
+                r = runBenchmark([exe], self.runs, self.warmups, self.probe, self.timeout)
+            except OSError as error:
+                r = {'error': str(error)}
+            r['label'] = label
+            r['executable'] = exe
+            results.append(r)
+        self.benchCompleted.emit(results)
@@ -41,20 +41,30 @@ def setFormat(style):
     return _format
 
 
-# Syntax styles that can be shared by all languages
-STYLES = {
-    'keyword': setFormat(settings.db['SYNTAX_PYTHON_KEYWORD']),
-    'operator': setFormat(settings.db['SYNTAX_PYTHON_OPERATOR']),
-    'brace': setFormat(settings.db['SYNTAX_PYTHON_BRACE']),
-    'def': setFormat(settings.db['SYNTAX_PYTHON_DEF']),
-    'class': setFormat(settings.db['SYNTAX_PYTHON_CLASS']),
-    'string': setFormat(settings.db['SYNTAX_PYTHON_STRING']),
-    'string2': setFormat(settings.db['SYNTAX_PYTHON_STRING2']),
-    'comment': setFormat(settings.db['SYNTAX_PYTHON_COMMENT']),
-    'self': setFormat(settings.db['SYNTAX_PYTHON_SELF']),
-    'numbers': setFormat(settings.db['SYNTAX_PYTHON_NUMBERS']),
-    'dunders': setFormat(settings.db['SYNTAX_PYTHON_DUNDERS']),
-}
+#-------------------------------------------------------------------------------
+# getStyles()
+# Syntax styles that can be shared by all languages, built with the first
+# highlighter rather than when the module is imported
+#-------------------------------------------------------------------------------
+_styles = None
+
+def getStyles():
+    global _styles
+    if _styles is None:
+        _styles = {
+            'keyword': setFormat(settings.db['SYNTAX_PYTHON_KEYWORD']),
+            'operator': setFormat(settings.db['SYNTAX_PYTHON_OPERATOR']),
+            'brace': setFormat(settings.db['SYNTAX_PYTHON_BRACE']),
+            'def': setFormat(settings.db['SYNTAX_PYTHON_DEF']),
+            'class': setFormat(settings.db['SYNTAX_PYTHON_CLASS']),
+            'string': setFormat(settings.db['SYNTAX_PYTHON_STRING']),
+            'string2': setFormat(settings.db['SYNTAX_PYTHON_STRING2']),
+            'comment': setFormat(settings.db['SYNTAX_PYTHON_COMMENT']),
+            'self': setFormat(settings.db['SYNTAX_PYTHON_SELF']),
+            'numbers': setFormat(settings.db['SYNTAX_PYTHON_NUMBERS']),
+            'dunders': setFormat(settings.db['SYNTAX_PYTHON_DUNDERS']),
+        }
+    return _styles
 
 class PythonHighlighter(QSyntaxHighlighter):
     """Syntax highlighter for the Python language.
@@ -88,49 +98,50 @@ class PythonHighlighter(QSyntaxHighlighter):
     ]
     def __init__(self, document):
         QSyntaxHighlighter.__init__(self, document)
+        styles = getStyles()
 
         # Multi-line strings (expression, flag, style)
         # FIXME: The triple-quotes in these two lines will mess up the
         # syntax highlighting from this point onward
-        self.tri_single = (QRegExp("'''"), 1, STYLES['string2'])
-        self.tri_double = (QRegExp('"""'), 2, STYLES['string2'])
+        self.tri_single = (QRegExp("'''"), 1, styles['string2'])
+        self.tri_double = (QRegExp('"""'), 2, styles['string2'])
 
         rules = []
 
         # Keyword, operator, and brace rules
-        rules += [(r'\b%s\b' % w, 0, STYLES['keyword'])
+        rules += [(r'\b%s\b' % w, 0, styles['keyword'])
             for w in PythonHighlighter.keywords]
-        rules += [(r'%s' % o, 0, STYLES['operator'])
+        rules += [(r'%s' % o, 0, styles['operator'])
             for o in PythonHighlighter.operators]
-        rules += [(r'%s' % b, 0, STYLES['brace'])
+        rules += [(r'%s' % b, 0, styles['brace'])
             for b in PythonHighlighter.braces]
 
         # All other rules
         rules += [
             # 'self'
-            (r'\bself\b', 0, STYLES['self']),
+            (r'\bself\b', 0, styles['self']),
 
             # Double-quoted string, possibly containing escape sequences
-            (r'"[^"\\]*(\\.[^"\\]*)*"', 0, STYLES['string']),
+            (r'"[^"\\]*(\\.[^"\\]*)*"', 0, styles['string']),
             # Single-quoted string, possibly containing escape sequences
-            (r"'[^'\\]*(\\.[^'\\]*)*'", 0, STYLES['string']),
+            (r"'[^'\\]*(\\.[^'\\]*)*'", 0, styles['string']),
 
             # 'def' followed by an identifier
-            (r'\bdef\b\s*(\w+)', 1, STYLES['def']),
+            (r'\bdef\b\s*(\w+)', 1, styles['def']),
 
             # 'class' followed by an identifier
-            (r'\bclass\b\s*(\w+)', 1, STYLES['class']),
+            (r'\bclass\b\s*(\w+)', 1, styles['class']),
 
             # 'dunder' identifiers
-            (r'\b__(?:\w*__)?\b', 0, STYLES['dunders']),
+            (r'\b__(?:\w*__)?\b', 0, styles['dunders']),
 
             # From '#' until a newline
-            (r'#[^\n]*', 0, STYLES['comment']),
+            (r'#[^\n]*', 0, styles['comment']),
 
             # Numeric literals
-            (r'\b[+-]?[0-9]+[lL]?\b', 0, STYLES['numbers']),
-            (r'\b[+-]?0[xX][0-9A-Fa-f]+[lL]?\b', 0, STYLES['numbers']),
-            (r'\b[+-]?[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?\b', 0, STYLES['numbers']),
+            (r'\b[+-]?[0-9]+[lL]?\b', 0, styles['numbers']),
+            (r'\b[+-]?0[xX][0-9A-Fa-f]+[lL]?\b', 0, styles['numbers']),
+            (r'\b[+-]?[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?\b', 0, styles['numbers']),
         ]
 
         # Build a QRegExp for each pattern
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import json
+import os
+import shutil
+import queue
+import threading
+import time
+
+import const
+import scanner
+
+#-------------------------------------------------------------------------------
+# Folders are renamed aside at once, then deleted by a background pool.
+# The renamed folders are registered into ~/.guinstaller/trash.json, so that
+# the ones left by a crashed session are deleted at the next startup. The
+# workers are daemon threads, quitting the application never waits for them.
+#-------------------------------------------------------------------------------
+WORKERS = 2
+TRASH_SUFFIX = ".guinstaller-trash"
+
+_lock = threading.Lock()
+_queue = queue.Queue()
+_workers = []
+_pending = set()
+_deletedFiles = 0
+
+#-------------------------------------------------------------------------------
+# registryFile()
+#-------------------------------------------------------------------------------
+def registryFile():
+    return os.path.join(os.path.expanduser("~"), const.db["APP_FOLDER"], const.db["TRASH_FILE"])
+
+#-------------------------------------------------------------------------------
+# loadRegistry()
+#-------------------------------------------------------------------------------
+def loadRegistry():
+    try:
+        with open(registryFile(), "r") as f:
+            return set(json.load(f))
+    except (OSError, ValueError):
+        return set()
+
+#-------------------------------------------------------------------------------
+# updateRegistry()
+# Add or remove a folder of the registry, called with the lock held
+#-------------------------------------------------------------------------------
+def updateRegistry(add=None, remove=None):
+    folders = loadRegistry()
+    if add is not None:
+        folders.add(add)
+    if remove is not None:
+        folders.discard(remove)
+    tmpName = registryFile() + ".tmp"
+    try:
+        with open(tmpName, "w") as f:
+            json.dump(sorted(folders), f, indent=1)
+        os.replace(tmpName, registryFile())
+    except OSError:
+        pass
+
+#-------------------------------------------------------------------------------
+# worker()
+#-------------------------------------------------------------------------------
+def worker():
+    while True:
+        deleteTrash(_queue.get())
+
+#-------------------------------------------------------------------------------
+# deleteTrash()
+# Delete a trashed folder, bottom-up to count the files deleted
+#-------------------------------------------------------------------------------
+def deleteTrash(folder):
+    global _deletedFiles
+    for root, dirs, files in os.walk(folder, topdown=False):
+        for name in files:
+            try:
+                os.remove(os.path.join(root, name))
+            except OSError:
+                pass
+        for name in dirs:
+            path = os.path.join(root, name)
+            try:
+                if os.path.islink(path):
+                    os.remove(path)
+                else:
+                    os.rmdir(path)
+            except OSError:
+                pass
+        with _lock:
+            _deletedFiles = _deletedFiles + len(files)
+    shutil.rmtree(folder, ignore_errors=True)
+    with _lock:
+        _pending.discard(folder)
+        updateRegistry(remove=folder)
+
+#-------------------------------------------------------------------------------
+# submit()
+#-------------------------------------------------------------------------------
+def submit(folder):
+    with _lock:
+        if folder in _pending:
+            return
+        _pending.add(folder)
+        if len(_workers) < WORKERS:
+            thread = threading.Thread(target=worker, daemon=True)
+            _workers.append(thread)
+            thread.start()
+    _queue.put(folder)
+
+#-------------------------------------------------------------------------------
+# moveToTrash()
+# Rename a folder aside and delete it in the background, return at once
+#-------------------------------------------------------------------------------
+def moveToTrash(folder):
+    folder = os.path.abspath(folder)
+    if not os.path.isdir(folder):
+        return True
+    parent, name = os.path.split(folder)
+    # Same parent, so the rename never crosses a file system
+    trashed = os.path.join(parent, ".%s.%d-%d%s" % (name, os.getpid(), int(time.time() * 1000), TRASH_SUFFIX))
+    try:
+        os.rename(folder, trashed)
+    except OSError:
+        # A file is locked (Windows), let's delete what can be now
+        shutil.rmtree(folder, ignore_errors=True)
+        return not os.path.exists(folder)
+    scanner.scanner.forget(folder)
+    with _lock:
+        updateRegistry(add=trashed)
+    submit(trashed)
+    return True
+
+#-------------------------------------------------------------------------------
+# collectGarbage()
+# Delete the folders trashed by the previous sessions
+#-------------------------------------------------------------------------------
+def collectGarbage():
+    with _lock:
+        folders = loadRegistry()
+    for folder in folders:
+        if os.path.exists(folder):
+            submit(folder)
+        else:
+            with _lock:
+                updateRegistry(remove=folder)
+
+#-------------------------------------------------------------------------------
+# getProgress()
+# Return (folders being deleted, files deleted so far)
+#-------------------------------------------------------------------------------
+def getProgress():
+    with _lock:
+        return len(_pending), _deletedFiles
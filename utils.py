@@ -19,13 +19,14 @@ import shutil
 import time
 import datetime
 from datetime import datetime
-from dateutil import tz
-import pkg_resources
 import threading
 import subprocess
 import sys
 from pathlib import Path
 
+import scanner
+import distindex
+
 #-------------------------------------------------------------------------------
 # openFileWithDefaultViewer()
 #-------------------------------------------------------------------------------
@@ -77,35 +78,16 @@ def getHumanTime(sec_elapsed):
 
 #---------------------------------------------------------------------------
 # getDirSize()
+# Symbolic links are not counted, see scanner.Scanner
 #---------------------------------------------------------------------------
 def getDirSize(start_path = '.'):
-    total_size = 0
-    for dirpath, dirnames, filenames in os.walk(start_path):
-        for f in filenames:
-            fp = os.path.join(dirpath, f)
-            # skip if it is symbolic link
-            if not os.path.islink(fp):
-                total_size += os.path.getsize(fp)
-
-    return total_size
-
-#---------------------------------------------------------------------------
-# getDirSize()
-#---------------------------------------------------------------------------
-def getDirSize2(path, follow_symlinks=False):
-    if os.path.exists(path):
-        try:
-            with os.scandir(path) as it:
-                return sum(getDirSize2(entry, follow_symlinks=follow_symlinks) for entry in it)
-        except NotADirectoryError:
-            return os.stat(path, follow_symlinks=follow_symlinks).st_size
-    else:
-        return 0
+    return scanner.getSize(start_path)
 
 #---------------------------------------------------------------------------
 # UnixTime2DateTime()
 #---------------------------------------------------------------------------
 def UnixTime2DateTime(utime):
+    from dateutil import tz
     from_zone = tz.tzutc()
     to_zone = tz.tzlocal()
     utc = datetime.utcfromtimestamp(utime)
@@ -206,15 +188,14 @@ def copyAllFilesFromTo(src, dest):
 # getPackagesList()
 #---------------------------------------------------------------------------
 def getPackagesList():
-    installed_packages = pkg_resources.working_set
-    installed_packages_list = sorted(["%s, %s" % (i.key, i.version) for i in installed_packages])
-    return installed_packages_list
+    return sorted(["%s, %s" % (name.lower(), version) for name, version in distindex.getDistributions()])
 
 #---------------------------------------------------------------------------
 # getPackageInfo()
+# Return the dict name, version, location and files, or None
 #---------------------------------------------------------------------------
 def getPackageInfo(pkg):
-    return pkg_resources.get_distribution(pkg)
+    return distindex.getDistribution(pkg)
 
 #---------------------------------------------------------------------------
 # dateStringToTimeStamp()
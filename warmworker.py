@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, the worker runs into the interpreter of
+# PyInstaller, and the client is run by the shreald as any other command
+#-------------------------------------------------------------------------------
+import json
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+#-------------------------------------------------------------------------------
+# Warm PyInstaller worker (POSIX only)
+#
+# The worker imports PyInstaller once and waits for builds on an Unix socket.
+# Each build is run by PyInstaller.__main__.run() into a forked child, whose
+# output is sent back to the client as framed lines :
+#   P<pid>      pid of the build process
+#   1<line>     line printed on stdout
+#   2<line>     line printed on stderr
+#   X<rc>       return code, last frame
+#   R           the worker is outdated, the client has to start a new one
+# The child is killed if the client goes away, so breaking the shreald still
+# breaks the build.
+#-------------------------------------------------------------------------------
+IDLE_TIMEOUT = 1800
+START_TIMEOUT = 30
+
+#-------------------------------------------------------------------------------
+# getSocketName()
+#-------------------------------------------------------------------------------
+def getSocketName():
+    import const
+    return os.path.join(os.path.expanduser("~"), const.db["APP_FOLDER"], const.db["WARM_WORKER_SOCKET"])
+
+#-------------------------------------------------------------------------------
+# wrapCommandLine()
+# Return the command line running a PyInstaller command line by the worker
+#-------------------------------------------------------------------------------
+def wrapCommandLine(command_line, maxBuilds):
+    import command
+    client = [sys.executable, os.path.abspath(__file__), "--run", str(maxBuilds), "--"]
+    return command.joinArgv(client) + " " + command_line
+
+#-------------------------------------------------------------------------------
+# getInstalledVersion()
+# Version of PyInstaller installed on disk, not the imported one
+#-------------------------------------------------------------------------------
+def getInstalledVersion():
+    try:
+        from importlib import metadata
+        return metadata.version("pyinstaller")
+    except Exception:
+        return None
+
+#-------------------------------------------------------------------------------
+# serve()
+#-------------------------------------------------------------------------------
+def serve(socketName, maxBuilds):
+    import PyInstaller
+    import PyInstaller.__main__
+    try:
+        # The heavy part of PyInstaller, imported before any build is asked
+        import PyInstaller.building.build_main
+    except Exception:
+        pass
+    version = PyInstaller.__version__
+
+    if os.path.exists(socketName):
+        os.remove(socketName)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socketName)
+    server.listen(4)
+    server.settimeout(IDLE_TIMEOUT)
+    builds = 0
+    try:
+        while builds < maxBuilds:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+            conn.settimeout(None)
+            with conn:
+                request = json.loads(conn.makefile("rb").readline())
+                if getInstalledVersion() not in (None, version):
+                    conn.sendall(b"R\n")
+                    break
+                runBuild(conn, request, PyInstaller.__main__.run)
+            builds = builds + 1
+    finally:
+        server.close()
+        try:
+            os.remove(socketName)
+        except OSError:
+            pass
+
+#-------------------------------------------------------------------------------
+# runBuild()
+#-------------------------------------------------------------------------------
+def runBuild(conn, request, run):
+    outRead, outWrite = os.pipe()
+    errRead, errWrite = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Build process
+        os.close(outRead)
+        os.close(errRead)
+        os.dup2(outWrite, 1)
+        os.dup2(errWrite, 2)
+        os.close(outWrite)
+        os.close(errWrite)
+        conn.close()
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        rc = 1
+        try:
+            os.chdir(request['cwd'])
+            os.environ.clear()
+            os.environ.update(request['env'])
+            sys.argv = request['argv']
+            run(request['argv'][1:])
+            rc = 0
+        except SystemExit as e:
+            rc = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(rc)
+
+    os.close(outWrite)
+    os.close(errWrite)
+    conn.sendall(b"P%d\n" % pid)
+    selector = selectors.DefaultSelector()
+    selector.register(outRead, selectors.EVENT_READ, b"1")
+    selector.register(errRead, selectors.EVENT_READ, b"2")
+    selector.register(conn, selectors.EVENT_READ, None)
+    pending = {outRead: b"", errRead: b""}
+    try:
+        while len(selector.get_map()) > 1:
+            for key, _ in selector.select():
+                if key.data is None:
+                    # The client sends nothing, readable means it went away
+                    if not conn.recv(1):
+                        raise BrokenPipeError
+                    continue
+                data = os.read(key.fd, 65536)
+                if not data:
+                    selector.unregister(key.fd)
+                    os.close(key.fd)
+                    if pending[key.fd]:
+                        conn.sendall(key.data + pending[key.fd] + b"\n")
+                    continue
+                lines = (pending[key.fd] + data).split(b"\n")
+                pending[key.fd] = lines.pop()
+                if lines:
+                    conn.sendall(b"".join(key.data + line + b"\n" for line in lines))
+        _, status = os.waitpid(pid, 0)
+        rc = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        conn.sendall(b"X%d\n" % rc)
+    except OSError:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+    finally:
+        selector.close()
+        for fd in (outRead, errRead):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+#-------------------------------------------------------------------------------
+# connect()
+# Connect to the worker, starting it first if needed
+#-------------------------------------------------------------------------------
+def connect(socketName, maxBuilds):
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socketName)
+        return conn
+    except OSError:
+        pass
+    import buildcache
+    interpreter = buildcache.getInterpreter()
+    subprocess.Popen(interpreter.split() + [os.path.abspath(__file__), "--serve", socketName, str(maxBuilds)], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    time1 = time.time()
+    while time.time() - time1 < START_TIMEOUT:
+        try:
+            conn.connect(socketName)
+            return conn
+        except OSError:
+            time.sleep(0.05)
+    raise ConnectionError("warm worker not started")
+
+#-------------------------------------------------------------------------------
+# runClient()
+# Run argv by the worker, return the build's return code
+#-------------------------------------------------------------------------------
+def runClient(argv, maxBuilds):
+    socketName = getSocketName()
+    request = json.dumps({'argv': argv, 'cwd': os.getcwd(), 'env': dict(os.environ)}).encode("utf-8") + b"\n"
+    for attempt in range(3):
+        try:
+            conn = connect(socketName, maxBuilds)
+        except ConnectionError:
+            break
+        started = False
+        with conn:
+            conn.sendall(request)
+            for frame in conn.makefile("rb"):
+                kind, line = frame[:1], frame[1:]
+                if kind == b"1":
+                    sys.stdout.buffer.write(line)
+                    sys.stdout.flush()
+                elif kind == b"2":
+                    sys.stderr.buffer.write(line)
+                    sys.stderr.flush()
+                elif kind == b"P":
+                    started = True
+                elif kind == b"X":
+                    return int(line)
+                elif kind == b"R":
+                    break
+        if started:
+            # The worker died during the build
+            return -1
+    # No worker, let's run PyInstaller the usual way
+    return subprocess.call(argv)
+
+#-------------------------------------------------------------------------------
+# timeFirstLine()
+# Time between the start of argv and its first output line
+#-------------------------------------------------------------------------------
+def timeFirstLine(argv, cwd):
+    time1 = time.time()
+    process = subprocess.Popen(argv, cwd=cwd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    process.stdout.readline()
+    elapsed = time.time() - time1
+    process.kill()
+    process.wait()
+    return elapsed
+
+#-------------------------------------------------------------------------------
+# bench()
+# Compare the time to the first log line of a cold PyInstaller and of the
+# warm worker, for the build of main
+#-------------------------------------------------------------------------------
+def bench(main, runs=5):
+    import tempfile
+    import statistics
+    main = os.path.abspath(main)
+    with tempfile.TemporaryDirectory() as tmp:
+        pyinstaller = ["pyinstaller", "--noconfirm", "--workpath", os.path.join(tmp, "build"), "--distpath", os.path.join(tmp, "dist"), "--specpath", tmp, main]
+        warm = [sys.executable, os.path.abspath(__file__), "--run", "1000", "--"] + pyinstaller
+        # The first run starts the worker, it is not measured
+        timeFirstLine(warm, tmp)
+        for name, argv in (("cold", pyinstaller), ("warm", warm)):
+            times = [timeFirstLine(argv, tmp) for _ in range(runs)]
+            print("%s : median %.3f s, min %.3f s, max %.3f s" % (name, statistics.median(times), min(times), max(times)))
+
+#-------------------------------------------------------------------------------
+# main()
+#-------------------------------------------------------------------------------
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if len(sys.argv) > 3 and sys.argv[1] == "--serve":
+        serve(sys.argv[2], int(sys.argv[3]))
+    elif len(sys.argv) > 4 and sys.argv[1] == "--run" and sys.argv[3] == "--":
+        sys.exit(runClient(sys.argv[4:], int(sys.argv[2])))
+    elif len(sys.argv) > 2 and sys.argv[1] == "--bench":
+        bench(sys.argv[2])
+    else:
+        print("usage: warmworker.py --bench <main.py>")
+        sys.exit(2)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# G U I n s t a l l e r
+#                                 an user friendly GUI interface for PyInstaller
+#                                                            (C) jpl@ozf.fr 2021
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+# Imports
+# This module must not import PyQt5, it is shared with the headless runner
+#-------------------------------------------------------------------------------
+import json
+import os
+import platform
+import re
+import shutil
+import socket
+import subprocess
+import threading
+import time
+
+import command
+import buildcache
+import scanner
+
+#-------------------------------------------------------------------------------
+# Shared cache of PyInstaller's workpath (Analysis TOC, PYZ, ...)
+#
+# The root folder may be shared by several machines (on a network mount) :
+#   <root>/entries/<key>/   published workpaths, never modified once published
+#   <root>/tmp/             workpaths being published
+#   <root>/trash/           evicted entries being deleted
+# PyInstaller checks by itself that a reused workpath is up to date, so a
+# stale entry makes the build slower but never wrong. An entry may be fetched
+# into another checkout folder, its paths are then rewritten, see relocate().
+#-------------------------------------------------------------------------------
+PATH_OPTIONS = ("--workpath", "--distpath", "--specpath")
+
+_toolchains = {}
+_toolchainsLock = threading.Lock()
+
+#-------------------------------------------------------------------------------
+# getToolchain()
+# Return the Python and PyInstaller versions of the interpreter, asked once
+# per interpreter and saved until the interpreter or PyInstaller's launcher
+# is replaced
+#-------------------------------------------------------------------------------
+def getToolchain(interpreter):
+    with _toolchainsLock:
+        if interpreter not in _toolchains:
+            _toolchains[interpreter] = loadToolchain(interpreter)
+        return _toolchains[interpreter]
+
+#-------------------------------------------------------------------------------
+# loadToolchain()
+#-------------------------------------------------------------------------------
+def loadToolchain(interpreter):
+    stamp = []
+    for path in (buildcache.getInterpreterPath(interpreter), shutil.which("pyinstaller")):
+        try:
+            stamp.append("%s:%d" % (path, os.stat(path).st_mtime_ns))
+        except (OSError, TypeError):
+            stamp.append(None)
+    filename = os.path.join(buildcache.cacheDir("toolchains"), buildcache.hashString(interpreter) + ".json")
+    try:
+        with open(filename, "r") as f:
+            saved = json.load(f)
+        if saved['stamp'] == stamp:
+            return saved['toolchain']
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        out = subprocess.check_output(interpreter.split() + ["-c", "import sys, PyInstaller; print(sys.version.split()[0], PyInstaller.__version__)"], stderr=subprocess.DEVNULL, timeout=30)
+        toolchain = out.decode("utf-8", errors="replace").strip()
+    except (OSError, subprocess.SubprocessError):
+        return interpreter
+    try:
+        with open(filename, "w") as f:
+            json.dump({'stamp': stamp, 'toolchain': toolchain}, f)
+    except OSError:
+        pass
+    return toolchain
+
+#-------------------------------------------------------------------------------
+# getPortableArgv()
+# PyInstaller's argv without the output paths and with the paths of the
+# project relative to its folder, to be the same in any checkout
+#-------------------------------------------------------------------------------
+def getPortableArgv(options, source_path):
+    argv = command.buildArgv(options)
+    portable = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in PATH_OPTIONS:
+            skip = True
+        elif os.path.isabs(arg) and arg.startswith(source_path):
+            portable.append(os.path.relpath(arg, source_path).replace(os.sep, '/'))
+        else:
+            portable.append(arg)
+    return portable
+
+#-------------------------------------------------------------------------------
+# getKey()
+# Hash of the analysis inputs, independent of the checkout folder
+#-------------------------------------------------------------------------------
+def getKey(options):
+    options = command.getOptions(options)
+    main = os.path.abspath(options['main'])
+    source_path = os.path.dirname(main)
+    interpreter = buildcache.getInterpreter()
+    inputs = {
+        'platform': "%s-%s" % (platform.system(), platform.machine()),
+        'toolchain': getToolchain(interpreter),
+        'site-packages': buildcache.getSiteFingerprint(interpreter, local=False),
+        'argv': getPortableArgv(options, source_path),
+    }
+    for filename in buildcache.getProjectSources(main, options['paths']):
+        name = os.path.relpath(filename, source_path).replace(os.sep, '/')
+        inputs["file:" + name] = buildcache.hashFile(filename)
+    return buildcache.getKey(inputs)
+
+#-------------------------------------------------------------------------------
+# getFolder()
+#-------------------------------------------------------------------------------
+def getFolder(root, kind):
+    folder = os.path.join(root, kind)
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+#-------------------------------------------------------------------------------
+# getUniqueName()
+# Name unique among all the machines sharing the cache
+#-------------------------------------------------------------------------------
+def getUniqueName(key):
+    return "%s-%s-%d-%d" % (key, socket.gethostname(), os.getpid(), int(time.time() * 1000))
+
+#-------------------------------------------------------------------------------
+# relocate()
+# The TOC files hold the absolute paths of the checkout and of the workpath
+# they were built into, rewrite them for this checkout. The copied files keep
+# the mtimes of the first build, older than this checkout's sources, so they
+# are touched too, else PyInstaller would analyse everything again.
+#-------------------------------------------------------------------------------
+def relocate(workpath, moves):
+    # The paths are written as repr() of strings, backslashes doubled
+    moves = dict((repr(old)[1:-1], repr(new)[1:-1]) for old, new in moves if old and old != new)
+    # Longest first, the workpath may be inside the checkout
+    pattern = re.compile("(%s)(?=[\\\\/'\"])" % "|".join(re.escape(old) for old in sorted(moves, key=len, reverse=True))) if moves else None
+    now = time.time()
+    for folder, dirs, files in os.walk(workpath):
+        for name in files:
+            filename = os.path.join(folder, name)
+            if name.endswith(".toc") and pattern is not None:
+                with open(filename, "r", encoding="utf-8") as f:
+                    text = f.read()
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(pattern.sub(lambda m: moves[m.group(1)], text))
+            os.utime(filename, (now, now))
+
+#-------------------------------------------------------------------------------
+# fetch()
+# Copy the cached workpath into the local one, return True if found
+#-------------------------------------------------------------------------------
+def fetch(root, key, workpath, source_path):
+    entry = os.path.join(getFolder(root, "entries"), key)
+    try:
+        with open(os.path.join(entry, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    try:
+        # Marks the entry as used, it won't be evicted during the grace period
+        os.utime(entry)
+        shutil.copytree(os.path.join(entry, "workpath"), workpath, symlinks=True)
+        relocate(workpath, [(manifest.get('workpath'), os.path.abspath(workpath)), (manifest.get('source_path'), os.path.abspath(source_path))])
+    except (OSError, UnicodeError):
+        # Evicted while copying, a partial workpath is worse than none
+        shutil.rmtree(workpath, ignore_errors=True)
+        return False
+    return True
+
+#-------------------------------------------------------------------------------
+# publish()
+# Copy the local workpath into the cache, an entry appears all at once
+#-------------------------------------------------------------------------------
+def publish(root, key, workpath, source_path, maxSize, grace):
+    entry = os.path.join(getFolder(root, "entries"), key)
+    if os.path.exists(entry):
+        return False
+    tmpEntry = os.path.join(getFolder(root, "tmp"), getUniqueName(key))
+    try:
+        shutil.copytree(workpath, os.path.join(tmpEntry, "workpath"), symlinks=True)
+        manifest = {'key': key, 'host': socket.gethostname(), 'time': time.time(), 'size': scanner.getSize(tmpEntry),
+                    'workpath': os.path.abspath(workpath), 'source_path': os.path.abspath(source_path)}
+        with open(os.path.join(tmpEntry, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.rename(tmpEntry, entry)
+    except OSError:
+        # Published by another machine meanwhile, or the copy failed
+        shutil.rmtree(tmpEntry, ignore_errors=True)
+        return False
+    evict(root, maxSize, grace)
+    return True
+
+#-------------------------------------------------------------------------------
+# evict()
+# Remove the least recently used entries until the cache fits into maxSize
+# bytes, entries used during the last grace seconds are kept for their readers
+#-------------------------------------------------------------------------------
+def evict(root, maxSize, grace):
+    folder = getFolder(root, "entries")
+    entries = []
+    total = 0
+    for name in os.listdir(folder):
+        entry = os.path.join(folder, name)
+        try:
+            with open(os.path.join(entry, "manifest.json"), "r") as f:
+                size = json.load(f)['size']
+            entries.append((os.path.getmtime(entry), size, entry))
+        except (OSError, ValueError, KeyError):
+            continue
+        total = total + size
+    entries.sort()
+    now = time.time()
+    trash = getFolder(root, "trash")
+    for used, size, entry in entries:
+        if total <= maxSize:
+            break
+        if now - used < grace:
+            continue
+        try:
+            # Renaming is atomic, no reader can start copying it afterwards
+            os.rename(entry, os.path.join(trash, getUniqueName(os.path.basename(entry))))
+            total = total - size
+        except OSError:
+            pass
+    # Trash and unfinished publications left by stopped processes
+    for kind in ("trash", "tmp"):
+        for name in os.listdir(getFolder(root, kind)):
+            path = os.path.join(root, kind, name)
+            try:
+                if kind == "trash" or now - os.path.getmtime(path) > grace:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass